@@ -0,0 +1,105 @@
+"""
+This file contains test cases for the analysis mode of `CustomPlayer`
+(`CustomPlayer.analyze()`).
+"""
+import itertools
+import unittest
+
+from benchmark import benchmark_positions
+from game_agent import CustomPlayer
+from sample_players import improved_score
+
+
+def make_player(method="alphabeta"):
+    player = CustomPlayer(score_fn=improved_score, method=method)
+    player.time_left = lambda: 1000.
+    return player
+
+
+class AnalysisTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player = make_player()
+        self.positions = benchmark_positions(count=5, players=(self.player, "opponent"))
+
+    def test_scores(self):
+        """ Test the top lines against a full-window search of each move """
+        player = self.player
+        for game in self.positions:
+            results = list(player.analyze(game, multi_pv=3, max_depth=4))
+            depths = [analysis.depth for analysis in results]
+            player.time_left = lambda: 1000.
+            for analysis in results:
+                self.assertLessEqual(len(analysis.lines), 3)
+                scores = [line.score for line in analysis.lines]
+                self.assertEqual(scores, sorted(scores, reverse=True))
+                self.assertEqual(scores[0], player.alphabeta(game, analysis.depth)[0])
+                for line in analysis.lines:
+                    child = game.forecast_move(line.moves[0])
+                    if analysis.depth == 1:
+                        expected = player.score(child, player)
+                    else:
+                        expected = player.alphabeta(child, analysis.depth - 1,
+                                                    maximizing_player=False)[0]
+                    self.assertEqual(line.score, expected)
+            self.assertEqual(depths, list(range(1, len(depths) + 1)))
+            self.assertLessEqual(len(depths), 4)
+            self.assertEqual(player.completed_depth, depths[-1])
+            self.assertIsNone(player.pv_table)
+
+    def test_principal_variation(self):
+        """ Test that principal variations are legal and as long as the search """
+        for method in ("minimax", "alphabeta"):
+            player = make_player(method)
+            game = benchmark_positions(count=1, players=(player, "opponent"))[0]
+            for analysis in player.analyze(game, multi_pv=2, max_depth=3):
+                for line in analysis.lines:
+                    board = game
+                    for move in line.moves:
+                        self.assertIn(move, board.get_legal_moves())
+                        board = board.forecast_move(move)
+                    self.assertTrue(len(line.moves) == analysis.depth or
+                                    not board.get_legal_moves())
+
+    def test_stop(self):
+        """ Test stopping the analysis by timeout and by closing it """
+        game = self.positions[0]
+        calls = itertools.count()
+        results = list(self.player.analyze(game, time_left=lambda: 1000. - next(calls)))
+        self.assertTrue(self.player.timed_out)
+        self.assertEqual(results[-1].depth, self.player.completed_depth)
+        self.assertLess(results[-1].nodes, 1000)
+        self.assertIsNone(self.player.pv_table)
+
+        analysis = self.player.analyze(game)
+        self.assertEqual(next(analysis).depth, 1)
+        analysis.close()
+        self.assertIsNone(self.player.pv_table)
+
+        with self.assertRaises(ValueError):
+            next(make_player().analyze(game))
+
+    def test_default_score(self):
+        """ Test an analysis without a time limit with the default score """
+        player = CustomPlayer()
+        game = benchmark_positions(count=1, players=(player, "opponent"))[0]
+        analysis = next(player.analyze(game, multi_pv=3, max_depth=1))
+        self.assertTrue(any(line.score for line in analysis.lines))
+
+    def test_nodes(self):
+        """ Test that the node count ignores the clock reads of the score """
+        def reading_score(game, player):
+            for _ in range(10):
+                player.time_left()
+            return improved_score(game, player)
+
+        game = self.positions[0]
+        reading = CustomPlayer(score_fn=reading_score, method="alphabeta")
+        expected = [analysis.nodes for analysis in self.player.analyze(game, max_depth=3)]
+        game = benchmark_positions(count=1, players=(reading, "opponent"))[0]
+        self.assertEqual([analysis.nodes for analysis in reading.analyze(game, max_depth=3)],
+                         expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,569 @@
+"""
+Micro-benchmarks for the isolation engine and the search agents.
+
+All benchmarks run on seeded positions (see `benchmark_positions()`) so that
+results are comparable between runs and between code versions.
+
+Usage:
+
+    python benchmark.py sizes        # board engine and search vs board size
+    python benchmark.py batch        # games/sec of play_batch vs Board.play
+    python benchmark.py remote       # round-trip latency of remote agents
+    python benchmark.py ordering     # search depth with history move ordering
+    python benchmark.py extensions   # nodes and winrate with search extensions
+    python benchmark.py lmr          # search depth with late move reductions
+    python benchmark.py endgame      # probe cost and winrate with an endgame table
+    python benchmark.py calibrate    # node clock rates equivalent to the wall clock
+    python benchmark.py gc           # move time tail latency with GC control
+    python benchmark.py territory    # speed and winrate of the territory heuristic
+    python benchmark.py network      # latency of the NumPy network vs batch size
+    python benchmark.py phases       # speed and winrate of phase-aware scoring
+    python benchmark.py analysis     # time until each depth of an analysis
+"""
+
+import argparse
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+
+from isolation import Board
+from isolation import play_batch
+from game_agent import CustomPlayer
+from sample_players import GreedyPlayer
+from sample_players import RandomPlayer
+from sample_players import improved_score
+
+SEED = 0
+NUM_POSITIONS = 20
+TIME_LIMIT = 150
+SIZES = [7, 11, 15, 21, 25, 32]
+NUM_GAMES = 500
+NUM_MATCH_GAMES = 20
+
+
+def benchmark_positions(width=7, height=7, count=NUM_POSITIONS, seed=SEED,
+                        players=("player1", "player2")):
+    """
+    Generate reproducible midgame positions by placing both players at random
+    and then playing random moves for a random, even number of plies (up to a
+    quarter of the board area).
+
+    Returns
+    ----------
+    list<isolation.Board>
+        Non-terminal positions with both players on the board and the first
+        of `players` to move. The same seed always generates the same
+        positions, whatever the player objects are.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = Board(players[0], players[1], width, height)
+        for _ in range(2):
+            game.apply_move(rng.choice(game.get_legal_moves()))
+        for _ in range(2 * rng.randint(0, width * height // 8)):
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(rng.choice(moves))
+        if game.get_legal_moves():
+            positions.append(game)
+    return positions
+
+
+def random_game(rng, width=7, height=7, players=("player1", "player2")):
+    """
+    Yield every position of a game of random moves drawn from `rng`, from
+    the empty board to the end of the game. The positions are copies, so
+    they may be kept.
+    """
+    game = Board(players[0], players[1], width, height)
+    while True:
+        yield game.copy()
+        moves = game.get_legal_moves()
+        if not moves:
+            return
+        game.apply_move(rng.choice(moves))
+
+
+def random_positions(width=7, height=7, count=1, seed=SEED, players=("player1", "player2")):
+    """Yield every position of `count` seeded random games (see `random_game()`)."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        for game in random_game(rng, width, height, players):
+            yield game
+
+
+def board_nbytes(board, count=1000):
+    """
+    Measure the memory allocated per copy of a board, i.e., the memory owned
+    by each node of a search tree (shared data such as the player objects and
+    the move tables is not counted).
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copies = [board.copy() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del copies
+    return (after - before) / count
+
+
+def time_per_call(fn, args_list, repeat=3):
+    """Return the best average time (in microseconds) of `fn` over `args_list`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        for args in args_list:
+            fn(*args)
+        best = min(best, timeit.default_timer() - start)
+    return 1e6 * best / len(args_list)
+
+
+def search_stats(player, positions, time_limit=TIME_LIMIT):
+    """
+    Run `player.get_move` on each position (where `player` must be the
+    active player) and return the average completed search depth, the
+    number of nodes searched per second and the average number of nodes
+    per search. Nodes are counted as calls to `time_left`, which the search
+    makes once per node.
+    """
+    depths, nodes, elapsed = 0, 0, 0.
+    for game in positions:
+        calls = [0]
+        start = timeit.default_timer()
+
+        def time_left():
+            calls[0] += 1
+            return time_limit - 1000 * (timeit.default_timer() - start)
+
+        player.get_move(game.copy(), game.get_legal_moves(), time_left)
+        elapsed += timeit.default_timer() - start
+        depths += player.completed_depth
+        nodes += calls[0]
+    return depths / len(positions), nodes / elapsed, nodes / len(positions)
+
+
+def bench_sizes(args):
+    """Board engine cost and search depth as a function of board size."""
+    print("{:>6}{:>10}{:>12}{:>12}{:>12}{:>12}{:>10}{:>12}".format(
+        "size", "bytes", "copy us", "fcast us", "moves us", "blanks us",
+        "depth", "nodes/s"))
+    for size in args.sizes:
+        positions = benchmark_positions(size, size, args.positions, args.seed)
+        moves = [(g, g.get_legal_moves()[0]) for g in positions]
+        nbytes = sum(board_nbytes(g) for g in positions) / len(positions)
+        copy_us = time_per_call(Board.copy, [(g,) for g in positions])
+        forecast_us = time_per_call(Board.forecast_move, moves)
+        moves_us = time_per_call(Board.get_legal_moves, [(g,) for g in positions])
+        blanks_us = time_per_call(Board.get_blank_spaces, [(g,) for g in positions])
+        player = CustomPlayer(score_fn=improved_score, method="alphabeta",
+                              iterative=True, opening_moves=8)
+        depth, nps, _ = search_stats(player, benchmark_positions(
+            size, size, args.positions, args.seed, (player, "opponent")),
+            args.time_limit)
+        print("{:>6}{:>10.0f}{:>12.2f}{:>12.2f}{:>12.2f}{:>12.2f}{:>10.2f}{:>12.0f}".format(
+            "{0}x{0}".format(size), nbytes, copy_us, forecast_us, moves_us,
+            blanks_us, depth, nps))
+
+
+def play_games(player, opponent, num_games, seed=SEED, time_limit=TIME_LIMIT):
+    """
+    Play seeded games between two players (alternating who moves first, from
+    random opening positions as in tournament.py) and record the search depth
+    `player` completes on each move.
+
+    Returns
+    ----------
+    (float, float)
+        The average completed search depth per move of `player` and the
+        fraction of the games it won.
+    """
+    depths = []
+    get_move = player.get_move
+
+    def recording_get_move(game, legal_moves, time_left):
+        move = get_move(game, legal_moves, time_left)
+        depths.append(player.completed_depth)
+        return move
+
+    player.get_move = recording_get_move
+    random.seed(seed)
+    wins = 0
+    try:
+        for i in range(num_games):
+            game = Board(player, opponent) if i % 2 else Board(opponent, player)
+            for _ in range(2):
+                game.apply_move(random.choice(game.get_legal_moves()))
+            winner, _, _ = game.play(time_limit=time_limit)
+            wins += winner is player
+    finally:
+        del player.get_move
+    return sum(depths) / max(len(depths), 1), wins / num_games
+
+
+def bench_ordering(args):
+    """Average depth per move with and without history move ordering."""
+    opponent = CustomPlayer(score_fn=improved_score, method="alphabeta")
+    print("{:>12}{:>10}{:>10}".format("ordering", "depth", "winrate"))
+    for name, history in [("none", False), ("history", True)]:
+        player = CustomPlayer(score_fn=improved_score, method="alphabeta", history=history)
+        depth, winrate = play_games(player, opponent, args.games, args.seed, args.time_limit)
+        print("{:>12}{:>10.2f}{:>10.2f}".format(name, depth, winrate))
+
+
+def bench_extensions(args):
+    """Nodes per fixed-depth search and winrate with search extensions."""
+    opponent = CustomPlayer(score_fn=improved_score, method="alphabeta")
+    print("{:>8}{:>12}{:>10}".format("budget", "nodes", "winrate"))
+    for budget in args.budgets:
+        player = CustomPlayer(search_depth=args.depth, score_fn=improved_score,
+                              method="alphabeta", iterative=False,
+                              extension_budget=budget)
+        positions = benchmark_positions(players=(player, "opponent"),
+                                        count=args.positions, seed=args.seed)
+        _, _, nodes = search_stats(player, positions, float("inf"))
+        player.iterative = True
+        _, winrate = play_games(player, opponent, args.games, args.seed, args.time_limit)
+        print("{:>8}{:>12.0f}{:>10.2f}".format(budget, nodes, winrate))
+
+
+def bench_lmr(args):
+    """Average depth per search with late move reductions at equal time."""
+    print("{:>14}{:>10}{:>12}".format("reduce after", "depth", "nodes/s"))
+    for reduce_after in [None] + args.reduce_after:
+        player = CustomPlayer(score_fn=improved_score, method="alphabeta",
+                              history=True, reduce_after=reduce_after)
+        positions = benchmark_positions(players=(player, "opponent"),
+                                        count=args.positions, seed=args.seed)
+        depth, nps, _ = search_stats(player, positions, args.time_limit)
+        print("{:>14}{:>10.2f}{:>12.0f}".format(str(reduce_after), depth, nps))
+
+
+def bench_endgame(args):
+    """Probe cost of an endgame table and winrate of a player using it."""
+    import endgame
+
+    table = endgame.EndgameTable(args.table)
+    # every position of seeded random games past the opening
+    positions = [game for game in random_positions(table.width, table.height,
+                                                   args.positions, args.seed)
+                 if game.move_count >= table.min_move_count]
+    probe_us = time_per_call(table.probe, [(g,) for g in positions])
+    hits = sum(table.probe(g) is not None for g in positions)
+    print("{} positions in table, {:.2f} us per probe, {:.0%} hits".format(
+        len(table), probe_us, hits / len(positions)))
+
+    opponent = CustomPlayer(score_fn=improved_score, method="alphabeta")
+    print("{:>10}{:>10}{:>10}".format("table", "depth", "winrate"))
+    for name, used in [("none", None), ("endgame", table)]:
+        player = CustomPlayer(score_fn=improved_score, method="alphabeta", endgame=used)
+        depth, winrate = play_games(player, opponent, args.games, args.seed, args.time_limit)
+        print("{:>10}{:>10.2f}{:>10.2f}".format(name, depth, winrate))
+    table.close()
+
+
+def bench_calibrate(args):
+    """Nodes per millisecond of each heuristic, i.e., the `NodeClock` rate
+    that gives the same search effort as the wall clock on this machine."""
+    from tournament import HEURISTICS
+    from game_agent import custom_score
+
+    print("{:>10}{:>14}{:>16}".format("heuristic", "nodes per ms",
+                                      "nodes per move"))
+    rates = []
+    for name, score_fn in HEURISTICS + [("Custom", custom_score)]:
+        player = CustomPlayer(score_fn=score_fn, method="alphabeta")
+        positions = benchmark_positions(players=(player, "opponent"),
+                                        count=args.positions, seed=args.seed)
+        _, nps, _ = search_stats(player, positions, args.time_limit)
+        rates.append(nps / 1000.)
+        print("{:>10}{:>14.1f}{:>16.0f}".format(name, nps / 1000.,
+                                                nps * args.time_limit / 1000.))
+    print("\nUse e.g. tournament.py --clock nodes --nodes-per-ms {:.0f}".format(
+        sorted(rates)[len(rates) // 2]))
+
+
+def bench_gc(args):
+    """Tail move latency and timeouts with and without GC control."""
+    from isolation import RecordingClock
+
+    print("{:>8}{:>10}{:>10}{:>10}{:>10}{:>10}".format(
+        "gc", "moves", "p50 ms", "p99 ms", "max ms", "timeouts"))
+    for gc_control in [False, True]:
+        random.seed(args.seed)
+        think = []
+        for i in range(args.games):
+            player = CustomPlayer(score_fn=improved_score, method="alphabeta",
+                                  gc_control=gc_control)
+            opponent = CustomPlayer(score_fn=improved_score, method="alphabeta")
+            game = Board(player, opponent) if i % 2 else Board(opponent, player)
+            for _ in range(2):
+                game.apply_move(random.choice(game.get_legal_moves()))
+            clock = RecordingClock()
+            game.play(time_limit=args.time_limit, clock=clock, delta=True)
+            think.extend(args.time_limit - left
+                         for left in clock.remaining[i % 2 == 0::2])
+        think.sort()
+        print("{:>8}{:>10}{:>10.2f}{:>10.2f}{:>10.2f}{:>10}".format(
+            "on" if gc_control else "off", len(think), think[len(think) // 2],
+            think[int(0.99 * (len(think) - 1))], think[-1],
+            sum(t > args.time_limit for t in think)))
+
+
+def bench_territory(args):
+    """Cost per evaluation, search speed and winrate of the territory
+    heuristic compared with the "Improved" heuristic."""
+    from reachability import territory_score
+
+    opponent = CustomPlayer(score_fn=improved_score, method="alphabeta")
+    print("{:>10}{:>10}{:>12}{:>10}{:>10}".format("heuristic", "us/eval", "nodes/s",
+                                                  "depth", "winrate"))
+    for name, score_fn in [("Improved", improved_score), ("Territory", territory_score)]:
+        player = CustomPlayer(score_fn=score_fn, method="alphabeta")
+        positions = benchmark_positions(players=(player, "opponent"),
+                                        count=args.positions, seed=args.seed)
+        eval_us = time_per_call(score_fn, [(game, player) for game in positions])
+        _, nps, _ = search_stats(player, positions, args.time_limit)
+        depth, winrate = play_games(player, opponent, args.games, args.seed, args.time_limit)
+        print("{:>10}{:>10.2f}{:>12.0f}{:>10.2f}{:>10.2f}".format(
+            name, eval_us, nps, depth, winrate))
+
+
+def bench_network(args):
+    """Latency of network evaluation (encoding and forward pass) against the
+    batch size (requires NumPy)."""
+    import network
+
+    net = (network.Network.load(args.weights) if args.weights
+           else network.Network(seed=args.seed))
+    positions = benchmark_positions(net.width, net.height, count=args.positions,
+                                    seed=args.seed)
+    print("{:>8}{:>14}{:>16}".format("batch", "ms per batch", "us per position"))
+    for size in args.batch_sizes:
+        batch = [positions[i % len(positions)] for i in range(size)]
+        batch_us = time_per_call(net.evaluate, [(batch,)] * 10)
+        print("{:>8}{:>14.3f}{:>16.2f}".format(size, batch_us / 1000., batch_us / size))
+
+
+def bench_analysis(args):
+    """Wall-clock time and nodes until each depth of an analysis (multi-PV
+    iterative deepening) is reported, over the benchmark positions."""
+    player = CustomPlayer(score_fn=improved_score, method="alphabeta")
+    positions = benchmark_positions(players=(player, "opponent"), count=args.positions,
+                                    seed=args.seed)
+    reports = {}
+    for game in positions:
+        start = time.perf_counter()
+        deadline = start + args.analysis_time / 1000.
+        for analysis in player.analyze(game, args.multi_pv, time_left=lambda: (
+                deadline - time.perf_counter()) * 1000.):
+            elapsed = (time.perf_counter() - start) * 1000.
+            reports.setdefault(analysis.depth, []).append((elapsed, analysis.nodes))
+    print("{:>8}{:>12}{:>12}{:>12}".format("depth", "positions", "median ms", "nodes"))
+    for depth, results in sorted(reports.items()):
+        results.sort()
+        elapsed, nodes = results[len(results) // 2]
+        print("{:>8}{:>12}{:>12.2f}{:>12}".format(depth, len(results), elapsed, nodes))
+
+
+def phase_positions(scorer, players, count, seed=SEED):
+    """
+    Generate reproducible positions of random games, `count` in each phase
+    of a `game_agent.PhaseScore`, with the first of `players` to move.
+
+    Returns
+    ----------
+    dict<str, list<isolation.Board>>
+        The positions of each phase.
+    """
+    rng = random.Random(seed)
+    positions = {name: [] for name in scorer.PHASES}
+    while min(len(p) for p in positions.values()) < count:
+        for game in random_game(rng, players=players):
+            if game.move_count >= 2 and game.move_count % 2 == 0 and game.get_legal_moves():
+                bucket = positions[scorer.phase(game)]
+                if len(bucket) < count:
+                    bucket.append(game)
+    return positions
+
+
+def bench_phases(args):
+    """Search depth and nodes/s in each game phase, and winrate, of the
+    cheap, rollout and phase-aware heuristics."""
+    from game_agent import PhaseScore, balanced_score, mcs_score
+
+    table = None
+    if args.table:
+        import endgame
+        table = endgame.EndgameTable(args.table)
+    thresholds = {(7, 7): tuple(args.thresholds)} if args.thresholds else None
+    heuristics = [("Balanced", lambda: balanced_score), ("MCS", lambda: mcs_score),
+                  ("Phased", lambda: PhaseScore(endgame=table, thresholds=thresholds))]
+    opponent = CustomPlayer(score_fn=improved_score, method="alphabeta")
+    phases = PhaseScore(thresholds=thresholds)
+    print("thresholds (rollout, exact blanks): {}".format(phases.blank_thresholds(7, 7)))
+    print("{:>10}{:>10}{:>10}{:>12}".format("heuristic", "phase", "depth", "nodes/s"))
+    for name, make_score in heuristics:
+        player = CustomPlayer(score_fn=make_score(), method="alphabeta")
+        positions = phase_positions(phases, (player, "opponent"), args.positions, args.seed)
+        for phase in phases.PHASES:
+            depth, nps, _ = search_stats(player, positions[phase], args.time_limit)
+            print("{:>10}{:>10}{:>10.2f}{:>12.0f}".format(name, phase, depth, nps))
+    print("\n{:>10}{:>10}".format("heuristic", "winrate"))
+    for name, make_score in heuristics:
+        player = CustomPlayer(score_fn=make_score(), method="alphabeta")
+        _, winrate = play_games(player, opponent, args.games, args.seed, args.time_limit)
+        print("{:>10}{:>10.2f}".format(name, winrate))
+        if isinstance(player.score, PhaseScore):
+            print("{:>10}{}".format("", "  ".join("{}: {}".format(k, v)
+                                                  for k, v in player.score.calls.items())))
+
+
+def bench_batch(args):
+    """Throughput of play_batch compared with looping over Board.play."""
+    player1, player2 = RandomPlayer(), GreedyPlayer()
+
+    def new_games():
+        random.seed(args.seed)
+        return [Board(player1, player2, args.size, args.size) if i % 2 else
+                Board(player2, player1, args.size, args.size)
+                for i in range(args.games)]
+
+    games = new_games()
+    start = timeit.default_timer()
+    for game in games:
+        game.play(time_limit=float("inf"))
+    loop_rate = len(games) / (timeit.default_timer() - start)
+
+    games = new_games()
+    start = timeit.default_timer()
+    play_batch(games, time_limit=float("inf"))
+    batch_rate = len(games) / (timeit.default_timer() - start)
+
+    print("{:>16}{:>12}".format("runner", "games/s"))
+    print("{:>16}{:>12.0f}".format("Board.play", loop_rate))
+    print("{:>16}{:>12.0f}".format("play_batch", batch_rate))
+
+
+def bench_remote(args):
+    """Round-trip latency of RemotePlayer over TCP and Unix domain sockets."""
+    import remote
+
+    addresses = [("tcp", ("localhost", 0))]
+    if hasattr(socket, "AF_UNIX"):
+        addresses.append(("unix", os.path.join(tempfile.mkdtemp(), "agent.sock")))
+
+    print("{:>8}{:>12}{:>12}{:>12}".format("socket", "rtt ms", "p50 ms", "p99 ms"))
+    for name, address in addresses:
+        server = remote.AgentServer(RandomPlayer, address)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        player = remote.RemotePlayer(server.server_address)
+
+        # time every move of complete games against a local random player
+        latencies = []
+        get_move = player.get_move
+
+        def timed_get_move(game, legal_moves, time_left):
+            start = timeit.default_timer()
+            move = get_move(game, legal_moves, time_left)
+            latencies.append(1000 * (timeit.default_timer() - start))
+            return move
+
+        player.get_move = timed_get_move
+        random.seed(args.seed)
+        for i in range(args.positions):
+            players = (player, RandomPlayer()) if i % 2 else (RandomPlayer(), player)
+            Board(*players).play(time_limit=float("inf"))
+
+        latencies.sort()
+        print("{:>8}{:>12.3f}{:>12.3f}{:>12.3f}".format(
+            name, player.rtt, latencies[len(latencies) // 2],
+            latencies[int(0.99 * (len(latencies) - 1))]))
+        player.close()
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--positions", type=int, default=NUM_POSITIONS)
+    parser.add_argument("--time-limit", type=int, default=TIME_LIMIT)
+    subparsers = parser.add_subparsers(dest="benchmark")
+    subparsers.required = True
+
+    sizes = subparsers.add_parser("sizes", help=bench_sizes.__doc__)
+    sizes.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    sizes.set_defaults(func=bench_sizes)
+
+    batch = subparsers.add_parser("batch", help=bench_batch.__doc__)
+    batch.add_argument("--games", type=int, default=NUM_GAMES)
+    batch.add_argument("--size", type=int, default=7)
+    batch.set_defaults(func=bench_batch)
+
+    remote = subparsers.add_parser("remote", help=bench_remote.__doc__)
+    remote.set_defaults(func=bench_remote)
+
+    ordering = subparsers.add_parser("ordering", help=bench_ordering.__doc__)
+    ordering.add_argument("--games", type=int, default=NUM_MATCH_GAMES)
+    ordering.set_defaults(func=bench_ordering)
+
+    extensions = subparsers.add_parser("extensions", help=bench_extensions.__doc__)
+    extensions.add_argument("--games", type=int, default=NUM_MATCH_GAMES)
+    extensions.add_argument("--depth", type=int, default=4)
+    extensions.add_argument("--budgets", type=int, nargs="+", default=[0, 2, 4])
+    extensions.set_defaults(func=bench_extensions)
+
+    lmr = subparsers.add_parser("lmr", help=bench_lmr.__doc__)
+    lmr.add_argument("--reduce-after", type=int, nargs="+", default=[1, 2, 3])
+    lmr.set_defaults(func=bench_lmr)
+
+    endgame = subparsers.add_parser("endgame", help=bench_endgame.__doc__)
+    endgame.add_argument("--table", default="endgame.egtb")
+    endgame.add_argument("--games", type=int, default=NUM_MATCH_GAMES)
+    endgame.set_defaults(func=bench_endgame)
+
+    calibrate = subparsers.add_parser("calibrate", help=bench_calibrate.__doc__)
+    calibrate.set_defaults(func=bench_calibrate)
+
+    gc_parser = subparsers.add_parser("gc", help=bench_gc.__doc__)
+    gc_parser.add_argument("--games", type=int, default=NUM_MATCH_GAMES)
+    gc_parser.set_defaults(func=bench_gc)
+
+    territory = subparsers.add_parser("territory", help=bench_territory.__doc__)
+    territory.add_argument("--games", type=int, default=NUM_MATCH_GAMES)
+    territory.set_defaults(func=bench_territory)
+
+    network = subparsers.add_parser("network", help=bench_network.__doc__)
+    network.add_argument("--weights", help="weights saved by network.py (default: "
+                                           "an untrained network)")
+    network.add_argument("--batch-sizes", type=int, nargs="+",
+                         default=[1, 4, 16, 64, 256, 1024])
+    network.set_defaults(func=bench_network)
+
+    phases = subparsers.add_parser("phases", help=bench_phases.__doc__)
+    phases.add_argument("--games", type=int, default=NUM_MATCH_GAMES)
+    phases.add_argument("--thresholds", type=int, nargs=2, metavar=("ROLLOUT", "EXACT"),
+                        help="blank squares at which 7x7 boards switch to rollouts "
+                             "and exact scores")
+    phases.add_argument("--table", help="endgame table for the exact phase")
+    phases.set_defaults(func=bench_phases)
+
+    analysis = subparsers.add_parser("analysis", help=bench_analysis.__doc__)
+    analysis.add_argument("--multi-pv", type=int, default=3)
+    analysis.add_argument("--analysis-time", type=int, default=2000,
+                          help="milliseconds to analyze each position (default: %(default)s)")
+    analysis.set_defaults(func=bench_analysis)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
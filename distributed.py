@@ -0,0 +1,390 @@
+"""
+Spread tournament matches over worker processes on any number of hosts.
+
+A `Coordinator` serves a queue of match jobs over TCP using line-delimited
+JSON (like `remote.py`). Workers connect, take one job at a time, play it
+with `tournament.play_match` and send the result back. Agents travel as
+specs (see `agent_spec()`), i.e., the name of the player class and its
+constructor arguments, so workers rebuild the same agents from their own
+copy of the code.
+
+Every job is leased to one worker at a time. A job whose worker disconnects
+or does not answer within the lease timeout is handed out again, and
+results are recorded idempotently by job id, so a job that ends up being
+played twice is only counted once.
+
+Requests (one JSON object per line; every request gets one response):
+
+    {"type": "job"}
+        -> {"type": "job", "id": <int>, "player1": <spec>, "player2": <spec>,
+            "width": 7, "height": 7, "clock": <spec>, "time_limit": <ms>,
+            "seed": <int>}
+        -> {"type": "wait"}     no job is available right now
+
+    {"type": "result", "id": <int>, "scores": [<int>, <int>],
+     "timings": [[<ms>, ...], [<ms>, ...]]}
+        -> {"type": "ok"}
+
+Usage:
+
+    python tournament.py --coordinator 0.0.0.0:9100        # on one host
+    python distributed.py --connect host:9100 --workers 4  # on every host
+"""
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import multiprocessing
+import random
+import socket
+import socketserver
+import threading
+import time
+
+from isolation import CpuClock
+from isolation import NodeClock
+from isolation import WallClock
+from movecache import CachedPlayer
+
+LEASE_TIMEOUT = 600.  # seconds before an unanswered job is handed out again
+POLL_INTERVAL = 0.2  # seconds a worker waits when no job is available
+CONNECT_RETRIES = 50  # attempts to reach the coordinator before giving up
+
+# constructor arguments recorded in the spec of each known player class
+PLAYER_ARGS = {
+    "game_agent.CustomPlayer": {
+        "search_depth": "search_depth", "iterative": "iterative", "method": "method",
+        "timeout": "TIMER_THRESHOLD", "opening_moves": "opening_moves",
+        "history": "history", "extension_budget": "extension_budget",
+        "reduce_after": "reduce_after", "gc_control": "gc_control"},
+    "sample_players.GreedyPlayer": {},
+    "sample_players.RandomPlayer": {},
+}
+# score function objects that can be described, see `score_spec()`
+SCORE_CLASSES = ["game_agent.PhaseScore"]
+
+
+def _qualified_name(obj):
+    return "{}.{}".format(obj.__module__, obj.__qualname__)
+
+
+def _resolve(name):
+    module, _, attr = name.rpartition(".")
+    return getattr(importlib.import_module(module), attr)
+
+
+def agent_spec(player):
+    """
+    Describe a player as a JSON-serializable dict that `make_player()` can
+    turn back into an equivalent player, e.g.
+
+        {"class": "game_agent.CustomPlayer",
+         "args": {"score_fn": "sample_players.improved_score", "search_depth": 5, ...}}
+
+    A `movecache.CachedPlayer` is described by the player it wraps, which
+    plays the same moves.
+
+    Raises ValueError for players that cannot be described this way.
+    """
+    if isinstance(player, CachedPlayer):
+        player = player.player
+    name = _qualified_name(type(player))
+    if name not in PLAYER_ARGS:
+        raise ValueError("cannot describe a {} player".format(name))
+    if getattr(player, "endgame", None) is not None:
+        raise ValueError("players using an endgame table cannot be described")
+    if getattr(player, "batch_score", None) is not None:
+        raise ValueError("players using a batch score function cannot be described")
+    if getattr(player, "prior", None) is not None:
+        raise ValueError("players using a move prior cannot be described")
+    args = {arg: getattr(player, attr) for arg, attr in PLAYER_ARGS[name].items()}
+    if getattr(player, "score", None) is not None:
+        args["score_fn"] = score_spec(player.score)
+    spec = {"class": name, "args": args}
+    try:
+        json.dumps(spec)
+    except TypeError as e:
+        raise ValueError("cannot describe {}: {}".format(name, e))
+    return spec
+
+
+def make_player(spec):
+    """Create a player from a spec returned by `agent_spec()`."""
+    args = dict(spec["args"])
+    if "score_fn" in args:
+        args["score_fn"] = make_score(args["score_fn"])
+    return _resolve(spec["class"])(**args)
+
+
+def score_spec(score):
+    """
+    Describe a score function as a JSON-serializable value that
+    `make_score()` can turn back into an equivalent function: the qualified
+    name of a module-level function, or for a `game_agent.PhaseScore`
+    (without an endgame table) a dict such as
+
+        {"class": "game_agent.PhaseScore",
+         "args": {"cheap_fn": "game_agent.balanced_score",
+                  "rollout_fn": "game_agent.mcs_score",
+                  "thresholds": [[5, 5, 10, 4]]}}
+
+    where each threshold is [width, height, rollout_blanks, exact_blanks].
+
+    Raises ValueError for score functions that cannot be described this way.
+    """
+    if inspect.isfunction(score):
+        return _qualified_name(score)
+    name = _qualified_name(type(score))
+    if name not in SCORE_CLASSES:
+        raise ValueError("cannot describe a {} score function".format(name))
+    if score.endgame is not None:
+        raise ValueError("score functions using an endgame table cannot be described")
+    thresholds = [list(size) + list(blanks) for size, blanks in sorted(score.thresholds.items())]
+    return {"class": name, "args": {"cheap_fn": score_spec(score.cheap_fn),
+                                    "rollout_fn": score_spec(score.rollout_fn),
+                                    "thresholds": thresholds}}
+
+
+def make_score(spec):
+    """Create a score function from a spec returned by `score_spec()`."""
+    if not isinstance(spec, dict):
+        return _resolve(spec)
+    args = spec["args"]
+    thresholds = {(width, height): (rollout_blanks, exact_blanks)
+                  for width, height, rollout_blanks, exact_blanks in args["thresholds"]}
+    return _resolve(spec["class"])(cheap_fn=make_score(args["cheap_fn"]),
+                                   rollout_fn=make_score(args["rollout_fn"]),
+                                   thresholds=thresholds)
+
+
+def clock_spec(clock):
+    """Describe a clock from `isolation.clocks` (None for the wall clock)."""
+    if isinstance(clock, NodeClock):
+        return {"type": "nodes", "nodes_per_milli": clock.nodes_per_milli}
+    if isinstance(clock, CpuClock):
+        return {"type": "cpu"}
+    return {"type": "wall"}
+
+
+def make_clock(spec):
+    """Create a clock from a spec returned by `clock_spec()`."""
+    if spec["type"] == "nodes":
+        return NodeClock(spec["nodes_per_milli"])
+    if spec["type"] == "cpu":
+        return CpuClock()
+    return WallClock()
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """Serve one worker connection."""
+
+    def handle(self):
+        self.leased = set()
+        try:
+            for line in self.rfile:
+                request = json.loads(line.decode())
+                response = self.server.coordinator.dispatch(request, self.leased)
+                self.wfile.write((json.dumps(response) + "\n").encode())
+                self.wfile.flush()
+        except ConnectionError:
+            pass
+        finally:
+            # jobs held by a worker that went away are handed out again
+            self.server.coordinator.release(self.leased)
+
+
+class ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Coordinator():
+    """Queue of match jobs served to workers over TCP.
+
+    Parameters
+    ----------
+    address : (str, int)
+        The (host, port) pair to listen on; use port 0 to pick a free port.
+        The address actually bound is available as `server_address`.
+
+    lease_timeout : float (optional)
+        Seconds a worker may hold a job before it is handed out again.
+
+    seed : int (optional)
+        Seed of the random openings of matches that have no seed of their
+        own; by default every run plays different openings.
+    """
+
+    def __init__(self, address, lease_timeout=LEASE_TIMEOUT, seed=None):
+        self.lease_timeout = lease_timeout
+        self.rng = random.Random(seed)
+        self.lock = threading.Condition()
+        self.jobs = {}  # job id -> job message
+        self.pending = []  # job ids waiting for a worker
+        self.leases = {}  # job id -> lease deadline
+        self.results = {}  # job id -> result message
+        self.retries = 0
+        self._ids = itertools.count()
+        self.server = ThreadingTCPServer(address, JobHandler)
+        self.server.coordinator = self
+        self.server_address = self.server.server_address
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def dispatch(self, request, leased):
+        with self.lock:
+            if request["type"] == "job":
+                self.expire_leases()
+                if not self.pending:
+                    return {"type": "wait"}
+                job_id = self.pending.pop(0)
+                self.leases[job_id] = time.time() + self.lease_timeout
+                leased.add(job_id)
+                return self.jobs[job_id]
+
+            if request["type"] == "result":
+                job_id = request["id"]
+                leased.discard(job_id)
+                if job_id in self.jobs and job_id not in self.results:
+                    self.results[job_id] = request
+                    self.leases.pop(job_id, None)
+                    if job_id in self.pending:
+                        self.pending.remove(job_id)
+                    self.lock.notify_all()
+                return {"type": "ok"}
+
+        return {"type": "error", "message": "unknown request type {!r}".format(request["type"])}
+
+    def expire_leases(self):
+        now = time.time()
+        for job_id, deadline in list(self.leases.items()):
+            if deadline < now:
+                self.requeue(job_id)
+
+    def release(self, job_ids):
+        """Hand out again the unfinished jobs of a worker that disconnected."""
+        with self.lock:
+            for job_id in job_ids:
+                if job_id in self.leases:
+                    self.requeue(job_id)
+
+    def requeue(self, job_id):
+        del self.leases[job_id]
+        if job_id not in self.results and job_id not in self.pending:
+            self.pending.insert(0, job_id)
+            self.retries += 1
+
+    def play(self, tasks):
+        """
+        Play matches given as (player1, player2, width, height, clock, seed)
+        tuples on the workers and return (score_1, score_2, timings_1, timings_2)
+        for each, in order (see `tournament.MatchPool`).
+        """
+        import tournament
+
+        # describe every task first, so an agent that cannot be described
+        # fails the call before any job is queued
+        specs = [(agent_spec(player1), agent_spec(player2), clock_spec(clock))
+                 for player1, player2, _, _, clock, _ in tasks]
+        ids = []
+        with self.lock:
+            for (spec1, spec2, clock), (_, _, width, height, _, seed) in zip(specs, tasks):
+                if seed is None:
+                    seed = self.rng.getrandbits(32)
+                job_id = next(self._ids)
+                self.jobs[job_id] = {
+                    "type": "job", "id": job_id, "player1": spec1, "player2": spec2,
+                    "width": width, "height": height, "clock": clock, "seed": seed,
+                    "time_limit": tournament.TIME_LIMIT}
+                self.pending.append(job_id)
+                ids.append(job_id)
+            while not all(job_id in self.results for job_id in ids):
+                self.lock.wait(1.)
+                self.expire_leases()
+            results = [self.results.pop(job_id) for job_id in ids]
+            for job_id in ids:
+                del self.jobs[job_id]
+        return [(r["scores"][0], r["scores"][1], r["timings"][0], r["timings"][1])
+                for r in results]
+
+
+def play_job(job):
+    """Play a match job and return the result message."""
+    import tournament
+
+    tournament.TIME_LIMIT = job["time_limit"]
+    timings = ([], [])
+    scores = tournament.play_match(make_player(job["player1"]), make_player(job["player2"]),
+                                   job["width"], job["height"], make_clock(job["clock"]),
+                                   timings, job["seed"])
+    return {"type": "result", "id": job["id"], "scores": list(scores),
+            "timings": list(timings)}
+
+
+def work(address, max_jobs=None):
+    """
+    Take jobs from the coordinator at `address` until it goes away (or
+    `max_jobs` jobs have been played).
+    """
+    for _ in range(CONNECT_RETRIES):
+        try:
+            sock = socket.create_connection(address)
+            break
+        except ConnectionError:
+            time.sleep(POLL_INTERVAL)
+    else:
+        return
+    reader = sock.makefile("rb")
+
+    def request(message):
+        sock.sendall((json.dumps(message) + "\n").encode())
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("the coordinator closed the connection")
+        return json.loads(line.decode())
+
+    played = 0
+    try:
+        while max_jobs is None or played < max_jobs:
+            job = request({"type": "job"})
+            if job["type"] == "wait":
+                time.sleep(POLL_INTERVAL)
+                continue
+            request(play_job(job))
+            played += 1
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        reader.close()
+        sock.close()
+
+
+def parse_address(text):
+    """Parse a HOST:PORT address."""
+    host, _, port = text.rpartition(":")
+    return host or "localhost", int(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play tournament matches for a coordinator.")
+    parser.add_argument("--connect", type=parse_address, required=True,
+                        metavar="HOST:PORT", help="address of the coordinator")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes to run (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    workers = [multiprocessing.Process(target=work, args=(args.connect,))
+               for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+This file contains test cases for the distributed tournament in
+`distributed.py`.
+"""
+import json
+import multiprocessing
+import multiprocessing.pool
+import socket
+import unittest
+
+import distributed
+import tournament
+
+from isolation import NodeClock
+from game_agent import CustomPlayer
+from game_agent import PhaseScore
+from movecache import CachedPlayer
+from movecache import MoveCache
+from sample_players import GreedyPlayer
+from sample_players import RandomPlayer
+from sample_players import improved_score
+from tablebase import PerfectPlayer
+from tournament import Agent
+
+
+class DistributedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.coordinator = distributed.Coordinator(("localhost", 0), seed=0)
+        self.workers = []
+
+    def tearDown(self):
+        self.coordinator.close()
+        for worker in self.workers:
+            worker.terminate()
+            worker.join()
+
+    def start_workers(self, count):
+        for _ in range(count):
+            worker = multiprocessing.Process(target=distributed.work,
+                                             args=(self.coordinator.server_address,))
+            worker.start()
+            self.workers.append(worker)
+
+    def connect(self):
+        sock = socket.create_connection(self.coordinator.server_address)
+        reader = sock.makefile("rb")
+
+        def request(message):
+            sock.sendall((json.dumps(message) + "\n").encode())
+            return json.loads(reader.readline().decode())
+        return sock, reader, request
+
+    def test_agent_spec(self):
+        """ Test that agents are rebuilt with the same configuration """
+        players = [RandomPlayer(), GreedyPlayer(score_fn=improved_score),
+                   CustomPlayer(score_fn=improved_score, method="alphabeta", search_depth=4,
+                                iterative=False, history=True, reduce_after=3)]
+        for player in players:
+            spec = distributed.agent_spec(player)
+            copy = distributed.make_player(json.loads(json.dumps(spec)))
+            self.assertEqual(type(copy).__name__, type(player).__name__)
+            self.assertEqual(vars(copy).keys(), vars(player).keys())
+            self.assertEqual(distributed.agent_spec(copy), spec)
+        self.assertRaises(ValueError, distributed.agent_spec, CustomPlayer(endgame=object()))
+
+        # a cached player is described by the player it wraps
+        player = CustomPlayer(score_fn=improved_score, search_depth=2, iterative=False)
+        self.assertEqual(distributed.agent_spec(CachedPlayer(player, MoveCache())),
+                         distributed.agent_spec(player))
+
+    def test_roster(self):
+        """ Test that workers play every agent of the tournament """
+        agents = tournament.make_roster() + tournament.make_test_agents(extra=True)
+        for agent in agents:
+            spec = distributed.agent_spec(agent.player)
+            copy = distributed.make_player(json.loads(json.dumps(spec)))
+            self.assertEqual(distributed.agent_spec(copy), spec)
+        scorer = distributed.make_player(distributed.agent_spec(
+            CustomPlayer(score_fn=PhaseScore(thresholds={(5, 5): (10, 4)})))).score
+        self.assertEqual(scorer.blank_thresholds(5, 5), (10, 4))
+        self.assertRaises(ValueError, distributed.agent_spec,
+                          CustomPlayer(score_fn=PhaseScore(endgame=object())))
+
+        opponent = RandomPlayer()
+        tasks = [(agent.player, opponent, 5, 5, NodeClock(100.), seed)
+                 for seed, agent in enumerate(agents)]
+        self.start_workers(2)
+        results = self.coordinator.play(tasks)
+        self.assertEqual([score_1 + score_2 for score_1, score_2, _, _ in results],
+                         [2] * len(tasks))
+
+    def test_cached_round(self):
+        """ Test that workers play cached players, and that undescribable
+        players are rejected before any job is queued """
+        cache = MoveCache()
+        agents = [Agent(RandomPlayer(), "Random"),
+                  Agent(CachedPlayer(CustomPlayer(score_fn=improved_score, search_depth=2,
+                                                  method="alphabeta", iterative=False),
+                                     cache), "AB_Improved")]
+        self.start_workers(1)
+        win_ratio = tournament.play_round(agents, 1, 5, 5, NodeClock(100.), self.coordinator)
+        self.assertTrue(0 <= win_ratio <= 100)
+
+        tasks = [(agents[0].player, GreedyPlayer(), 5, 5, None, None),
+                 (PerfectPlayer(None), GreedyPlayer(), 5, 5, None, None)]
+        self.assertRaises(ValueError, self.coordinator.play, tasks)
+        self.assertEqual((self.coordinator.jobs, self.coordinator.pending), ({}, []))
+        self.assertEqual(len(self.coordinator.play(tasks[:1])), 1)
+
+    def play(self, tasks):
+        """Submit tasks from another thread, as `Coordinator.play()` blocks."""
+        pool = multiprocessing.pool.ThreadPool(1)
+        self.addCleanup(pool.close)
+        return pool.apply_async(self.coordinator.play, (tasks,))
+
+    def test_round(self):
+        """ Test that workers play every match of a round """
+        agents = [Agent(RandomPlayer(), "Random"), Agent(GreedyPlayer(), "Greedy"),
+                  Agent(CustomPlayer(score_fn=improved_score, search_depth=2,
+                                     method="alphabeta", iterative=False), "AB_Improved")]
+        tasks = [(a.player, b.player, 5, 5, NodeClock(100.), None)
+                 for a in agents for b in agents if a is not b]
+        self.start_workers(3)
+        results = self.coordinator.play(tasks)
+        self.assertEqual(len(results), len(tasks))
+        for score_1, score_2, times_1, times_2 in results:
+            self.assertEqual(score_1 + score_2, 2)
+            self.assertTrue(times_1 and times_2)
+        self.assertEqual(self.coordinator.jobs, {})
+
+        win_ratio = tournament.play_round(agents, 1, 5, 5, NodeClock(100.), self.coordinator)
+        self.assertTrue(0 <= win_ratio <= 100)
+
+    def test_retry(self):
+        """ Test that the job of a disconnected worker is played again and
+        that duplicate results are ignored """
+        tasks = [(RandomPlayer(), GreedyPlayer(), 5, 5, NodeClock(100.), None)] * 2
+        pending = self.play(tasks)
+        sock, reader, request = self.connect()
+        job = request({"type": "job"})
+        while job["type"] == "wait":
+            job = request({"type": "job"})
+        reader.close()
+        sock.close()
+
+        self.start_workers(1)
+        results = pending.get(timeout=60)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(self.coordinator.retries, 1)
+
+        # the job carries its seed, so playing it again gives the same result
+        result = distributed.play_job(job)
+        self.assertEqual(tuple(result["scores"]), results[0][:2])
+
+        # a late result for a finished job is acknowledged and dropped
+        sock, reader, request = self.connect()
+        self.assertEqual(request(result), {"type": "ok"})
+        self.assertNotIn(job["id"], self.coordinator.results)
+        reader.close()
+        sock.close()
+
+    def test_lease_timeout(self):
+        """ Test that a job is handed out again when its lease expires """
+        self.coordinator.lease_timeout = 0.
+        pending = self.play([(RandomPlayer(), RandomPlayer(), 5, 5, None, None)])
+        sock, reader, request = self.connect()
+        first = request({"type": "job"})
+        while first["type"] == "wait":
+            first = request({"type": "job"})
+        second = request({"type": "job"})
+        self.assertEqual(second["id"], first["id"])
+
+        # both workers answer; the first result wins
+        self.assertEqual(request(distributed.play_job(first)), {"type": "ok"})
+        self.assertEqual(request(distributed.play_job(second)), {"type": "ok"})
+        self.assertEqual(len(pending.get(timeout=60)), 1)
+        reader.close()
+        sock.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,294 @@
+"""
+Build and probe on-disk tables of solved Isolation endgames.
+
+An endgame table stores the exact result (win or loss for the player to
+move) of positions where both players are on the board and at most
+`max_blanks` blank squares can still be reached by either of them, which
+covers both positions with few blanks and positions where the players are
+separated into small regions. Blank squares that neither player can reach
+never affect the result, so positions are keyed by the reachable blanks and
+the player locations only, in a canonical encoding that is invariant under
+the symmetries of the board (reflections, plus transposition for square
+boards). Each class of equivalent positions is stored once.
+
+The table file is a header followed by the sorted fixed-size keys and then
+one result byte per key. `EndgameTable` memory-maps the file and looks keys
+up by binary search, so probing touches only a few pages and the same file
+can be shared by any number of players and processes through the OS page
+cache.
+
+Usage:
+
+    python endgame.py --size 7 --max-blanks 14 --games 200   # build a table
+"""
+
+import argparse
+import hashlib
+import mmap
+import random
+import struct
+
+from isolation import Board
+from isolation.isolation import knight_tables
+
+MAGIC = b"ISOE"
+# magic, width, height, max_blanks, key size, smallest move count, count
+HEADER = struct.Struct("<4sHHHHHQ")
+TABLE_FILE = "endgame.egtb"  # default location of the table
+MAX_BLANKS = 14
+NUM_GAMES = 200
+
+_symmetries = {}
+
+
+def symmetries(width, height):
+    """
+    Return the cell permutations of the board symmetries for a board size.
+    Cells are numbered as in `isolation.Board` (row + col * height); each
+    permutation is a list mapping a cell to its image.
+    """
+    key = (width, height)
+    if key not in _symmetries:
+        transforms = [lambda r, c: (r, c),
+                      lambda r, c: (height - 1 - r, c),
+                      lambda r, c: (r, width - 1 - c),
+                      lambda r, c: (height - 1 - r, width - 1 - c)]
+        if width == height:
+            transforms += [lambda r, c, t=t: t(c, r) for t in transforms]
+        _symmetries[key] = [[r + c * height for r, c in
+                             (t(i % height, i // height) for i in range(width * height))]
+                            for t in transforms]
+    return _symmetries[key]
+
+
+def key_size(width, height):
+    """Return the number of bytes in the key of a position."""
+    cells = width * height
+    return (cells + 2 * cells.bit_length() + 7) // 8
+
+
+def reachable_blanks(game, limit=None):
+    """
+    Return the bitmap (over the cell numbering of `isolation.Board`) of the
+    blank squares that either player can still reach by a sequence of
+    knight moves, or None if there are more than `limit` of them.
+    """
+    neighbors = knight_tables(game.width, game.height)[2]
+    height = game.height
+    seen = game.__board_state__
+    frontier = [r + c * height for r, c in (game.get_player_location(game.active_player),
+                                            game.get_player_location(game.inactive_player))]
+    reachable, count = 0, 0
+    while frontier:
+        for n in neighbors[frontier.pop()]:
+            bit = 1 << n
+            if not seen & bit:
+                seen |= bit
+                reachable |= bit
+                frontier.append(n)
+                count += 1
+                if limit is not None and count > limit:
+                    return None
+    return reachable
+
+
+def canonical_key(game, reachable=None):
+    """
+    Return the canonical key of a position with both players on the board,
+    as an int: the bitmap of reachable blank cells (see `reachable_blanks()`)
+    followed by the cells of the active and inactive players, minimized over
+    the board symmetries.
+    """
+    if reachable is None:
+        reachable = reachable_blanks(game)
+    height, cells = game.height, game.width * game.height
+    bits = cells.bit_length()
+    blanks = [i for i in range(cells) if reachable >> i & 1]
+    locations = [r + c * height for r, c in (game.get_player_location(game.active_player),
+                                             game.get_player_location(game.inactive_player))]
+    best = None
+    for perm in symmetries(game.width, height):
+        key = (perm[locations[0]] << bits | perm[locations[1]]) << cells
+        for i in blanks:
+            key |= 1 << perm[i]
+        if best is None or key < best:
+            best = key
+    return best
+
+
+def solve(game, results):
+    """
+    Solve a position exactly by negamax search.
+
+    Parameters
+    ----------
+    game : `isolation.Board`
+        A position with both players on the board; it is restored before
+        returning.
+
+    results : dict
+        Known results, keyed by `canonical_key()`; every position solved
+        during the search is added to it.
+
+    Returns
+    ----------
+    bool
+        True if the player to move wins with perfect play.
+    """
+    key = canonical_key(game)
+    if key in results:
+        return results[key]
+    win = False
+    for move in game.get_legal_moves():
+        game.apply_move(move)
+        win = not solve(game, results)
+        game.undo_move()
+        if win:
+            break
+    results[key] = win
+    return win
+
+
+def write_table(path, width, height, max_blanks, results, min_move_count=2):
+    """
+    Write solved positions (canonical key -> bool) to a table file.
+    `min_move_count` is the smallest move count of any stored position;
+    positions earlier in the game are not looked up.
+    """
+    size = key_size(width, height)
+    keys = sorted(results)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, width, height, max_blanks, size,
+                            min_move_count, len(keys)))
+        for key in keys:
+            f.write(key.to_bytes(size, "big"))
+        f.write(bytes(results[key] for key in keys))
+
+
+def build_table(path, width=7, height=7, max_blanks=MAX_BLANKS,
+                num_games=NUM_GAMES, seed=0):
+    """
+    Solve the endgames reached by seeded random games and write them to a
+    table file.
+
+    Each game is played at random until at most `max_blanks` blank squares
+    are reachable by the players, and that position is then solved exactly;
+    all of the positions visited by the solver are stored.
+
+    Returns
+    ----------
+    int
+        The number of positions in the table.
+    """
+    rng = random.Random(seed)
+    results = {}
+    min_move_count = width * height
+    for _ in range(num_games):
+        game = Board("player1", "player2", width, height)
+        while game.get_legal_moves():
+            if game.move_count >= 2 and reachable_blanks(game, max_blanks) is not None:
+                solve(game, results)
+                min_move_count = min(min_move_count, game.move_count)
+                break
+            game.apply_move(rng.choice(game.get_legal_moves()))
+    write_table(path, width, height, max_blanks, results, min_move_count)
+    return len(results)
+
+
+class EndgameTable():
+    """Read-only, memory-mapped endgame table.
+
+    Parameters
+    ----------
+    path : str
+        Location of a table file written by `write_table()`.
+
+    Attributes
+    ----------
+    width, height : int
+        The board size the table was built for.
+
+    max_blanks : int
+        Positions where the players can reach more blank squares than this
+        are never in the table.
+
+    min_move_count : int
+        Positions with a smaller move count are never in the table.
+    """
+
+    def __init__(self, path=TABLE_FILE):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.width, self.height, self.max_blanks, self.key_size,
+         self.min_move_count, self.count) = HEADER.unpack_from(self.mm)
+        if magic != MAGIC:
+            raise ValueError("{} is not an endgame table".format(path))
+        self.values = HEADER.size + self.count * self.key_size
+
+    def __len__(self):
+        return self.count
+
+    def config_key(self):
+        """Identify the table by a hash of its contents (see
+        `movecache.describe()`)."""
+        if not hasattr(self, "digest"):
+            self.digest = hashlib.sha256(self.mm).hexdigest()
+        return {"sha256": self.digest}
+
+    def close(self):
+        self.mm.close()
+
+    def probe(self, game):
+        """
+        Look up the result of a position.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            The position to look up.
+
+        Returns
+        ----------
+        bool or None
+            True if the player to move wins, False if it loses, or None if
+            the position is not in the table.
+        """
+        if game.move_count < self.min_move_count or \
+                (game.width, game.height) != (self.width, self.height):
+            return None
+        reachable = reachable_blanks(game, self.max_blanks)
+        if reachable is None:
+            return None
+        key = canonical_key(game, reachable).to_bytes(self.key_size, "big")
+        mm, size = self.mm, self.key_size
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = HEADER.size + mid * size
+            found = mm[start:start + size]
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                return mm[self.values + mid] == 1
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--out", default=TABLE_FILE,
+                        help="table file (default: %(default)s)")
+    parser.add_argument("--size", type=int, default=7)
+    parser.add_argument("--max-blanks", type=int, default=MAX_BLANKS)
+    parser.add_argument("--games", type=int, default=NUM_GAMES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    count = build_table(args.out, args.size, args.size, args.max_blanks,
+                        args.games, args.seed)
+    print("Wrote {} positions to {}".format(count, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+This file contains test cases for the endgame tables in `endgame.py`.
+"""
+import os
+import random
+import tempfile
+import unittest
+
+import endgame
+import game_agent
+import sample_players
+
+from benchmark import random_game
+from isolation import Board
+
+
+def endgame_positions(width, height, max_blanks, count, seed=0,
+                      players=("player1", "player2")):
+    """Return seeded random positions where the players can reach at most
+    `max_blanks` blank squares, as played by `endgame.build_table()`."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        for game in random_game(rng, width, height, players):
+            if not game.get_legal_moves():
+                break
+            if game.move_count >= 2 and endgame.reachable_blanks(game, max_blanks) is not None:
+                positions.append(game)
+                break
+    return positions
+
+
+def transposed(game):
+    """Return a copy of a square board reflected about its main diagonal."""
+    other = Board(game.__player_1__, game.__player_2__, game.height, game.width)
+    for move in game.get_move_sequence():
+        other.apply_move(move[::-1])
+    return other
+
+
+class EndgameTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "test.egtb")
+        self.count = endgame.build_table(self.path, 5, 5, max_blanks=10, num_games=20)
+        self.table = endgame.EndgameTable(self.path)
+
+    def tearDown(self):
+        self.table.close()
+        os.remove(self.path)
+
+    def test_canonical_key(self):
+        """ Test that symmetric positions share a key """
+        for game in endgame_positions(5, 5, 12, 10):
+            self.assertEqual(endgame.canonical_key(game), endgame.canonical_key(transposed(game)))
+
+    def test_probe(self):
+        """ Test table lookups against a direct solve """
+        self.assertEqual(len(self.table), self.count)
+        found = 0
+        for game in endgame_positions(5, 5, 10, 50):
+            result = self.table.probe(game)
+            if result is not None:
+                found += 1
+                self.assertEqual(result, endgame.solve(game.copy(), {}))
+                self.assertEqual(self.table.probe(transposed(game)), result)
+        self.assertTrue(found)
+        self.assertIsNone(self.table.probe(Board("player1", "player2", 5, 5)))
+        self.assertIsNone(self.table.probe(Board("player1", "player2")))
+
+    def test_config_key(self):
+        """ Test that tables are identified by their contents """
+        other = endgame.EndgameTable(self.path)
+        self.assertEqual(other.config_key(), self.table.config_key())
+        other.close()
+        path = os.path.join(os.path.dirname(self.path), "other.egtb")
+        endgame.build_table(path, 5, 5, max_blanks=8, num_games=20)
+        other = endgame.EndgameTable(path)
+        self.assertNotEqual(other.config_key(), self.table.config_key())
+        other.close()
+        os.remove(path)
+
+    def test_player(self):
+        """ Test that a player probing the table keeps won endgames won """
+        player = game_agent.CustomPlayer(score_fn=sample_players.improved_score,
+                                         method="alphabeta", endgame=self.table)
+        won = 0
+        for game in endgame_positions(5, 5, 11, 40, seed=2, players=(player, "opponent")):
+            if game.active_player is player and endgame.solve(game.copy(), {}):
+                won += 1
+                move = player.get_move(game.copy(), game.get_legal_moves(), lambda: 1000.)
+                self.assertFalse(endgame.solve(game.forecast_move(move), {}))
+        self.assertTrue(won)
+
+
+if __name__ == '__main__':
+    unittest.main()
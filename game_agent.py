@@ -6,14 +6,27 @@ augment the test suite with your own test cases to further test your code.
 You must test your agent's strength against a set of agents with known
 relative strength using tournament.py and include the results in your report.
 """
+import gc
+import heapq
 import random
 import sample_players
+from collections import namedtuple
 from random import randint
 
+from isolation import Board
+from isolation import WallClock
+
 class Timeout(Exception):
     """Subclass base exception for code clarity."""
     pass
 
+# a candidate move of `CustomPlayer.analyze()`: its score and the principal
+# variation starting with it
+Line = namedtuple("Line", ["score", "moves"])
+
+# the result of one completed depth of `CustomPlayer.analyze()`
+Analysis = namedtuple("Analysis", ["depth", "lines", "nodes"])
+
 def mcs(game, player, max_sims, max_time, stage=0):
     wins = 0
     sims = 0
@@ -38,8 +51,8 @@ def mcs(game, player, max_sims, max_time, stage=0):
 
 def mcs_score(game, player):
     opponent = game.get_opponent(player)
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(opponent))
+    own_moves = game.mobility(player)
+    opp_moves = game.mobility(opponent)
 
     if own_moves == 0 and game.active_player == player:
         return float("-inf")
@@ -52,8 +65,8 @@ def mcs_score(game, player):
 
 def aggressive_score(game, player):
     opponent = game.get_opponent(player)
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(opponent))
+    own_moves = game.mobility(player)
+    opp_moves = game.mobility(opponent)
 
     if own_moves == 0 and game.active_player == player:
         return float("-inf")
@@ -67,8 +80,8 @@ def aggressive_score(game, player):
 
 def balanced_score(game, player):
     opponent = game.get_opponent(player)
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(opponent))
+    own_moves = game.mobility(player)
+    opp_moves = game.mobility(opponent)
 
     if own_moves == 0 and game.active_player == player:
         return float("-inf")
@@ -80,6 +93,19 @@ def balanced_score(game, player):
 
     return float(own_moves) * (blank_spaces - opp_moves)
 
+def central_moves(game, moves, limit):
+    """Return the `limit` moves closest to the center of the board.
+
+    On large boards a player that has not been placed yet may move to any
+    blank square, which makes the opening plies of the search tree hundreds
+    of moves wide. Central squares have the most knight moves available, so
+    they are the natural candidates to keep.
+    """
+    center_row = (game.height - 1) / 2.
+    center_col = (game.width - 1) / 2.
+    return heapq.nsmallest(limit, moves, key=lambda m: (m[0] - center_row) ** 2 +
+                                                      (m[1] - center_col) ** 2)
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -104,6 +130,88 @@ def custom_score(game, player):
     """
     return mcs_score(game, player)
 
+class PhaseScore:
+    """Score function that picks a heuristic by the phase of the game.
+
+    Rollouts (`mcs_score`) judge crowded boards far better than mobility
+    counts but cost orders of magnitude more per position, which costs
+    several plies of search depth while the board is open. A `PhaseScore`
+    uses a cheap heuristic while many squares are blank, rollouts once the
+    number of blank squares drops to `rollout_blanks`, and exact results
+    from an endgame table (falling back to rollouts for positions not in
+    the table) once it drops to `exact_blanks`.
+
+    Parameters
+    ----------
+    cheap_fn : callable (optional)
+        The heuristic of the open midgame.
+
+    rollout_fn : callable (optional)
+        The heuristic of the late midgame and of unsolved endgames.
+
+    endgame : `endgame.EndgameTable` (optional)
+        A table of solved endgames for the exact phase.
+
+    thresholds : dict<(int, int), (int, int)> (optional)
+        The (rollout_blanks, exact_blanks) thresholds for each (width,
+        height) board size; other sizes use the `PHASE_FRACTIONS` of the
+        board area.
+
+    Attributes
+    ----------
+    calls : dict<str, int>
+        The number of positions scored in each of the `PHASES`.
+    """
+
+    PHASES = ("cheap", "rollout", "exact")
+    PHASE_FRACTIONS = (0.4, 0.2)  # default thresholds as fractions of the area
+
+    def __init__(self, cheap_fn=balanced_score, rollout_fn=mcs_score, endgame=None,
+                 thresholds=None):
+        self.cheap_fn = cheap_fn
+        self.rollout_fn = rollout_fn
+        self.endgame = endgame
+        self.thresholds = dict(thresholds or {})
+        self.calls = dict.fromkeys(self.PHASES, 0)
+        self.default_thresholds = {}  # thresholds of other sizes, by size
+
+    def config_key(self):
+        """Return the settings that decide the scores (see `movecache.describe()`)."""
+        return {"cheap_fn": self.cheap_fn, "rollout_fn": self.rollout_fn,
+                "endgame": self.endgame, "thresholds": self.thresholds}
+
+    def blank_thresholds(self, width, height):
+        """Return the (rollout_blanks, exact_blanks) thresholds of a board size."""
+        if (width, height) in self.thresholds:
+            return self.thresholds[(width, height)]
+        if (width, height) not in self.default_thresholds:
+            area = width * height
+            self.default_thresholds[(width, height)] = tuple(
+                int(f * area) for f in self.PHASE_FRACTIONS)
+        return self.default_thresholds[(width, height)]
+
+    def phase(self, game):
+        """Return the name of the phase of `game`."""
+        rollout_blanks, exact_blanks = self.blank_thresholds(game.width, game.height)
+        # every move blocks one square
+        blanks = game.width * game.height - game.move_count
+        if blanks > rollout_blanks:
+            return "cheap"
+        if blanks > exact_blanks:
+            return "rollout"
+        return "exact"
+
+    def __call__(self, game, player):
+        name = self.phase(game)
+        self.calls[name] += 1
+        if name == "cheap":
+            return self.cheap_fn(game, player)
+        if name == "exact" and self.endgame is not None:
+            win = self.endgame.probe(game)
+            if win is not None:
+                return float("inf") if win == (game.active_player is player) else float("-inf")
+        return self.rollout_fn(game, player)
+
 class CustomPlayer:
     """Game-playing agent that chooses a move using your evaluation function
     and a depth-limited minimax algorithm with alpha-beta pruning. You must
@@ -132,16 +240,166 @@ class CustomPlayer:
         Time remaining (in milliseconds) when search is aborted. Should be a
         positive value large enough to allow the function to return before the
         timer expires.
+
+    opening_moves : int (optional)
+        If set, nodes where the player to move has not been placed yet (and
+        may therefore move to any blank square) only search this many of the
+        most central squares. Recommended for boards larger than 7x7.
+
+    history : boolean (optional)
+        Flag indicating whether alpha-beta search should order moves using
+        the history heuristic and countermove tables. The tables persist
+        across turns (decayed by `HISTORY_DECAY` at each move) and are
+        cleared at the start of every game.
+
+    extension_budget : int (optional)
+        The maximum number of plies alpha-beta search may add to any line of
+        play beyond the nominal depth. A leaf is searched one ply further
+        (instead of being scored) when either player has at most
+        `EXTENSION_MOBILITY` moves, so knight traps just past the horizon
+        are resolved before the position is evaluated.
+
+    reduce_after : int (optional)
+        If set, alpha-beta search applies late move reductions: at nodes with
+        at least `LMR_MIN_DEPTH` plies left, every move after the first
+        `reduce_after` is first searched `LMR_REDUCTION` plies shallower with
+        a null window, and only searched again at full depth if it might
+        improve on the best move so far. Most effective with `history=True`,
+        which moves the likely best moves to the front.
+
+    endgame : `endgame.EndgameTable` (optional)
+        A table of solved endgames. Alpha-beta search looks up every child
+        position with few enough blank squares, and children found in the
+        table are scored as won or lost without being searched.
+
+    gc_control : boolean (optional)
+        Flag indicating whether to keep the cyclic garbage collector from
+        running during the search. The collector is disabled for the whole
+        of get_move(), which collects the youngest generation (the garbage
+        of the search) just before returning. When playing with
+        `Board.play(delta=True)`, every generation is also collected in
+        observe_move(), outside of the move timer; new_game() also moves
+        every object alive at the start of the game (move tables, caches,
+        modules) to the permanent generation with `gc.freeze()`, so those
+        collections only scan what the game allocates. Objects frozen for
+        the previous game are unfrozen first, so the permanent generation
+        does not keep the garbage of earlier games.
+
+    prior : callable (optional)
+        A function `prior(game, moves)` returning a weight for each of the
+        legal moves in `game` (e.g., the policy of `network.Network`).
+        Alpha-beta search tries the moves with the highest weights first at
+        nodes with at least `PRIOR_MIN_DEPTH` plies left, and falls back to
+        the history tables (if enabled) closer to the leaves, where ordering
+        costs more than it saves.
     """
 
+    HISTORY_DECAY = 0.5  # weight of older history scores at each new move
+    EXTENSION_MOBILITY = 2  # leaves with this few moves for a player are extended
+    LMR_MIN_DEPTH = 3  # shallowest remaining depth at which moves are reduced
+    LMR_REDUCTION = 1  # plies removed from the search of a late move
+    PRIOR_MIN_DEPTH = 2  # shallowest remaining depth at which moves follow the prior
+    ANALYSIS_TIME = 1e12  # milliseconds (about 30 years) of an analysis without a limit
+
     def __init__(self, search_depth=3, score_fn=custom_score,
-                 iterative=True, method='minimax', timeout=10.):
+                 iterative=True, method='minimax', timeout=10.,
+                 opening_moves=None, history=False, extension_budget=0,
+                 reduce_after=None, endgame=None, gc_control=False, prior=None):
         self.search_depth = search_depth
         self.iterative = iterative
         self.score = score_fn
         self.method = method
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.opening_moves = opening_moves
+        self.completed_depth = 0  # depth of the last completed search
+        self.timed_out = False  # whether the last search was cut short
+        self.nodes = 0  # nodes visited by the last search
+        self.game = None  # board kept across turns, see new_game()
+        self.history = history
+        self.extension_budget = extension_budget
+        self.reduce_after = reduce_after
+        self.endgame = endgame
+        self.gc_control = gc_control
+        self.prior = prior
+        self.extensions = 0  # plies extended on the line being searched
+        self.pv_table = None  # best move of each position, kept by analyze()
+        self.clear_tables()
+
+    def clear_tables(self):
+        """Forget everything learned by the move ordering tables."""
+        # separate tables for the maximizing (True) and minimizing (False)
+        # layers: history maps a move to its cutoff score and countermoves
+        # maps the previous move to the reply that last caused a cutoff
+        self.history_table = {True: {}, False: {}}
+        self.countermoves = {True: {}, False: {}}
+        self.last_move_count = -1
+
+    def age_tables(self, game):
+        """Decay the history scores before a new move, or clear the tables if
+        `game` is not a continuation of the last game searched."""
+        if game.move_count <= self.last_move_count:
+            self.clear_tables()
+        self.last_move_count = game.move_count
+        for table in self.history_table.values():
+            for m in table:
+                table[m] *= self.HISTORY_DECAY
+
+    def order_moves(self, game, moves, maximizing_player):
+        """Sort moves by countermove first, then by history score."""
+        previous = game.get_player_location(game.inactive_player)
+        countermove = self.countermoves[maximizing_player].get(previous)
+        table = self.history_table[maximizing_player]
+        return sorted(moves, key=lambda m: (m != countermove, -table.get(m, 0.)))
+
+    def record_cutoff(self, game, move, depth, maximizing_player):
+        """Reward a move that caused a cutoff at the given remaining depth."""
+        table = self.history_table[maximizing_player]
+        table[move] = table.get(move, 0.) + depth * depth
+        previous = game.get_player_location(game.inactive_player)
+        self.countermoves[maximizing_player][previous] = move
+
+    def is_critical(self, game):
+        """Return True if either player is close to being trapped in `game`,
+        i.e., its score is likely to change within the next few plies."""
+        return (game.mobility(game.active_player) <= self.EXTENSION_MOBILITY or
+                game.mobility(game.inactive_player) <= self.EXTENSION_MOBILITY)
+
+    def solved_score(self, game):
+        """Return the exact score of `game` from the endgame table, or None
+        if the position has not been solved."""
+        win = self.endgame.probe(game)
+        if win is None:
+            return None
+        return float("inf") if win == (game.active_player is self) else float("-inf")
+
+    def new_game(self, game):
+        """Keep a board for the rest of the game (see `Board.play(delta=True)`).
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            A copy of the board at the start of the match, owned by the player
+            from now on.
+        """
+        self.game = game
+        self.clear_tables()
+        if self.gc_control:
+            gc.unfreeze()
+            gc.collect()
+            gc.freeze()
+
+    def observe_move(self, move):
+        """Apply a move made by either player to the board kept by the player.
+
+        Parameters
+        ----------
+        move : (int, int)
+            The move applied by the active player of the game.
+        """
+        self.game.apply_move(move)
+        if self.gc_control:
+            gc.collect()
 
     def get_move(self, game, legal_moves, time_left):
         """Search for the best move from the available legal moves and return a
@@ -161,7 +419,8 @@ class CustomPlayer:
         ----------
         game : `isolation.Board`
             An instance of `isolation.Board` encoding the current state of the
-            game (e.g., player locations and blocked cells).
+            game (e.g., player locations and blocked cells), or None to use
+            the board kept by the player (see `new_game()`).
 
         legal_moves : list<(int, int)>
             A list containing legal moves. Moves are encoded as tuples of pairs
@@ -178,8 +437,26 @@ class CustomPlayer:
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-
+        if not self.gc_control or not gc.isenabled():
+            return self.search(game, legal_moves, time_left)
+        gc.disable()
+        try:
+            return self.search(game, legal_moves, time_left)
+        finally:
+            gc.collect(0)
+            gc.enable()
+
+    def search(self, game, legal_moves, time_left):
+        """Run the search for get_move(); see get_move() for the parameters."""
+        if game is None:
+            game = self.game
         self.time_left = time_left
+        self.completed_depth = 0
+        self.timed_out = False
+        self.nodes = 0
+        self.extensions = 0
+        if self.history:
+            self.age_tables(game)
 
         # Perform any required initializations, including selecting an initial
         # move from the game board (i.e., an opening book), or returning
@@ -194,25 +471,143 @@ class CustomPlayer:
             # here in order to avoid timeout. The try/except block will
             # automatically catch the exception raised by the search method
             # when the timer gets close to expiring
+            # no line of play can be longer than the number of blank squares,
+            # so deeper iterations would only repeat the last one
+            max_depth = max(1, game.width * game.height - game.move_count)
             if self.iterative:
                 depth = 1
             else:
-                depth = self.search_depth
-            while self.iterative or depth <= self.search_depth:
+                depth = min(self.search_depth, max_depth)
+            while (self.iterative or depth <= self.search_depth) and depth <= max_depth:
                 # print('depth: ', depth)
                 # print('search_depth: ', self.search_depth)
                 if self.method == 'alphabeta':
                     score, best_move = self.alphabeta(game, depth)
                 else: # use minimax by default
                     score, best_move = self.minimax(game, depth)
+                self.completed_depth = depth
                 depth += 1
         except Timeout:
             # Handle any actions required at timeout, if necessary
-            pass
+            self.timed_out = True
 
         # Return the best move from the last completed search iteration
         return best_move
 
+    def analyze(self, game, multi_pv=3, max_depth=None, time_left=None):
+        """Analyze a position by iterative deepening, yielding the best moves
+        found so far after every completed depth.
+
+        The generator can be stopped at any time, either by closing it (or
+        simply no longer iterating over it) or through `time_left`; the last
+        result yielded is then the deepest completed analysis.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            The position to analyze, with this player to move.
+
+        multi_pv : int (optional)
+            The number of best moves to report. Only these moves get exact
+            scores; the others are searched with a window that just proves
+            they are not better.
+
+        max_depth : int (optional)
+            The deepest search to run; by default the analysis continues
+            until the end of the game is in sight.
+
+        time_left : callable (optional)
+            A function returning the number of milliseconds left, as for
+            get_move(); the analysis ends when it falls below the timeout.
+            By default the analysis is given `ANALYSIS_TIME` on the wall
+            clock, i.e., it never times out, while score functions that
+            budget their own time (e.g., `mcs_score`) still see time pass.
+
+        Yields
+        ----------
+        `Analysis`
+            The depth just completed, the best `multi_pv` moves as `Line`
+            tuples (score and principal variation, best first) and the number
+            of nodes searched since the start of the analysis.
+        """
+        if game.active_player is not self:
+            raise ValueError("analyze() needs a position with the player to move")
+        if time_left is None:
+            time_left = WallClock().timer(self.ANALYSIS_TIME)
+        self.time_left = time_left
+        self.completed_depth = 0
+        self.timed_out = False
+        self.nodes = 0
+        self.extensions = 0
+        if self.history:
+            self.age_tables(game)
+
+        order = game.get_legal_moves()
+        if not order:
+            return
+        if self.opening_moves and len(order) > 8:
+            order = central_moves(game, order, self.opening_moves)
+        last_depth = game.width * game.height - game.move_count
+        if max_depth is not None:
+            last_depth = min(last_depth, max_depth)
+
+        try:
+            for depth in range(1, last_depth + 1):
+                self.pv_table = {}
+                scored = []
+                for m in order:
+                    self.nodes += 1
+                    if self.time_left() < self.TIMER_THRESHOLD:
+                        raise Timeout()
+                    # a move only needs an exact score if it can enter the top
+                    # lines, i.e., if it beats the worst of them
+                    top = sorted((score for score, _ in scored), reverse=True)
+                    bound = top[multi_pv - 1] if len(top) >= multi_pv else float("-inf")
+                    scored.append((self.analyze_move(game.forecast_move(m), depth, bound), m))
+                # sorting is stable, so ties keep the order of the last depth
+                scored.sort(key=lambda x: -x[0])
+                order = [m for _, m in scored]
+                lines = [Line(score, self.principal_variation(game, m))
+                         for score, m in scored[:multi_pv]]
+                self.completed_depth = depth
+                yield Analysis(depth, lines, self.nodes)
+                if all(abs(score) == float("inf") for score, _ in scored):
+                    break  # every move is solved
+        except Timeout:
+            self.timed_out = True
+        finally:
+            self.pv_table = None
+
+    def analyze_move(self, child, depth, bound):
+        """Score a child of the root of analyze() with `depth` plies left,
+        exactly if the score is above `bound` and as an upper bound otherwise."""
+        solved = self.endgame is not None and self.solved_score(child)
+        if solved:
+            return solved
+        if depth < 2:
+            if self.extensions < self.extension_budget and self.is_critical(child):
+                self.extensions += 1
+                try:
+                    return self.alphabeta(child, 1, bound, float("inf"), False)[0]
+                finally:
+                    self.extensions -= 1
+            return self.score(child, self)
+        if self.method == 'alphabeta':
+            return self.alphabeta(child, depth - 1, bound, float("inf"), False)[0]
+        return self.minimax(child, depth - 1, False)[0]
+
+    def principal_variation(self, game, move):
+        """Follow the best moves recorded by the last depth of analyze() from
+        `move` in `game`."""
+        moves = [move]
+        game = game.forecast_move(move)
+        while True:
+            move = self.pv_table.get((game.__board_state__, game.__locations__))
+            if move is None or move == (-1, -1):
+                return moves
+            moves.append(move)
+            game = game.forecast_move(move)
+
     def minimax(self, game, depth, maximizing_player=True):
         """Implement the minimax search algorithm as described in the lectures.
 
@@ -244,12 +639,16 @@ class CustomPlayer:
                 to pass the project unit tests; you cannot call any other
                 evaluation function directly.
         """
+        self.nodes += 1
         if self.time_left() < self.TIMER_THRESHOLD:
             raise Timeout()
 
         moves = game.get_legal_moves(game.active_player)
         if not moves:
             return (game.utility(self), (-1, -1))
+        if len(moves) > 8 and self.opening_moves:
+            # more than 8 moves means the player has not been placed yet
+            moves = central_moves(game, moves, self.opening_moves)
 
         if depth < 2:
             scores = [ (self.score(game.forecast_move(m), self), m) for m in moves ]
@@ -257,6 +656,8 @@ class CustomPlayer:
             # recurse
             scores = [ (self.minimax(game.forecast_move(m), depth-1, not maximizing_player)[0], m) for m in moves ]
         best_score = max(scores) if maximizing_player else min(scores)
+        if self.pv_table is not None:
+            self.pv_table[(game.__board_state__, game.__locations__)] = best_score[1]
         # print ('depth: ', depth)
         # print('len(scores): ', len(scores))
         # print('scores: ', scores)
@@ -302,54 +703,80 @@ class CustomPlayer:
                 to pass the project unit tests; you cannot call any other
                 evaluation function directly.
         """
+        self.nodes += 1
         if self.time_left() < self.TIMER_THRESHOLD:
             raise Timeout()
 
-        moves = game.get_legal_moves(game.active_player)
-        if not moves:
-            return (game.utility(self), (-1, -1))
-
-        scores = []
-        if depth < 2:
-            if maximizing_player:
-                for m in moves:
-                    score = self.score(game.forecast_move(m), self)
-                    scores.append((score, m))
-                    if score >= beta:
-                        break;
-                    if score > alpha:
-                        alpha = score
-                best_score = max(scores)
-            else:
-                for m in moves:
-                    score = self.score(game.forecast_move(m), self)
-                    scores.append((score, m))
-                    if score <= alpha:
-                        break
-                    if score < beta:
-                        beta = score
-                best_score = min(scores)
+        if self.opening_moves and game.get_player_location(game.active_player) == Board.NOT_MOVED:
+            moves = central_moves(game, game.get_legal_moves(), self.opening_moves)
         else:
+            # generate the moves lazily so that a cutoff on an early child
+            # never builds the rest of the move list
+            moves = game.iter_legal_moves()
+
+        if self.prior is not None and depth >= self.PRIOR_MIN_DEPTH:
+            moves = list(moves)
+            weights = self.prior(game, moves)
+            moves = [m for _, m in sorted(zip(weights, moves), key=lambda x: -x[0])]
+        elif self.history:
+            moves = self.order_moves(game, moves, maximizing_player)
+
+        reduce_after = self.reduce_after
+        if reduce_after is None or depth < self.LMR_MIN_DEPTH:
+            reduce_after = float("inf")
+
+        best_score = None
+        for i, m in enumerate(moves):
+            child = game.forecast_move(m)
+            # solved scores are infinite, so any solved child is truthy
+            solved = self.endgame is not None and self.solved_score(child)
+            if solved:
+                score = solved
+            elif i >= reduce_after:
+                # late move: a reduced null-window search only proves that
+                # the move does not beat the current bound
+                bound = alpha if maximizing_player else beta
+                score = self.alphabeta(child, depth - 1 - self.LMR_REDUCTION,
+                                       bound, bound, not maximizing_player)[0]
+                if (score > bound) if maximizing_player else (score < bound):
+                    score = self.alphabeta(child, depth-1, alpha, beta, not maximizing_player)[0]
+            elif depth < 2:
+                if self.extensions < self.extension_budget and self.is_critical(child):
+                    self.extensions += 1
+                    try:
+                        score = self.alphabeta(child, 1, alpha, beta, not maximizing_player)[0]
+                    finally:
+                        # a timeout must not leak into the next iteration
+                        self.extensions -= 1
+                else:
+                    score = self.score(child, self)
+            else:
+                score = self.alphabeta(child, depth-1, alpha, beta, not maximizing_player)[0]
+
+            # only a strictly better score replaces the best move: a later
+            # move that fails low may return a bound equal to the best score
+            # while its true score is worse
             if maximizing_player:
-                for m in moves:
-                    score = self.alphabeta(game.forecast_move(m), depth-1, alpha, beta, not maximizing_player)[0]
-                    scores.append((score, m))
-                    if score >= beta:
-                        break;
-                    if score > alpha:
-                        alpha = score
-                best_score = max(scores)
+                if best_score is None or score > best_score[0]:
+                    best_score = (score, m)
+                if score >= beta:
+                    if self.history:
+                        self.record_cutoff(game, m, depth, maximizing_player)
+                    break
+                if score > alpha:
+                    alpha = score
             else:
-                for m in moves:
-                    score = self.alphabeta(game.forecast_move(m), depth-1, alpha, beta, not maximizing_player)[0]
-                    scores.append((score, m))
-                    if score <= alpha:
-                        break
-                    if score < beta:
-                        beta = score
-                best_score = min(scores)
-        # print ('depth: ', depth)
-        # print('len(scores): ', len(scores))
-        # print('scores: ', scores)
-        # print('best_score: ', best_score)
+                if best_score is None or score < best_score[0]:
+                    best_score = (score, m)
+                if score <= alpha:
+                    if self.history:
+                        self.record_cutoff(game, m, depth, maximizing_player)
+                    break
+                if score < beta:
+                    beta = score
+
+        if best_score is None:
+            return (game.utility(self), (-1, -1))
+        if self.pv_table is not None:
+            self.pv_table[(game.__board_state__, game.__locations__)] = best_score[1]
         return best_score
@@ -11,6 +11,11 @@ import io
 
 # Make the Board class available at the root of the module for imports
 from .isolation import Board
+from .batch import play_batch
+from .clocks import CpuClock
+from .clocks import NodeClock
+from .clocks import RecordingClock
+from .clocks import WallClock
 
 
 def game_as_text(winner, move_history, termination="", board=Board(1, 2)):
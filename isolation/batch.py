@@ -0,0 +1,108 @@
+"""
+This file contains `play_batch`, which plays many games of Isolation in
+lockstep. Instead of soliciting one move from one player at a time (as
+`Board.play` does), every turn collects all of the games waiting on the same
+player object and hands them to the player together, so a player can
+evaluate all of the pending positions in a single call.
+"""
+
+from .clocks import WALL_CLOCK
+from .isolation import Board
+from .isolation import TIME_LIMIT_MILLIS
+
+
+def play_batch(games, time_limit=TIME_LIMIT_MILLIS, clock=None):
+    """
+    Play a list of games to completion in lockstep.
+
+    Players that implement `get_moves(games, legal_moves, time_left)` receive
+    every pending position at once and must return one move per position;
+    other players are asked for each move with `get_move()` as in
+    `Board.play`, with the per-move time limit for each. A batch of n
+    positions passed to `get_moves()` is given n times the per-move time
+    limit, i.e., `time_left` reports the time remaining for the whole batch,
+    and exceeding it forfeits every game in the batch.
+
+    Parameters
+    ----------
+    games : list<`isolation.Board`>
+        The games to play; each game is advanced in place like `Board.play`.
+
+    time_limit : numeric (optional)
+        The maximum number of milliseconds to allow per move.
+
+    clock : object (optional)
+        The clock measuring the time used by each batch (see
+        `isolation.clocks`); defaults to the wall clock.
+
+    Returns
+    ----------
+    list<(player, list<[(int, int),]>, str)>
+        The outcome of each game, in the same format as `Board.play`.
+    """
+    if clock is None:
+        clock = WALL_CLOCK
+
+    histories = [[] for _ in games]
+    results = [None] * len(games)
+    pending = list(range(len(games)))
+
+    while pending:
+
+        # group the unfinished games by the player holding initiative
+        batches = {}
+        for idx in pending:
+            player = games[idx].active_player
+            batches.setdefault(id(player), (player, []))[1].append(idx)
+
+        for player, idxs in batches.values():
+            legal_moves = [games[idx].get_legal_moves() for idx in idxs]
+
+            # games without legal moves are lost without asking the player
+            lost = [idx for idx, moves in zip(idxs, legal_moves) if not moves]
+            for idx in lost:
+                _record(games[idx], histories[idx], (-1, -1))
+                results[idx] = (games[idx].inactive_player, histories[idx], "illegal move")
+            if lost:
+                legal_moves = [moves for moves in legal_moves if moves]
+                idxs = [idx for idx in idxs if results[idx] is None]
+            if not idxs:
+                continue
+
+            copies = [games[idx].copy() for idx in idxs]
+            if hasattr(player, "get_moves"):
+                time_left = clock.timer(time_limit * len(idxs))
+                moves = player.get_moves(copies, legal_moves, time_left)
+                move_ends = [time_left()] * len(idxs)
+            else:
+                # every move gets its own timer, as in Board.play
+                moves, move_ends = [], []
+                for game, legal in zip(copies, legal_moves):
+                    time_left = clock.timer(time_limit)
+                    moves.append(player.get_move(game, legal, time_left))
+                    move_ends.append(time_left())
+
+            for idx, legal, move, move_end in zip(idxs, legal_moves, moves, move_ends):
+                game = games[idx]
+                if move is None:
+                    move = Board.NOT_MOVED
+                _record(game, histories[idx], move)
+
+                if move_end < 0:
+                    results[idx] = (game.inactive_player, histories[idx], "timeout")
+                elif move not in legal:
+                    results[idx] = (game.inactive_player, histories[idx], "illegal move")
+                else:
+                    game.apply_move(move)
+
+        pending = [idx for idx in pending if results[idx] is None]
+
+    return results
+
+
+def _record(game, history, move):
+    """ Append a move to a move history in the format used by Board.play """
+    if game.active_player is game.__player_1__ or not history:
+        history.append([move])
+    else:
+        history[-1].append(move)
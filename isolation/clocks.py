@@ -0,0 +1,105 @@
+"""
+This file contains the clocks that drive the `time_left` function given to
+players by `Board.play` and `play_batch`. Every clock has a `timer()`
+method that starts the clock for one move and returns the `time_left`
+function for that move.
+
+The default `WallClock` measures elapsed real time, so moves are slowed
+down by anything else running on the machine. `CpuClock` only counts the
+CPU time of the thread making the move, and `NodeClock` does not measure
+time at all: it charges a fixed cost for every call to `time_left` (which
+search agents make once per node), so results are reproducible no matter
+how many games share a core.
+"""
+
+import time
+import timeit
+
+
+class WallClock():
+    """Measure the elapsed real time of each move."""
+
+    def timer(self, time_limit):
+        """
+        Start timing a move.
+
+        Parameters
+        ----------
+        time_limit : numeric
+            The number of milliseconds allowed for the move.
+
+        Returns
+        ----------
+        callable
+            A function that returns the number of milliseconds left.
+        """
+        move_start = 1000 * timeit.default_timer()
+        return lambda: time_limit - (1000 * timeit.default_timer() - move_start)
+
+
+class CpuClock():
+    """Measure the CPU time used by the current thread during each move.
+    Time spent waiting for the CPU (e.g., on an oversubscribed host) is not
+    counted."""
+
+    def timer(self, time_limit):
+        move_start = 1000 * time.thread_time()
+        return lambda: time_limit - (1000 * time.thread_time() - move_start)
+
+
+class NodeClock():
+    """Charge a fixed cost for every call to `time_left`.
+
+    Parameters
+    ----------
+    nodes_per_milli : float
+        The number of `time_left` calls that count as one millisecond; use
+        `benchmark.py calibrate` to find the rate matching the wall clock
+        on a given machine.
+    """
+
+    def __init__(self, nodes_per_milli):
+        self.nodes_per_milli = nodes_per_milli
+
+    def timer(self, time_limit):
+        calls = [0]
+
+        def time_left():
+            calls[0] += 1
+            return time_limit - calls[0] / self.nodes_per_milli
+        return time_left
+
+
+class RecordingClock():
+    """Record the time left at the end of every move timed by another clock.
+
+    Parameters
+    ----------
+    clock : object (optional)
+        The clock to record; defaults to the wall clock.
+
+    Attributes
+    ----------
+    remaining : list<float>
+        For each move timed so far, the value returned by the last call to
+        its `time_left` function (`Board.play` calls it once more after the
+        player returns, so this is the time left at the end of the move).
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock if clock is not None else WALL_CLOCK
+        self.remaining = []
+
+    def timer(self, time_limit):
+        time_left = self.clock.timer(time_limit)
+        remaining = self.remaining
+        idx = len(remaining)
+        remaining.append(time_limit)
+
+        def recording_time_left():
+            remaining[idx] = left = time_left()
+            return left
+        return recording_time_left
+
+
+WALL_CLOCK = WallClock()
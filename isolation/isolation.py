@@ -8,14 +8,68 @@ remain compatible with the defaults provided, and none of your changes will
 be available to project reviewers.
 """
 
-import timeit
+import copy
 
-from copy import deepcopy
-from copy import copy
+from .clocks import WALL_CLOCK
 
 
 TIME_LIMIT_MILLIS = 200
 
+# knight move offsets (row, col); the order determines the order of the
+# moves returned by Board.get_legal_moves()
+DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+              (1, -2),  (1, 2), (2, -1),  (2, 1)]
+
+_tables = {}
+
+
+class _ReadOnlyDict(dict):
+    """Dictionary that raises TypeError on every attempt to modify it. Its
+    copies are ordinary dictionaries."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("this dictionary is a read-only snapshot of the board; assign "
+                        "a new dictionary to the board attribute instead")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+
+def knight_tables(width, height):
+    """
+    Return the precomputed move tables for a board of the given size.
+
+    Cells are numbered column-major (index = row + col * height) so that the
+    bits of a board mask enumerate cells in the same order as
+    Board.get_blank_spaces(). The tables are built once per board size and
+    shared by every board of that size.
+
+    Returns
+    ----------
+    (list<(int, int)>, list<tuple<(int, (int, int))>>, list<tuple<int>>, bytes)
+        The (row, col) coordinates of each cell index; for each cell index
+        the (bit mask, (row, col)) pairs and the cell indices of every
+        on-board knight move; and the number of knight moves from each cell
+        on an empty board.
+    """
+    key = (width, height)
+    if key not in _tables:
+        cells = [(i, j) for j in range(width) for i in range(height)]
+        neighbors = [tuple(r + dr + (c + dc) * height for dr, dc in DIRECTIONS
+                           if 0 <= r + dr < height and 0 <= c + dc < width)
+                     for r, c in cells]
+        moves = [tuple((1 << n, cells[n]) for n in cell_neighbors)
+                 for cell_neighbors in neighbors]
+        degrees = bytes(len(cell_neighbors) for cell_neighbors in neighbors)
+        _tables[key] = (cells, moves, neighbors, degrees)
+    return _tables[key]
+
 
 class Board(object):
     """
@@ -37,21 +91,129 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    Notes
+    -----
+        The blocked cells are stored as the bits of a single integer (see
+        `knight_tables()` for the cell numbering), so copying a board shares
+        the immutable mask instead of copying a grid, and move generation
+        only tests the precomputed knight neighbors of a cell. Both keep the
+        cost per search node nearly independent of the board area.
+
+        A board created by the constructor also keeps the number of open
+        knight moves from every cell up to date as moves are applied and
+        undone, which turns mobility queries (see `mobility()`) into table
+        lookups for boards that are played on with `apply_move()` and
+        `undo_move()`. Copies do not inherit the table by default: it is as
+        large as the board, so copying it would make every search node (see
+        `forecast_move()`) grow with the board area. Copies count the open
+        moves of a cell when asked instead, which tests at most 8 bits.
+        Boards that are kept and played on in place, such as the boards
+        handed out by `play(delta=True)`, are copied with `mobility=True`.
+
+        Internally the players are referred to by their index (0 for
+        player_1, 1 for player_2) and the player locations are stored in a
+        tuple, so the board needs no per-instance dictionaries and uses
+        __slots__. The dictionary-valued `__last_player_move__` and
+        `__player_symbols__` attributes of earlier versions are still
+        available as properties for code that reads or assigns them. The
+        dictionaries they return are read-only snapshots, which raise
+        TypeError when modified in place, and the player symbols can only be
+        assigned their current values.
     """
     BLANK = 0
     NOT_MOVED = None
 
+    __slots__ = ("width", "height", "move_count", "__players__", "__active__",
+                 "__locations__", "__blocked__", "__mobility__", "__history__",
+                 "__cells__", "__moves__", "__neighbors__")
+
     def __init__(self, player_1, player_2, width=7, height=7):
         self.width = width
         self.height = height
         self.move_count = 0
-        self.__player_1__ = player_1
-        self.__player_2__ = player_2
-        self.__active_player__ = player_1
-        self.__inactive_player__ = player_2
-        self.__board_state__ = [[Board.BLANK for i in range(width)] for j in range(height)]
-        self.__last_player_move__ = {player_1: Board.NOT_MOVED, player_2: Board.NOT_MOVED}
-        self.__player_symbols__ = {Board.BLANK: Board.BLANK, player_1: 1, player_2: 2}
+        self.__players__ = (player_1, player_2)
+        self.__active__ = 0
+        self.__locations__ = (Board.NOT_MOVED, Board.NOT_MOVED)
+        self.__cells__, self.__moves__, self.__neighbors__, degrees = knight_tables(width, height)
+        self.__blocked__ = 0
+        self.__mobility__ = bytearray(degrees)
+        self.__history__ = None
+
+    def __player_index__(self, player):
+        """ Return the index (0 or 1) of a registered player. """
+        players = self.__players__
+        if player is players[0] or player == players[0]:
+            return 0
+        if player is players[1] or player == players[1]:
+            return 1
+        raise RuntimeError("`player` must be an object registered as a player in the current game.")
+
+    @property
+    def __player_1__(self):
+        return self.__players__[0]
+
+    @property
+    def __player_2__(self):
+        return self.__players__[1]
+
+    @property
+    def __active_player__(self):
+        return self.__players__[self.__active__]
+
+    @__active_player__.setter
+    def __active_player__(self, player):
+        self.__active__ = self.__player_index__(player)
+
+    @property
+    def __inactive_player__(self):
+        return self.__players__[1 - self.__active__]
+
+    @__inactive_player__.setter
+    def __inactive_player__(self, player):
+        self.__active__ = 1 - self.__player_index__(player)
+
+    @property
+    def __last_player_move__(self):
+        """
+        Dictionary mapping each player to its location. The dictionary is a
+        read-only snapshot; assign a new dictionary to change the locations.
+        """
+        players = self.__players__
+        return _ReadOnlyDict({players[0]: self.__locations__[0],
+                              players[1]: self.__locations__[1]})
+
+    @__last_player_move__.setter
+    def __last_player_move__(self, locations):
+        self.__locations__ = (locations[self.__players__[0]], locations[self.__players__[1]])
+
+    @property
+    def __player_symbols__(self):
+        """
+        Read-only dictionary mapping each player (and BLANK) to the symbol
+        of its cells. The symbols are fixed by the player order, so only the
+        current symbols may be assigned (as copies of a board do).
+        """
+        players = self.__players__
+        return _ReadOnlyDict({Board.BLANK: Board.BLANK, players[0]: 1, players[1]: 2})
+
+    @__player_symbols__.setter
+    def __player_symbols__(self, symbols):
+        if dict(symbols) != self.__player_symbols__:
+            raise AttributeError("the player symbols are fixed by the player order")
+
+    @property
+    def __board_state__(self):
+        """
+        Bit mask of the blocked cells. Assigning the mask directly discards
+        the mobility table; mobility is then counted from the mask.
+        """
+        return self.__blocked__
+
+    @__board_state__.setter
+    def __board_state__(self, blocked):
+        self.__blocked__ = blocked
+        self.__mobility__ = None
 
     @property
     def active_player(self):
@@ -59,7 +221,7 @@ class Board(object):
         The object registered as the player holding initiative in the
         current game state.
         """
-        return self.__active_player__
+        return self.__players__[self.__active__]
 
     @property
     def inactive_player(self):
@@ -67,7 +229,7 @@ class Board(object):
         The object registered as the player in waiting for the current
         game state.
         """
-        return self.__inactive_player__
+        return self.__players__[1 - self.__active__]
 
     def get_opponent(self, player):
         """
@@ -85,21 +247,37 @@ class Board(object):
         object
             The opponent of the input player object.
         """
-        if player == self.__active_player__:
-            return self.__inactive_player__
-        elif player == self.__inactive_player__:
-            return self.__active_player__
-        raise RuntimeError("`player` must be an object registered as a player in the current game.")
+        return self.__players__[1 - self.__player_index__(player)]
 
-    def copy(self):
-        """ Return a deep copy of the current board. """
-        new_board = Board(self.__player_1__, self.__player_2__, width=self.width, height=self.height)
+    def copy(self, mobility=False):
+        """
+        Return a deep copy of the current board.
+
+        Parameters
+        ----------
+        mobility : bool (optional)
+            If True, give the copy its own mobility table (see the class
+            notes), for copies that will be played on in place.
+        """
+        new_board = Board.__new__(Board)
+        new_board.width = self.width
+        new_board.height = self.height
         new_board.move_count = self.move_count
-        new_board.__active_player__ = self.__active_player__
-        new_board.__inactive_player__ = self.__inactive_player__
-        new_board.__last_player_move__ = copy(self.__last_player_move__)
-        new_board.__player_symbols__ = copy(self.__player_symbols__)
-        new_board.__board_state__ = deepcopy(self.__board_state__)
+        new_board.__players__ = self.__players__
+        new_board.__active__ = self.__active__
+        new_board.__locations__ = self.__locations__
+        new_board.__cells__ = self.__cells__
+        new_board.__moves__ = self.__moves__
+        new_board.__neighbors__ = self.__neighbors__
+        new_board.__blocked__ = self.__blocked__
+        new_board.__mobility__ = None  # see the class notes
+        if mobility:
+            if self.__mobility__ is not None:
+                new_board.__mobility__ = bytearray(self.__mobility__)
+            else:
+                new_board.__mobility__ = bytearray(
+                    self.__cell_mobility__(idx) for idx in range(len(self.__cells__)))
+        new_board.__history__ = self.__history__
         return new_board
 
     def forecast_move(self, move):
@@ -140,14 +318,18 @@ class Board(object):
         row, col = move
         return 0 <= row < self.height and \
                0 <= col < self.width and \
-               self.__board_state__[row][col] == Board.BLANK
+               not self.__blocked__ >> (row + col * self.height) & 1
 
     def get_blank_spaces(self):
         """
         Return a list of the locations that are still available on the board.
         """
-        return [(i, j) for j in range(self.width) for i in range(self.height)
-            if self.__board_state__[i][j] == Board.BLANK]
+        # scan the mask as a string of bits (lowest cell index first) rather
+        # than shifting the integer once per cell
+        area = self.width * self.height
+        bits = format(self.__blocked__, "0{}b".format(area))[::-1]
+        cells = self.__cells__
+        return [cells[i] for i, bit in enumerate(bits) if bit == "0"]
 
     def get_player_location(self, player):
         """
@@ -163,7 +345,27 @@ class Board(object):
         (int, int)
             The coordinate pair (row, column) of the input player.
         """
-        return self.__last_player_move__[player]
+        return self.__locations__[self.__player_index__(player)]
+
+    def get_move_sequence(self):
+        """
+        Return the moves applied to the board so far, in the order they were
+        applied (player 1 first). Boards whose state was assigned directly
+        only know the moves applied since, so callers should compare the
+        length of the sequence with `move_count`.
+
+        Returns
+        ----------
+        list<(int, int)>
+            The coordinate pairs (row, column) of the moves.
+        """
+        moves = []
+        history = self.__history__
+        while history is not None:
+            moves.append(history[0])
+            history = history[2]
+        moves.reverse()
+        return moves
 
     def get_legal_moves(self, player=None):
         """
@@ -182,8 +384,109 @@ class Board(object):
             for the player constrained by the current game state.
         """
         if player is None:
-            player = self.active_player
-        return self.__get_moves__(self.__last_player_move__[player])
+            return self.__get_moves__(self.__locations__[self.__active__])
+        return self.__get_moves__(self.__locations__[self.__player_index__(player)])
+
+    def iter_legal_moves(self, player=None):
+        """
+        Generate the legal moves for the specified player one at a time, in
+        the same order as `get_legal_moves()`. Moves are generated from the
+        game state at the time of the first iteration.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            generate the legal moves for the active player on the board.
+
+        Yields
+        ----------
+        (int, int)
+            The coordinate pairs (row, column) of the legal moves.
+        """
+        loc = self.__locations__[self.__active__ if player is None else self.__player_index__(player)]
+        if loc == Board.NOT_MOVED:
+            yield from self.get_blank_spaces()
+            return
+        blocked = self.__blocked__
+        for bit, m in self.__moves__[loc[0] + loc[1] * self.height]:
+            if not blocked & bit:
+                yield m
+
+    def has_legal_move(self, player=None):
+        """
+        Test whether the specified player has at least one legal move,
+        without generating the list of moves.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            test the active player on the board.
+
+        Returns
+        ----------
+        bool
+            True if the player can move, False otherwise.
+        """
+        loc = self.__locations__[self.__active__ if player is None else self.__player_index__(player)]
+        blocked = self.__blocked__
+        if loc == Board.NOT_MOVED:
+            return blocked != (1 << self.width * self.height) - 1
+        idx = loc[0] + loc[1] * self.height
+        if self.__mobility__ is not None:
+            return self.__mobility__[idx] > 0
+        for bit, _ in self.__moves__[idx]:
+            if not blocked & bit:
+                return True
+        return False
+
+    def mobility(self, player=None):
+        """
+        Return the number of legal moves for the specified player, i.e.,
+        len(self.get_legal_moves(player)), without generating the moves.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            count the legal moves for the active player on the board.
+
+        Returns
+        ----------
+        int
+            The number of legal moves for the player.
+        """
+        loc = self.__locations__[self.__active__ if player is None else self.__player_index__(player)]
+        if loc == Board.NOT_MOVED:
+            return self.width * self.height - bin(self.__blocked__).count("1")
+        return self.__cell_mobility__(loc[0] + loc[1] * self.height)
+
+    def second_order_mobility(self, player=None):
+        """
+        Return the total number of moves that would be available to the
+        specified player after each of its legal moves.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            use the active player on the board.
+
+        Returns
+        ----------
+        int
+            The sum of the number of open knight moves from each square the
+            player can move to (counting squares reachable by more than one
+            path once per path).
+        """
+        loc = self.__locations__[self.__active__ if player is None else self.__player_index__(player)]
+        if loc == Board.NOT_MOVED:
+            return 0
+        cell_mobility = self.__cell_mobility__
+        blocked = self.__blocked__
+        return sum(cell_mobility(n) for n in self.__neighbors__[loc[0] + loc[1] * self.height]
+                   if not blocked >> n & 1)
 
     def apply_move(self, move):
         """
@@ -200,18 +503,60 @@ class Board(object):
         None
         """
         row, col = move
-        self.__last_player_move__[self.active_player] = move
-        self.__board_state__[row][col] = self.__player_symbols__[self.active_player]
-        self.__active_player__, self.__inactive_player__ = self.__inactive_player__, self.__active_player__
+        idx = row + col * self.height
+        locations = self.__locations__
+        if self.__active__:
+            self.__history__ = (move, locations[1], self.__history__)
+            self.__locations__ = (locations[0], move)
+            self.__active__ = 0
+        else:
+            self.__history__ = (move, locations[0], self.__history__)
+            self.__locations__ = (move, locations[1])
+            self.__active__ = 1
+        self.__blocked__ |= 1 << idx
+        mobility = self.__mobility__
+        if mobility is not None:
+            for n in self.__neighbors__[idx]:
+                mobility[n] -= 1
         self.move_count += 1
 
+    def undo_move(self):
+        """
+        Revert the last move applied to the board, restoring the previous
+        game state. This is the inverse of `apply_move()`.
+
+        Returns
+        ----------
+        (int, int)
+            The move that was reverted.
+        """
+        if self.__history__ is None:
+            raise RuntimeError("There are no moves to undo.")
+        move, previous, self.__history__ = self.__history__
+        row, col = move
+        idx = row + col * self.height
+        locations = self.__locations__
+        if self.__active__:
+            self.__locations__ = (previous, locations[1])
+            self.__active__ = 0
+        else:
+            self.__locations__ = (locations[0], previous)
+            self.__active__ = 1
+        self.__blocked__ &= ~(1 << idx)
+        mobility = self.__mobility__
+        if mobility is not None:
+            for n in self.__neighbors__[idx]:
+                mobility[n] += 1
+        self.move_count -= 1
+        return move
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self.inactive_player and not self.get_legal_moves(self.active_player)
+        return player == self.inactive_player and not self.has_legal_move()
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self.active_player and not self.get_legal_moves(self.active_player)
+        return player == self.active_player and not self.has_legal_move()
 
     def utility(self, player):
         """
@@ -237,7 +582,7 @@ class Board(object):
             otherwise.
         """
 
-        if not self.get_legal_moves(self.active_player):
+        if not self.has_legal_move():
 
             if player == self.inactive_player:
                 return float("inf")
@@ -257,13 +602,23 @@ class Board(object):
             return self.get_blank_spaces()
 
         r, c = move
+        blocked = self.__blocked__
+        return [m for bit, m in self.__moves__[r + c * self.height] if not blocked & bit]
 
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2),  (1, 2), (2, -1),  (2, 1)]
-
-        valid_moves = [(r+dr,c+dc) for dr, dc in directions if self.move_is_legal((r+dr, c+dc))]
-
-        return valid_moves
+    def __cell_mobility__(self, idx):
+        """
+        Return the number of open knight moves from a cell index, from the
+        mobility table if the board has one.
+        """
+        mobility = self.__mobility__
+        if mobility is not None:
+            return mobility[idx]
+        blocked = self.__blocked__
+        count = 0
+        for bit, _ in self.__moves__[idx]:
+            if not blocked & bit:
+                count += 1
+        return count
 
     def print_board(self):
         """DEPRECATED - use Board.to_string()"""
@@ -275,8 +630,8 @@ class Board(object):
         blocked, and which remain open.
         """
 
-        p1_loc = self.__last_player_move__[self.__player_1__]
-        p2_loc = self.__last_player_move__[self.__player_2__]
+        p1_loc, p2_loc = self.__locations__
+        blocked = self.__blocked__
 
         out = ''
 
@@ -285,7 +640,7 @@ class Board(object):
 
             for j in range(self.width):
 
-                if not self.__board_state__[i][j]:
+                if not blocked >> (i + j * self.height) & 1:
                     out += ' '
                 elif p1_loc and i == p1_loc[0] and j == p1_loc[1]:
                     out += '1'
@@ -299,7 +654,7 @@ class Board(object):
 
         return out
 
-    def play(self, time_limit=TIME_LIMIT_MILLIS):
+    def play(self, time_limit=TIME_LIMIT_MILLIS, delta=False, clock=None):
         """
         Execute a match between the players by alternately soliciting them
         to select a move and applying it in the game.
@@ -310,6 +665,20 @@ class Board(object):
             The maximum number of milliseconds to allow before timeout
             during each turn.
 
+        delta : bool (optional)
+            If True, players that implement `new_game(game)` and
+            `observe_move(move)` keep their own board for the whole game
+            instead of receiving a fresh copy every turn: they are given a
+            copy of the board once when the match starts, every move applied
+            by either player is then reported through `observe_move()`
+            (outside of the move timer), and `get_move()` is called with
+            `None` in place of the board. Other players, including players
+            implementing only one of the two methods, are unaffected.
+
+        clock : object (optional)
+            The clock measuring the time used by each move (see
+            `isolation.clocks`); defaults to the wall clock.
+
         Returns
         ----------
         (player, list<[(int, int),]>, str)
@@ -319,16 +688,24 @@ class Board(object):
         """
         move_history = []
 
-        curr_time_millis = lambda: 1000 * timeit.default_timer()
+        if clock is None:
+            clock = WALL_CLOCK
+
+        observers = []
+        if delta:
+            for player in self.__players__:
+                if (hasattr(player, "new_game") and hasattr(player, "observe_move") and
+                        player not in observers):
+                    observers.append(player)
+                    player.new_game(self.copy(mobility=True))
 
         while True:
 
             legal_player_moves = self.get_legal_moves()
 
-            game_copy = self.copy()
+            game_copy = None if self.active_player in observers else self.copy()
 
-            move_start = curr_time_millis()
-            time_left = lambda : time_limit - (curr_time_millis() - move_start)
+            time_left = clock.timer(time_limit)
             curr_move = self.active_player.get_move(game_copy, legal_player_moves, time_left)
             move_end = time_left()
 
@@ -337,15 +714,18 @@ class Board(object):
             if curr_move is None:
                 curr_move = Board.NOT_MOVED
 
-            if self.active_player == self.__player_1__:
+            if not self.__active__:
                 move_history.append([curr_move])
             else:
                 move_history[-1].append(curr_move)
 
             if move_end < 0:
-                return self.__inactive_player__, move_history, "timeout"
+                return self.inactive_player, move_history, "timeout"
 
             if curr_move not in legal_player_moves:
-                return self.__inactive_player__, move_history, "illegal move"
+                return self.inactive_player, move_history, "illegal move"
 
             self.apply_move(curr_move)
+
+            for player in observers:
+                player.observe_move(curr_move)
@@ -0,0 +1,340 @@
+"""
+This file contains test cases for the `isolation.Board` game engine. Each
+test plays seeded random games and checks the engine against a direct
+implementation of the rules.
+"""
+import random
+import tracemalloc
+import unittest
+
+import isolation
+
+from benchmark import random_positions
+
+DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+              (1, -2), (1, 2), (2, -1), (2, 1)]
+
+
+class ReferenceBoard():
+    """Straightforward grid-based model of the game rules."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.blocked = set()
+        self.locations = [None, None]
+        self.active = 0
+
+    def legal_moves(self, idx):
+        if self.locations[idx] is None:
+            return [(i, j) for j in range(self.width) for i in range(self.height)
+                    if (i, j) not in self.blocked]
+        r, c = self.locations[idx]
+        return [(r + dr, c + dc) for dr, dc in DIRECTIONS
+                if 0 <= r + dr < self.height and 0 <= c + dc < self.width and
+                (r + dr, c + dc) not in self.blocked]
+
+    def apply_move(self, move):
+        self.blocked.add(move)
+        self.locations[self.active] = move
+        self.active = 1 - self.active
+
+
+def random_games(width, height, num_games, seed=0):
+    """Yield (board, reference) pairs after every ply of seeded random games."""
+    for board in random_positions(width, height, num_games, seed, ("p1", "p2")):
+        if not board.move_count:
+            reference = ReferenceBoard(width, height)
+        else:
+            reference.apply_move(board.get_player_location(board.inactive_player))
+        yield board, reference
+
+
+class RandomPlayer():
+    """Player that moves randomly; implements both move interfaces."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def get_move(self, game, legal_moves, time_left):
+        return self.rng.choice(legal_moves) if legal_moves else (-1, -1)
+
+    def get_moves(self, games, legal_moves, time_left):
+        return [self.get_move(g, m, time_left) for g, m in zip(games, legal_moves)]
+
+
+class BoardTest(unittest.TestCase):
+
+    def assertMatchesReference(self, board, reference):
+        players = [board.active_player, board.inactive_player]
+        if reference.active:
+            players.reverse()
+        for idx, player in enumerate(players):
+            moves = reference.legal_moves(idx)
+            self.assertEqual(board.get_legal_moves(player), moves)
+            self.assertEqual(board.mobility(player), len(moves))
+            self.assertEqual(list(board.iter_legal_moves(player)), moves)
+            self.assertEqual(board.has_legal_move(player), bool(moves))
+        self.assertEqual(set(board.get_blank_spaces()),
+                         {(i, j) for j in range(reference.width)
+                          for i in range(reference.height)} - reference.blocked)
+
+    def test_rules(self):
+        """ Test move generation against the reference rules """
+        for width, height in [(7, 7), (5, 9), (9, 5), (15, 15)]:
+            for board, reference in random_games(width, height, 5):
+                self.assertMatchesReference(board, reference)
+
+    def test_large_board(self):
+        """ Test complete games on a 32x32 board """
+        for board, reference in random_games(32, 32, 2):
+            self.assertMatchesReference(board, reference)
+        self.assertTrue(board.is_loser(board.active_player))
+
+    def test_second_order_mobility(self):
+        """ Test second order mobility against the reference rules """
+        for board, reference in random_games(7, 7, 5):
+            if reference.locations[reference.active] is None:
+                continue
+            expected = 0
+            for move in board.get_legal_moves():
+                expected += len(board.forecast_move(move).get_legal_moves(board.active_player))
+            self.assertEqual(board.second_order_mobility(), expected)
+
+    def test_undo(self):
+        """ Test that undoing moves restores every earlier state """
+        rng = random.Random(0)
+        board = isolation.Board("p1", "p2", 8, 6)
+        states = []
+        while board.get_legal_moves():
+            states.append((board.to_string(), board.active_player, board.move_count,
+                           board.get_blank_spaces(), board.mobility("p1"), board.mobility("p2")))
+            board.apply_move(rng.choice(board.get_legal_moves()))
+        while states:
+            board.undo_move()
+            self.assertEqual((board.to_string(), board.active_player, board.move_count,
+                              board.get_blank_spaces(), board.mobility("p1"),
+                              board.mobility("p2")), states.pop())
+        self.assertRaises(RuntimeError, board.undo_move)
+
+    def test_assign_state(self):
+        """ Test mobility after assigning the blocked cells """
+        board = isolation.Board("p1", "p2")
+        board.apply_move((3, 3))
+        board.apply_move((0, 0))
+        other = isolation.Board("p1", "p2")
+        other.__board_state__ = board.__board_state__
+        other.__last_player_move__ = dict(board.__last_player_move__)
+        self.assertEqual(other.mobility("p1"), 8)
+        self.assertEqual(other.mobility("p2"), 2)
+        self.assertTrue(other.has_legal_move("p2"))
+
+    def test_legacy_attributes(self):
+        """ Test that the dictionary attributes cannot be modified silently """
+        board = isolation.Board("p1", "p2")
+        board.apply_move((3, 3))
+        locations = board.__last_player_move__
+        self.assertEqual(locations, {"p1": (3, 3), "p2": None})
+        with self.assertRaises(TypeError):
+            locations["p2"] = (0, 0)
+        with self.assertRaises(TypeError):
+            locations.update({"p2": (0, 0)})
+        board.__last_player_move__ = {"p1": (3, 3), "p2": (0, 0)}
+        self.assertEqual(board.get_player_location("p2"), (0, 0))
+
+        symbols = board.__player_symbols__
+        with self.assertRaises(TypeError):
+            symbols["p1"] = 2
+        board.__player_symbols__ = dict(symbols)
+        with self.assertRaises(AttributeError):
+            board.__player_symbols__ = {0: 0, "p1": 2, "p2": 1}
+
+    def test_copy_size(self):
+        """ Test that the memory of a copy does not grow with the board area """
+        def copy_bytes(board, count=200):
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            copies = [board.copy() for _ in range(count)]
+            after = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del copies
+            return (after - before) / count
+
+        sizes = []
+        for size in (7, 32):
+            board = isolation.Board("p1", "p2", size, size)
+            board.apply_move((3, 3))
+            board.apply_move((0, 0))
+            copy = board.copy()
+            self.assertEqual((copy.mobility("p1"), copy.mobility("p2")),
+                             (board.mobility("p1"), board.mobility("p2")))
+            self.assertEqual(copy.second_order_mobility(), board.second_order_mobility())
+            sizes.append(copy_bytes(board))
+        self.assertLess(sizes[1], sizes[0] + 16)
+
+    def test_player_objects(self):
+        """ Test that any objects can be registered as players """
+        p1, p2 = [], {}  # unhashable players are allowed
+        board = isolation.Board(p1, p2)
+        board.apply_move((2, 3))
+        self.assertIs(board.active_player, p2)
+        self.assertIs(board.get_opponent(p2), p1)
+        self.assertEqual(board.get_player_location(p1), (2, 3))
+        self.assertRaises(RuntimeError, board.get_legal_moves, "p3")
+        self.assertFalse(hasattr(board, "__dict__"))
+
+    def test_copy(self):
+        """ Test that copies do not share mutable state """
+        board = isolation.Board("p1", "p2", 9, 9)
+        board.apply_move((4, 4))
+        board.apply_move((0, 0))
+        before = board.to_string()
+        child = board.forecast_move((2, 3))
+        child.apply_move((1, 2))
+        self.assertEqual(board.to_string(), before)
+        self.assertEqual(board.get_player_location("p1"), (4, 4))
+        self.assertEqual(child.get_player_location("p1"), (2, 3))
+        self.assertNotIn((2, 3), child.get_legal_moves("p1"))
+        self.assertIn((2, 3), board.get_legal_moves("p1"))
+
+
+class ObservingPlayer(RandomPlayer):
+    """Random player that keeps its own board during delta play."""
+
+    def new_game(self, game):
+        self.game = game
+        self.boards_received = 0
+
+    def observe_move(self, move):
+        self.game.apply_move(move)
+
+    def get_move(self, game, legal_moves, time_left):
+        if game is not None:
+            self.boards_received += 1
+        self.test.assertEqual(self.game.get_legal_moves(), legal_moves)
+        return super(ObservingPlayer, self).get_move(game, legal_moves, time_left)
+
+
+class PlayTest(unittest.TestCase):
+
+    def test_delta_play(self):
+        """ Test that players keeping their own board see every move """
+        for seed in range(5):
+            p1, p2 = ObservingPlayer(seed), RandomPlayer(seed + 1)
+            p1.test = self
+            game = isolation.Board(p1, p2)
+            _, history, _ = game.play(delta=True)
+
+            reference = isolation.Board(RandomPlayer(seed), RandomPlayer(seed + 1))
+            self.assertEqual(reference.play()[1], history)
+            self.assertEqual(p1.game.to_string(), game.to_string())
+            self.assertEqual(p1.boards_received, 0)
+
+    def test_partial_protocol(self):
+        """ Test that delta play needs both new_game() and observe_move() """
+        class NotifiedPlayer(RandomPlayer):
+            def observe_move(self, move):
+                raise AssertionError("not a delta player")
+
+        for seed in range(3):
+            game = isolation.Board(NotifiedPlayer(seed), RandomPlayer(seed + 1))
+            _, history, _ = game.play(delta=True)
+            reference = isolation.Board(RandomPlayer(seed), RandomPlayer(seed + 1))
+            self.assertEqual(reference.play()[1], history)
+
+    def test_delta_mobility(self):
+        """ Test that the board kept during delta play has a mobility table """
+        for seed in range(5):
+            p1, p2 = ObservingPlayer(seed), RandomPlayer(seed + 1)
+            p1.test = self
+            game = isolation.Board(p1, p2)
+            game.__board_state__ = game.__board_state__  # drops the table
+            game.play(delta=True)
+            self.assertIsNotNone(p1.game.__mobility__)
+            for idx in range(game.width * game.height):
+                self.assertEqual(p1.game.__cell_mobility__(idx),
+                                 game.copy().__cell_mobility__(idx))
+            self.assertEqual(p1.game.mobility(p1), game.mobility(p1))
+
+
+class CountingPlayer(RandomPlayer):
+    """Random player that calls time_left a fixed number of times per move."""
+
+    def get_move(self, game, legal_moves, time_left):
+        self.remaining = [time_left() for _ in range(10)]
+        return super(CountingPlayer, self).get_move(game, legal_moves, time_left)
+
+
+class ClockTest(unittest.TestCase):
+
+    def test_node_clock(self):
+        """ Test that the node clock charges every call to time_left """
+        player = CountingPlayer(0)
+        game = isolation.Board(player, RandomPlayer(1))
+        game.play(time_limit=100, clock=isolation.NodeClock(2.))
+        self.assertEqual(player.remaining, [100. - n / 2. for n in range(1, 11)])
+
+        winner, _, termination = isolation.Board(player, RandomPlayer(1)).play(
+            time_limit=5, clock=isolation.NodeClock(2.))
+        self.assertEqual(termination, "timeout")
+        self.assertIsNot(winner, player)
+
+    def test_recording_clock(self):
+        """ Test that the time left at the end of each move is recorded """
+        player = CountingPlayer(0)
+        clock = isolation.RecordingClock(isolation.NodeClock(1.))
+        _, history, _ = isolation.Board(player, RandomPlayer(1)).play(time_limit=100,
+                                                                      clock=clock)
+        self.assertEqual(len(clock.remaining), sum(len(moves) for moves in history))
+        # the counting player makes 10 calls, the engine one more per move
+        self.assertEqual(set(clock.remaining[0::2]), {89.})
+        self.assertEqual(set(clock.remaining[1::2]), {99.})
+
+    def test_cpu_clock(self):
+        """ Test that the CPU clock counts down from the time limit """
+        player = CountingPlayer(0)
+        isolation.Board(player, RandomPlayer(1)).play(time_limit=100,
+                                                      clock=isolation.CpuClock())
+        self.assertTrue(all(0 < t <= 100 for t in player.remaining))
+        self.assertEqual(player.remaining, sorted(player.remaining, reverse=True))
+
+
+class PlayBatchTest(unittest.TestCase):
+
+    def test_play_batch(self):
+        """ Test that batched games are played to a legal conclusion """
+        p1, p2 = RandomPlayer(1), RandomPlayer(2)
+        p3 = type("UnbatchedPlayer", (), {"get_move": RandomPlayer(3).get_move})()
+        games = [isolation.Board(*players) for players in
+                 [(p1, p2), (p2, p1), (p1, p3), (p3, p2)] * 5]
+        results = isolation.play_batch(games)
+
+        for game, (winner, history, termination) in zip(games, results):
+            self.assertEqual(termination, "illegal move")
+            replay = isolation.Board(game.__player_1__, game.__player_2__)
+            moves = [m for turn in history for m in turn]
+            for move in moves[:-1]:
+                self.assertIn(move, replay.get_legal_moves())
+                replay.apply_move(move)
+            self.assertEqual(replay.to_string(), game.to_string())
+            self.assertFalse(replay.get_legal_moves())
+            self.assertIs(winner, replay.inactive_player)
+
+    def test_move_timers(self):
+        """ Test that players without get_moves() get a timer per move """
+        starts = []
+
+        class TimedPlayer():
+            def get_move(self, game, legal_moves, time_left):
+                starts.append(time_left())
+                return legal_moves[0]
+
+        player = TimedPlayer()
+        games = [isolation.Board(player, RandomPlayer(seed)) for seed in range(4)]
+        results = isolation.play_batch(games, time_limit=100, clock=isolation.NodeClock(1.))
+        self.assertEqual(set(starts), {99.})
+        self.assertNotIn("timeout", [termination for _, _, termination in results])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,322 @@
+"""
+Maintain a persistent rating ladder for the tournament agents.
+
+Every match result is appended to an on-disk results store, and ratings are
+fitted over ALL recorded results with a Bradley-Terry model (reported on the
+Elo scale). Agents that already have enough recorded games are never
+replayed, so changing one heuristic only requires the changed agent to play
+a scheduled subset of opponents close to its current rating; the ratings are
+updated incrementally with an Elo step after every game and refitted once
+the new agent has played its schedule.
+
+Each result is stored with a hash of the configuration and source code of
+both agents (see `config_hash()`), and results recorded with a different
+hash than an agent has now are discarded automatically. Agents that cannot
+be described this way (see `distributed.agent_spec()`) are only invalidated
+by `--forget`.
+
+Usage:
+
+    python ladder.py                      # rate roster and agents under test
+    python ladder.py --forget "Student MCS"  # drop an agent's results, then rate
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+
+from collections import defaultdict
+from collections import namedtuple
+
+from distributed import agent_spec
+from resultcache import source_hash
+from tournament import NUM_MATCHES
+from tournament import make_roster
+from tournament import make_test_agents
+from tournament import play_match
+from tournament import score_from_elo
+
+LADDER_FILE = "ladder.jsonl"  # default location of the results store
+NUM_OPPONENTS = 4  # number of distinct opponents scheduled for each agent
+K_FACTOR = 16.  # Elo step size for incremental updates (per game)
+PRIOR_GAMES = 1.  # virtual wins and losses against a 0 Elo anchor
+BT_ITERATIONS = 500
+BT_TOLERANCE = 1e-6
+
+# the hashes are None for agents without a config_hash() and in old stores
+Record = namedtuple("Record", ["agent_1", "agent_2", "wins_1", "wins_2", "hash_1", "hash_2"],
+                    defaults=(None, None))
+
+
+def config_hash(player):
+    """Return a hash of the configuration of a player and of the source of
+    the code it runs, or None if the player cannot be described."""
+    try:
+        spec = agent_spec(player)
+    except ValueError:
+        return None
+    key = json.dumps([spec, source_hash(spec)], sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ResultStore():
+    """Append-only store of match results kept as one JSON object per line.
+
+    Parameters
+    ----------
+    path : str
+        Location of the results file; it is created on the first write.
+    """
+
+    def __init__(self, path=LADDER_FILE):
+        self.path = path
+
+    def records(self):
+        """Return every recorded result as a list of `Record` tuples."""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return [Record(**json.loads(line)) for line in f if line.strip()]
+
+    def add(self, agent_1, agent_2, wins_1, wins_2, hash_1=None, hash_2=None):
+        """Append a single result to the store."""
+        record = Record(agent_1, agent_2, wins_1, wins_2, hash_1, hash_2)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record._asdict()) + "\n")
+        return record
+
+    def keep(self, predicate):
+        """Remove every result for which `predicate(record)` is false and
+        return the number of results removed."""
+        records = self.records()
+        kept = [r for r in records if predicate(r)]
+        if len(kept) < len(records):
+            with open(self.path, "w") as f:
+                for record in kept:
+                    f.write(json.dumps(record._asdict()) + "\n")
+        return len(records) - len(kept)
+
+    def forget(self, name):
+        """Remove every result involving the named agent."""
+        return self.keep(lambda r: name not in (r.agent_1, r.agent_2))
+
+    def invalidate(self, hashes):
+        """
+        Remove every result recorded with a different hash than the current
+        one of either agent.
+
+        Parameters
+        ----------
+        hashes : dict
+            A mapping from agent name to its current `config_hash()`; agents
+            missing from it are left alone.
+        """
+        def current(name, recorded):
+            return name not in hashes or hashes[name] == recorded
+
+        return self.keep(lambda r: current(r.agent_1, r.hash_1) and current(r.agent_2, r.hash_2))
+
+
+def fit_ratings(records, ratings=None, prior=PRIOR_GAMES,
+                iterations=BT_ITERATIONS, tolerance=BT_TOLERANCE):
+    """
+    Fit a Bradley-Terry model to a list of results using the MM algorithm
+    (Hunter, 2004) and return the ratings on the Elo scale.
+
+    Every agent is credited with `prior` virtual wins and losses against a
+    fixed 0 Elo anchor, which keeps the fit finite for undefeated or winless
+    agents and pins the scale so ratings are comparable between fits.
+
+    Parameters
+    ----------
+    records : list<Record>
+        The results to fit.
+
+    ratings : dict (optional)
+        Previous ratings (name -> Elo) used to warm start the iteration, so
+        refitting after a few new results converges in a handful of steps.
+
+    Returns
+    ----------
+    dict
+        A mapping from agent name to Elo rating.
+    """
+    wins = defaultdict(float)
+    games = defaultdict(lambda: defaultdict(float))
+    for r in records:
+        wins[r.agent_1] += r.wins_1
+        wins[r.agent_2] += r.wins_2
+        games[r.agent_1][r.agent_2] += r.wins_1 + r.wins_2
+        games[r.agent_2][r.agent_1] += r.wins_1 + r.wins_2
+
+    ratings = ratings or {}
+    gamma = {name: 10. ** (ratings.get(name, 0.) / 400.) for name in games}
+
+    for _ in range(iterations):
+        new_gamma = {}
+        for name, opponents in games.items():
+            denom = 2. * prior / (gamma[name] + 1.)
+            denom += sum(n / (gamma[name] + gamma[opp]) for opp, n in opponents.items())
+            new_gamma[name] = (wins[name] + prior) / denom
+        change = max((abs(math.log(new_gamma[n] / gamma[n])) for n in gamma), default=0.)
+        gamma = new_gamma
+        if change < tolerance:
+            break
+
+    return {name: 400. * math.log10(g) for name, g in gamma.items()}
+
+
+class Ladder():
+    """Rating ladder backed by a `ResultStore`.
+
+    Parameters
+    ----------
+    store : ResultStore
+        The persistent store holding every recorded result.
+
+    hashes : dict (optional)
+        The current `config_hash()` of each agent (name -> hash). Results
+        recorded with other hashes are removed from the store, and new
+        results are recorded with these hashes.
+    """
+
+    def __init__(self, store, hashes=None):
+        self.store = store
+        self.hashes = dict(hashes or {})
+        self.invalidated = store.invalidate(self.hashes)
+        self.records = store.records()
+        self.ratings = fit_ratings(self.records)
+
+    def rating(self, name):
+        """Current rating of the named agent (0 if it has never played)."""
+        return self.ratings.get(name, 0.)
+
+    def opponents(self, name):
+        """Return the set of agents the named agent has a result against."""
+        return {r.agent_2 if r.agent_1 == name else r.agent_1
+                for r in self.records if name in (r.agent_1, r.agent_2)}
+
+    def games(self, name):
+        """Return the number of recorded games played by the named agent."""
+        return sum(r.wins_1 + r.wins_2 for r in self.records
+                   if name in (r.agent_1, r.agent_2))
+
+    def record(self, agent_1, agent_2, wins_1, wins_2):
+        """
+        Store a result and apply an incremental Elo update to both agents
+        for every game, recomputing the expected score after each one.
+
+        The order of the games is not known, so the wins of `agent_1` are
+        spread evenly over the match.
+        """
+        self.records.append(self.store.add(agent_1, agent_2, wins_1, wins_2,
+                                           self.hashes.get(agent_1), self.hashes.get(agent_2)))
+        games = wins_1 + wins_2
+        for game in range(games):
+            # 1 if this game is one of the evenly spread wins of agent_1
+            score = (game + 1) * wins_1 // games - game * wins_1 // games
+            expected = score_from_elo(self.rating(agent_1) - self.rating(agent_2))
+            delta = K_FACTOR * (score - expected)
+            self.ratings[agent_1] = self.rating(agent_1) + delta
+            self.ratings[agent_2] = self.rating(agent_2) - delta
+
+    def refit(self):
+        """Refit the Bradley-Terry ratings over all recorded results."""
+        self.ratings = fit_ratings(self.records, self.ratings)
+        return self.ratings
+
+    def schedule(self, name, candidates, num_opponents=NUM_OPPONENTS):
+        """
+        Choose the next opponent for the named agent from the candidate
+        names, or None if it already has results against `num_opponents`
+        distinct opponents.
+
+        Opponents the agent has not yet faced are preferred, ordered by
+        closeness in rating (the most informative pairings), breaking ties in
+        favor of opponents with more games and thus better known ratings.
+        """
+        played = self.opponents(name)
+        if len(played) >= num_opponents:
+            return None
+        pool = [c for c in candidates if c != name and c not in played]
+        if not pool:
+            return None
+        return min(pool, key=lambda c: (abs(self.rating(c) - self.rating(name)),
+                                        -self.games(c)))
+
+    def standings(self):
+        """Return (name, rating, games) tuples sorted by rating."""
+        return sorted(((n, r, self.games(n)) for n, r in self.ratings.items()),
+                      key=lambda x: -x[1])
+
+
+def play_ladder(ladder, agents, num_opponents=NUM_OPPONENTS,
+                num_matches=NUM_MATCHES):
+    """
+    Play scheduled matches for every agent that has not yet been rated
+    against `num_opponents` distinct opponents.
+    """
+    players = {a.name: a.player for a in agents}
+
+    print("\nPlaying Matches:")
+    print("----------")
+
+    for agent in agents:
+        while True:
+            opponent = ladder.schedule(agent.name, players, num_opponents)
+            if opponent is None:
+                break
+            print("  {!s:^11} vs {!s:^11}".format(agent.name, opponent), end=' ')
+
+            wins_1 = wins_2 = 0
+            p1, p2 = agent.player, players[opponent]
+            for a, b in itertools.permutations((p1, p2)):
+                for _ in range(num_matches):
+                    score_a, score_b = play_match(a, b)
+                    wins_1 += score_a if a is p1 else score_b
+                    wins_2 += score_b if a is p1 else score_a
+
+            ladder.record(agent.name, opponent, wins_1, wins_2)
+            print("\tResult: {} to {}\tRating: {:+.0f}".format(
+                wins_1, wins_2, ladder.rating(agent.name)))
+
+    ladder.refit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--store", default=LADDER_FILE,
+                        help="results file (default: %(default)s)")
+    parser.add_argument("--forget", action="append", default=[],
+                        metavar="NAME", help="discard results of an agent "
+                        "whose implementation changed")
+    parser.add_argument("--opponents", type=int, default=NUM_OPPONENTS,
+                        help="opponents per agent (default: %(default)s)")
+    parser.add_argument("--matches", type=int, default=NUM_MATCHES,
+                        help="matches per pairing (default: %(default)s)")
+    parser.add_argument("--extra-agents", action="store_true",
+                        help="also rate the experimental agents (territory "
+                             "and phase-aware heuristics)")
+    args = parser.parse_args()
+
+    store = ResultStore(args.store)
+    for name in args.forget:
+        store.forget(name)
+
+    agents = make_roster() + make_test_agents(args.extra_agents)
+    ladder = Ladder(store, {a.name: config_hash(a.player) for a in agents})
+    if ladder.invalidated:
+        print("Discarded {} results of changed agents.".format(ladder.invalidated))
+    play_ladder(ladder, agents, args.opponents, args.matches)
+
+    print("\n\nLadder:")
+    print("----------")
+    for rank, (name, rating, games) in enumerate(ladder.standings()):
+        print("{:>3}. {!s:<20}{:>+8.0f}{:>8} games".format(rank + 1, name, rating, games))
+
+
+if __name__ == "__main__":
+    main()
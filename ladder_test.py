@@ -0,0 +1,122 @@
+"""
+This file contains test cases for the rating ladder in `ladder.py`.
+"""
+import json
+import os
+import tempfile
+import unittest
+
+import ladder
+
+from game_agent import CustomPlayer
+from sample_players import improved_score
+from sample_players import open_move_score
+from tournament import score_from_elo
+
+
+def expected_records(ratings, games):
+    """Records whose wins are exactly the Bradley-Terry expectation."""
+    names = sorted(ratings)
+    records = []
+    for i, a in enumerate(names):
+        for b in names[i + 1:]:
+            wins = games * score_from_elo(ratings[a] - ratings[b])
+            records.append(ladder.Record(a, b, wins, games - wins))
+    return records
+
+
+class LadderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "ladder.jsonl")
+        self.store = ladder.ResultStore(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_store(self):
+        """ Test that results round-trip through the store """
+        self.assertEqual(self.store.records(), [])
+        added = [self.store.add("A", "B", 12, 8, "a1", "b1"),
+                 self.store.add("B", "C", 3, 17),
+                 self.store.add("A", "C", 20, 0, "a1")]
+        self.assertEqual(ladder.ResultStore(self.path).records(), added)
+
+        # stores written before the hashes were recorded still load
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"agent_1": "C", "agent_2": "D", "wins_1": 1, "wins_2": 1}) + "\n")
+        self.assertEqual(self.store.records()[-1], ladder.Record("C", "D", 1, 1, None, None))
+
+        self.assertEqual(self.store.forget("C"), 3)
+        self.assertEqual(self.store.records(), added[:1])
+
+    def test_invalidate(self):
+        """ Test that results of agents whose hash changed are discarded """
+        first = ladder.Ladder(self.store, {"A": "a1", "B": "b1"})
+        first.record("A", "B", 6, 4)
+        first.record("B", "C", 5, 5)
+        self.assertEqual(self.store.records()[0].hash_1, "a1")
+
+        self.assertEqual(ladder.Ladder(self.store, {"A": "a1", "B": "b1"}).invalidated, 0)
+        second = ladder.Ladder(self.store, {"A": "a2", "B": "b1"})
+        self.assertEqual(second.invalidated, 1)
+        self.assertEqual(second.opponents("A"), set())
+        self.assertEqual(second.opponents("B"), {"C"})
+
+    def test_config_hash(self):
+        """ Test that the hash follows the configuration of an agent """
+        def player(**kwargs):
+            return CustomPlayer(**dict({"score_fn": improved_score, "search_depth": 3}, **kwargs))
+
+        self.assertEqual(ladder.config_hash(player()), ladder.config_hash(player()))
+        self.assertNotEqual(ladder.config_hash(player()),
+                            ladder.config_hash(player(search_depth=4)))
+        self.assertNotEqual(ladder.config_hash(player()),
+                            ladder.config_hash(player(score_fn=open_move_score)))
+        self.assertIsNone(ladder.config_hash(object()))
+
+    def test_fit(self):
+        """ Test that the fit recovers the ratings of a known win matrix """
+        ratings = {"A": 200., "B": 0., "C": -100., "D": -300.}
+        fitted = ladder.fit_ratings(expected_records(ratings, 1000), prior=0.,
+                                    tolerance=1e-12, iterations=10000)
+        for name in ratings:
+            self.assertAlmostEqual(fitted[name] - fitted["B"], ratings[name], places=3)
+
+        # the prior keeps an unbeaten (and a winless) agent finite
+        fitted = ladder.fit_ratings([ladder.Record("A", "B", 10, 0)])
+        self.assertGreater(fitted["A"], 0.)
+        self.assertAlmostEqual(fitted["A"], -fitted["B"], delta=0.1)
+        self.assertLess(fitted["A"], 800.)
+        self.assertGreater(ladder.fit_ratings([ladder.Record("A", "B", 10, 0)], prior=0.1)["A"],
+                           fitted["A"])
+
+    def test_record(self):
+        """ Test that the incremental update is applied game by game """
+        board = ladder.Ladder(self.store)
+        board.record("A", "B", 40, 0)
+        # one update with the expectation of the first game would be 320
+        self.assertGreater(board.rating("A"), 0.)
+        self.assertLess(board.rating("A"), ladder.K_FACTOR * 40 * 0.5)
+        self.assertAlmostEqual(board.rating("A"), -board.rating("B"))
+
+        board.record("C", "D", 5, 5)
+        self.assertAlmostEqual(board.rating("C"), 0., delta=ladder.K_FACTOR / 2.)
+
+    def test_schedule(self):
+        """ Test the choice of opponents """
+        board = ladder.Ladder(self.store)
+        board.ratings = {"A": 0., "B": 50., "C": -20., "D": 300.}
+        candidates = ["A", "B", "C", "D"]
+        self.assertEqual(board.schedule("A", candidates, 2), "C")
+        board.record("A", "C", 1, 1)
+        self.assertEqual(board.schedule("A", candidates, 2), "B")
+        board.record("A", "B", 1, 1)
+        self.assertIsNone(board.schedule("A", candidates, 2))
+        self.assertEqual(board.schedule("A", candidates, 3), "D")
+        self.assertIsNone(board.schedule("A", ["A", "B", "C"], 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
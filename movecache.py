@@ -0,0 +1,206 @@
+"""
+Memoize the moves of deterministic agents across games, processes and runs.
+
+A fixed-depth `CustomPlayer` (the MM_* and AB_* agents of the tournament
+roster) always chooses the same move in the same position, so its moves can
+be looked up instead of searched again whenever a position recurs.
+`CachedPlayer` wraps such a player and stores its moves in a `MoveCache`,
+keyed by the agent configuration (see `agent_key()`) and the position.
+
+The cache is kept in memory and, optionally, in an SQLite database, which
+persists it between runs and lets any number of worker processes share it.
+Moves are only cached if the player finished its search (i.e., did not set
+`timed_out`), so wrapping an agent never changes the moves it plays, except
+that cached moves are returned before the clock can run out. Players whose
+settings cannot be described (see `describe()`) are not cached at all. The
+key also holds a hash of the source of the modules defining the player
+and its settings (see `resultcache.source_hash()`), so editing a score
+function or the search starts a fresh set of moves for the agent.
+"""
+
+import hashlib
+import inspect
+import sqlite3
+
+CACHE_FILE = "moves.sqlite"  # default location of the database
+# every player attribute that can change the chosen move
+AGENT_FIELDS = ["method", "search_depth", "iterative", "opening_moves",
+                "history", "extension_budget", "reduce_after", "TIMER_THRESHOLD",
+                "score", "batch_score", "endgame", "prior"]
+
+
+def describe(value, modules=None):
+    """
+    Describe a setting of a player as a string that identifies what the
+    setting does: values by their repr, functions by their qualified name,
+    bound methods by the object they are bound to, and objects (e.g.,
+    endgame tables or networks) by the dict returned by their
+    `config_key()` method. The names of the modules defining the functions,
+    classes and objects are added to the set `modules`, if given.
+
+    Raises ValueError for settings that cannot be described this way, such
+    as lambdas, nested functions and objects without `config_key()`.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[{}]".format(", ".join(describe(v, modules) for v in value))
+    if isinstance(value, dict):
+        items = sorted((describe(k, modules), describe(v, modules)) for k, v in value.items())
+        return "{{{}}}".format(", ".join("{}: {}".format(k, v) for k, v in items))
+    if inspect.ismethod(value):
+        return "{}.{}".format(describe(value.__self__, modules), value.__name__)
+    if inspect.isfunction(value) or inspect.isbuiltin(value) or inspect.isclass(value):
+        if "<" in value.__qualname__:
+            raise ValueError("cannot describe {}".format(value.__qualname__))
+        if modules is not None:
+            modules.add(value.__module__)
+        return "{}.{}".format(value.__module__, value.__qualname__)
+    if hasattr(value, "config_key"):
+        if modules is not None:
+            modules.add(type(value).__module__)
+        fields = sorted(value.config_key().items())
+        return "{}({})".format(type(value).__qualname__,
+                               ", ".join("{}={}".format(k, describe(v, modules))
+                                         for k, v in fields))
+    raise ValueError("cannot describe a {} setting".format(type(value).__qualname__))
+
+
+def agent_key(player):
+    """
+    Describe the configuration of a player as a string, e.g.
+    "CustomPlayer(method='alphabeta', search_depth=5, ..., source='9f2c...')",
+    where source is a hash of the source of the modules defining the player
+    class (and its base classes) and its settings. Players with the same key
+    must choose the same move in every position.
+
+    Raises ValueError if a setting of the player cannot be described (see
+    `describe()`).
+    """
+    from resultcache import CODE_MODULES, module_hash
+
+    # the search of a player may be inherited from another module
+    modules = set(CODE_MODULES) | {cls.__module__ for cls in type(player).__mro__}
+    fields = ["{}={}".format(name, describe(getattr(player, name), modules))
+              for name in AGENT_FIELDS if hasattr(player, name)]
+    hashes = [module_hash(name) for name in sorted(modules)]
+    fields.append("source={!r}".format(hashlib.sha256(" ".join(hashes).encode()).hexdigest()))
+    return "{}({})".format(type(player).__name__, ", ".join(fields))
+
+
+def position_key(game):
+    """
+    Describe a position as a string: the board size, the blocked cells and
+    the locations of the player to move and its opponent.
+    """
+    return "{}x{}:{:x}:{}:{}".format(
+        game.width, game.height, game.__board_state__,
+        game.get_player_location(game.active_player),
+        game.get_player_location(game.inactive_player))
+
+
+class MoveCache():
+    """Store of (agent, position) -> move.
+
+    Parameters
+    ----------
+    path : str (optional)
+        Location of the SQLite database backing the cache; it is created if
+        needed. If None, the cache only lives in memory.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.moves = {}
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+
+    def __getstate__(self):
+        # worker processes open their own connection (and start with an
+        # empty in-memory layer in front of the shared database)
+        state = self.__dict__.copy()
+        state.update(moves={}, _db=None)
+        return state
+
+    @property
+    def db(self):
+        if self._db is None and self.path is not None:
+            self._db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS moves (agent TEXT, position TEXT, "
+                             "row INTEGER, col INTEGER, PRIMARY KEY (agent, position))")
+        return self._db
+
+    def get(self, agent, position):
+        """Return the cached move, or None if the position is not cached."""
+        key = (agent, position)
+        move = self.moves.get(key)
+        if move is None and self.db is not None:
+            row = self.db.execute("SELECT row, col FROM moves WHERE agent = ? AND position = ?",
+                                  key).fetchone()
+            if row is not None:
+                move = self.moves[key] = tuple(row)
+        if move is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return move
+
+    def put(self, agent, position, move):
+        """Cache a move."""
+        self.moves[(agent, position)] = move
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO moves VALUES (?, ?, ?, ?)",
+                            (agent, position, move[0], move[1]))
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class CachedPlayer():
+    """Player that looks its moves up in a `MoveCache` before searching.
+
+    Parameters
+    ----------
+    player : object
+        The player to wrap; it must be deterministic, i.e., always choose the
+        same move in the same position (e.g., a `CustomPlayer` with
+        `iterative=False`).
+
+    cache : MoveCache
+        The cache to use, typically shared by every wrapped player.
+
+    key : str (optional)
+        The agent part of the cache keys; defaults to `agent_key(player)`,
+        or None (never cache) if the player cannot be described.
+    """
+
+    def __init__(self, player, cache, key=None):
+        self.player = player
+        self.cache = cache
+        if key is None:
+            try:
+                key = agent_key(player)
+            except ValueError:
+                pass
+        self.key = key
+
+    def get_move(self, game, legal_moves, time_left):
+        if not legal_moves:
+            return (-1, -1)
+        position = position_key(game)
+        move = None if self.key is None else self.cache.get(self.key, position)
+        if move is None:
+            # the wrapped player evaluates positions from its own point of
+            # view, so it must be registered on the board in place of the
+            # wrapper
+            game = game.copy()
+            game.__players__ = tuple(self.player if p is self else p for p in game.__players__)
+            move = self.player.get_move(game, legal_moves, time_left)
+            if self.key is not None and move in legal_moves and \
+                    not getattr(self.player, "timed_out", False):
+                self.cache.put(self.key, position, move)
+        return move
@@ -0,0 +1,186 @@
+"""
+This file contains test cases for the move cache in `movecache.py`.
+"""
+import inspect
+import os
+import pickle
+import tempfile
+import unittest
+
+import movecache
+import resultcache
+import tournament
+
+from benchmark import benchmark_positions
+from game_agent import CustomPlayer
+from game_agent import PhaseScore
+from sample_players import improved_score
+
+
+class CountingPlayer(CustomPlayer):
+    """Fixed-depth player that counts its searches."""
+
+    def __init__(self, **kwargs):
+        super(CountingPlayer, self).__init__(score_fn=improved_score, method="alphabeta",
+                                             iterative=False, **kwargs)
+        self.searches = 0
+
+    def get_move(self, game, legal_moves, time_left):
+        self.searches += 1
+        return super(CountingPlayer, self).get_move(game, legal_moves, time_left)
+
+
+class StubTable():
+    """Endgame table that knows no position."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def config_key(self):
+        return {"name": self.name}
+
+    def probe(self, game):
+        return None
+
+
+def prior_by_column(game, moves):
+    return [m[1] for m in moves]
+
+
+def prior_by_row(game, moves):
+    return [m[0] for m in moves]
+
+
+# constructor arguments stored under another attribute name, and arguments
+# that cannot change the chosen move
+RENAMED_ARGS = {"score_fn": "score", "timeout": "TIMER_THRESHOLD"}
+UNKEYED_ARGS = {"gc_control"}
+
+
+class MoveCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "moves.sqlite")
+
+    def tearDown(self):
+        resultcache._hashes.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def positions(self, player):
+        return benchmark_positions(count=10, players=(player, "opponent"))
+
+    def test_cached_moves(self):
+        """ Test that cached moves match the moves of the wrapped player """
+        reference = CountingPlayer()
+        player = CountingPlayer()
+        cached = movecache.CachedPlayer(player, movecache.MoveCache(self.path))
+        for _ in range(2):
+            for game, expected in zip(self.positions(cached), self.positions(reference)):
+                move = cached.get_move(game, game.get_legal_moves(), lambda: 1000.)
+                self.assertEqual(move, reference.get_move(expected, expected.get_legal_moves(),
+                                                          lambda: 1000.))
+        self.assertEqual(player.searches, 10)
+        self.assertEqual((cached.cache.hits, cached.cache.misses), (10, 10))
+
+        # the database persists the moves for other processes and runs
+        cache = pickle.loads(pickle.dumps(cached.cache))
+        other = movecache.CachedPlayer(CountingPlayer(), cache)
+        for game in self.positions(other):
+            other.get_move(game, game.get_legal_moves(), lambda: 1000.)
+        self.assertEqual(other.player.searches, 0)
+        cached.cache.close()
+        cache.close()
+
+    def test_agent_key(self):
+        """ Test that differently configured agents do not share moves """
+        cache = movecache.MoveCache(self.path)
+        shallow = movecache.CachedPlayer(CountingPlayer(search_depth=1), cache)
+        deep = movecache.CachedPlayer(CountingPlayer(search_depth=2), cache)
+        self.assertNotEqual(shallow.key, deep.key)
+        game = self.positions(shallow)[0]
+        shallow.get_move(game, game.get_legal_moves(), lambda: 1000.)
+        game = self.positions(deep)[0]
+        deep.get_move(game, game.get_legal_moves(), lambda: 1000.)
+        self.assertEqual(deep.player.searches, 1)
+        cache.close()
+
+    def test_source(self):
+        """ Test that editing the code behind an agent changes its key """
+        key = movecache.agent_key(CountingPlayer())
+        self.assertEqual(key, movecache.agent_key(CountingPlayer()))
+        for module in ["sample_players", "game_agent", "movecache_test", "isolation.isolation"]:
+            resultcache._hashes[module] = "edited"
+            self.assertNotEqual(movecache.agent_key(CountingPlayer()), key)
+            key = movecache.agent_key(CountingPlayer())
+
+        # so does editing a module the player only uses through a setting
+        key = movecache.agent_key(CountingPlayer(prior=prior_by_column))
+        resultcache._hashes["movecache_test"] = "edited again"
+        self.assertNotEqual(movecache.agent_key(CountingPlayer(prior=prior_by_column)), key)
+
+    def test_settings(self):
+        """ Test that every setting that can change the move is in the key """
+        parameters = inspect.signature(CustomPlayer.__init__).parameters
+        for name in parameters:
+            if name != "self" and name not in UNKEYED_ARGS:
+                self.assertIn(RENAMED_ARGS.get(name, name), movecache.AGENT_FIELDS)
+
+        base = movecache.agent_key(CountingPlayer())
+        for kwargs in [{"timeout": 20.}, {"prior": prior_by_column},
+                       {"endgame": StubTable("a")}, {"history": True}]:
+            key = movecache.agent_key(CountingPlayer(**kwargs))
+            self.assertNotEqual(key, base)
+            self.assertEqual(key, movecache.agent_key(CountingPlayer(**kwargs)))
+        self.assertNotEqual(movecache.agent_key(CountingPlayer(prior=prior_by_column)),
+                            movecache.agent_key(CountingPlayer(prior=prior_by_row)))
+        self.assertNotEqual(movecache.agent_key(CountingPlayer(endgame=StubTable("a"))),
+                            movecache.agent_key(CountingPlayer(endgame=StubTable("b"))))
+
+        # players with settings that cannot be described are never cached
+        cache = movecache.MoveCache()
+        cached = movecache.CachedPlayer(CountingPlayer(prior=lambda game, moves: [0] * len(moves)),
+                                        cache)
+        self.assertIsNone(cached.key)
+        for _ in range(2):
+            game = self.positions(cached)[0]
+            self.assertIn(cached.get_move(game, game.get_legal_moves(), lambda: 1000.),
+                          game.get_legal_moves())
+        self.assertEqual((cached.player.searches, cache.moves), (2, {}))
+
+    def test_roster(self):
+        """ Test that every agent of the tournament has its own key """
+        agents = tournament.make_roster() + tournament.make_test_agents(extra=True)
+        cache = movecache.MoveCache()
+        keys = [movecache.CachedPlayer(agent.player, cache).key for agent in agents]
+        self.assertNotIn(None, keys)
+        self.assertEqual(len(set(keys)), len(keys))
+
+        # the thresholds a score function settles on for a board size are
+        # not part of its configuration
+        phased = CustomPlayer(score_fn=PhaseScore(), search_depth=2, method="alphabeta",
+                              iterative=False)
+        key = movecache.agent_key(phased)
+        cached = movecache.CachedPlayer(phased, cache)
+        for _ in range(2):
+            game = self.positions(cached)[0]
+            cached.get_move(game, game.get_legal_moves(), lambda: 1000.)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(movecache.agent_key(phased), key)
+        self.assertNotEqual(movecache.agent_key(CustomPlayer(
+            score_fn=PhaseScore(thresholds={(7, 7): (20, 10)}), search_depth=2,
+            method="alphabeta", iterative=False)), key)
+
+    def test_timeout(self):
+        """ Test that moves of interrupted searches are not cached """
+        cache = movecache.MoveCache(self.path)
+        cached = movecache.CachedPlayer(CountingPlayer(), cache)
+        for _ in range(2):
+            game = self.positions(cached)[0]
+            cached.get_move(game, game.get_legal_moves(), lambda: 0.)
+        self.assertEqual(cached.player.searches, 2)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,339 @@
+"""
+A small policy/value network evaluator in pure NumPy (CPU only).
+
+`research/research_review.md` reviews the value and policy networks of
+AlphaGo; this module brings a (much smaller) learned evaluation to the
+project. A `Network` reads a position as three planes seen from the player
+to move (blank squares, own location, opponent location; see `encode()`)
+and returns
+
+    value    the expected result for the player to move, in [-1, 1]
+    policy   a logit for moving to each square of the board
+
+from a multilayer perceptron with one shared hidden layer. Positions are
+evaluated in batches, one matrix product per layer for the whole batch, so
+the interpreter overhead is paid once per batch rather than per position.
+
+The network plugs into the agents in three ways:
+
+    CustomPlayer(score_fn=network.score)                 value as the heuristic
+    CustomPlayer(prior=network.prior, ...)               policy as move ordering
+    GreedyPlayer(network.score, network.batch_score)     batched evaluation
+
+Weights are trained from self-play logs of a search agent:
+
+    python network.py selfplay --games 500 --out selfplay.npz
+    python network.py train --data selfplay.npz --out network.npz
+    python benchmark.py network --weights network.npz
+
+Requires NumPy, which the rest of the project does not depend on.
+"""
+
+import argparse
+import hashlib
+import random
+
+import numpy as np
+
+from isolation import Board
+
+HIDDEN = 64  # units in the hidden layer
+PLANES = 3  # blank squares, own location, opponent location
+SELF_PLAY_DEPTH = 3  # search depth of the agents generating the logs
+EPOCHS = 20
+BATCH_SIZE = 256
+LEARNING_RATE = 0.01
+MOMENTUM = 0.9
+
+
+def encode(games):
+    """
+    Encode positions as planes seen from the player to move.
+
+    Parameters
+    ----------
+    games : list<`isolation.Board`>
+        Positions on boards of the same size.
+
+    Returns
+    ----------
+    numpy.ndarray
+        A float32 array of shape (len(games), 3, height, width): the blank
+        squares, the location of the player to move and the location of its
+        opponent (all zero for a player that has not been placed yet).
+    """
+    width, height = games[0].width, games[0].height
+    cells = width * height
+    nbytes = (cells + 7) // 8
+    # cells are numbered column-major, so the bits unpack as (col, row)
+    blocked = np.frombuffer(b"".join(g.__board_state__.to_bytes(nbytes, "little")
+                                     for g in games), dtype=np.uint8)
+    bits = np.unpackbits(blocked.reshape(len(games), nbytes), axis=1,
+                         bitorder="little")[:, :cells]
+    planes = np.zeros((len(games), PLANES, height, width), dtype=np.float32)
+    planes[:, 0] = 1 - bits.reshape(len(games), width, height).transpose(0, 2, 1)
+    for i, game in enumerate(games):
+        for plane, player in [(1, game.active_player), (2, game.inactive_player)]:
+            loc = game.get_player_location(player)
+            if loc is not None:
+                planes[i, plane, loc[0], loc[1]] = 1.
+    return planes
+
+
+def move_index(move, width):
+    """Return the index of the policy logit of a (row, col) move."""
+    return move[0] * width + move[1]
+
+
+class Network():
+    """Policy/value network for boards of one size.
+
+    Parameters
+    ----------
+    width, height : int (optional)
+        The size of the board.
+
+    hidden : int (optional)
+        The number of units in the hidden layer.
+
+    seed : int (optional)
+        Seed of the random initial weights.
+
+    Attributes
+    ----------
+    weights : dict<str, numpy.ndarray>
+        The parameters of the layers: "hidden_w", "hidden_b", "value_w",
+        "value_b", "policy_w" and "policy_b".
+    """
+
+    def __init__(self, width=7, height=7, hidden=HIDDEN, seed=0):
+        self.width = width
+        self.height = height
+        rng = np.random.default_rng(seed)
+        inputs = PLANES * width * height
+        cells = width * height
+
+        def layer(rows, cols):
+            return (rng.standard_normal((rows, cols)) * np.sqrt(2. / rows)).astype(np.float32)
+
+        self.weights = {
+            "hidden_w": layer(inputs, hidden), "hidden_b": np.zeros(hidden, np.float32),
+            "value_w": layer(hidden, 1), "value_b": np.zeros(1, np.float32),
+            "policy_w": layer(hidden, cells), "policy_b": np.zeros(cells, np.float32),
+        }
+
+    def save(self, path):
+        np.savez(path, width=self.width, height=self.height, **self.weights)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            network = cls(int(data["width"]), int(data["height"]), data["hidden_b"].size)
+            network.weights = {name: data[name] for name in network.weights}
+        return network
+
+    def config_key(self):
+        """Identify the network by a hash of its weights (see
+        `movecache.describe()`)."""
+        digest = hashlib.sha256()
+        for name in sorted(self.weights):
+            digest.update(name.encode())
+            digest.update(np.ascontiguousarray(self.weights[name]).tobytes())
+        return {"width": self.width, "height": self.height, "sha256": digest.hexdigest()}
+
+    def forward(self, planes):
+        """
+        Evaluate a batch of encoded positions (see `encode()`).
+
+        Returns
+        ----------
+        (numpy.ndarray, numpy.ndarray)
+            The value of each position for the player to move, of shape (n,),
+            and the policy logits of shape (n, height * width), indexed by
+            `move_index()`.
+        """
+        w = self.weights
+        x = planes.reshape(len(planes), -1)
+        h = np.maximum(x @ w["hidden_w"] + w["hidden_b"], 0.)
+        values = np.tanh(h @ w["value_w"] + w["value_b"])[:, 0]
+        return values, h @ w["policy_w"] + w["policy_b"]
+
+    def evaluate(self, games):
+        """Return the values and policy logits of a list of positions."""
+        return self.forward(encode(games))
+
+    def score(self, game, player):
+        """Heuristic value of `game` to `player` (a `score_fn`)."""
+        return float(self.batch_score([game], player)[0])
+
+    def batch_score(self, games, player):
+        """Heuristic values of several positions to `player` at once (a
+        `batch_score_fn` for `GreedyPlayer`)."""
+        scores = np.empty(len(games))
+        pending = []
+        for i, game in enumerate(games):
+            if game.is_loser(player):
+                scores[i] = float("-inf")
+            elif game.is_winner(player):
+                scores[i] = float("inf")
+            else:
+                pending.append(i)
+        if pending:
+            values, _ = self.evaluate([games[i] for i in pending])
+            to_move = np.array([games[i].active_player == player for i in pending])
+            scores[pending] = np.where(to_move, values, -values)
+        return scores
+
+    def prior(self, game, moves):
+        """Policy logits of the legal `moves` of the player to move in `game`
+        (a `prior` for `CustomPlayer`)."""
+        _, logits = self.evaluate([game])
+        return logits[0, [move_index(m, self.width) for m in moves]].tolist()
+
+    def train(self, planes, moves, outcomes, epochs=EPOCHS, batch_size=BATCH_SIZE,
+              learning_rate=LEARNING_RATE, seed=0):
+        """
+        Fit the network to logged positions by stochastic gradient descent
+        with momentum, minimizing the squared error of the value plus the
+        cross-entropy of the policy.
+
+        Parameters
+        ----------
+        planes : numpy.ndarray
+            Encoded positions (see `encode()`).
+
+        moves : numpy.ndarray
+            The `move_index()` of the move played in each position.
+
+        outcomes : numpy.ndarray
+            The result of each game for the player to move: 1 for a win and
+            -1 for a loss.
+
+        Returns
+        ----------
+        list<float>
+            The average loss of each epoch.
+        """
+        rng = np.random.default_rng(seed)
+        w = self.weights
+        velocity = {name: np.zeros_like(value) for name, value in w.items()}
+        x_all = planes.reshape(len(planes), -1).astype(np.float32)
+        losses = []
+        for _ in range(epochs):
+            order = rng.permutation(len(x_all))
+            total = 0.
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                x, z, target = x_all[idx], outcomes[idx], moves[idx]
+                n = len(idx)
+
+                pre = x @ w["hidden_w"] + w["hidden_b"]
+                h = np.maximum(pre, 0.)
+                v = np.tanh(h @ w["value_w"] + w["value_b"])[:, 0]
+                logits = h @ w["policy_w"] + w["policy_b"]
+                logits -= logits.max(axis=1, keepdims=True)
+                probs = np.exp(logits)
+                probs /= probs.sum(axis=1, keepdims=True)
+                total += (np.sum((v - z) ** 2) -
+                          np.sum(np.log(probs[np.arange(n), target] + 1e-12)))
+
+                d_value = (2. * (v - z) * (1. - v ** 2) / n)[:, None]
+                d_policy = probs
+                d_policy[np.arange(n), target] -= 1.
+                d_policy /= n
+                d_hidden = (d_value @ w["value_w"].T + d_policy @ w["policy_w"].T) * (pre > 0)
+                grads = {
+                    "hidden_w": x.T @ d_hidden, "hidden_b": d_hidden.sum(axis=0),
+                    "value_w": h.T @ d_value, "value_b": d_value.sum(axis=0),
+                    "policy_w": h.T @ d_policy, "policy_b": d_policy.sum(axis=0),
+                }
+                for name, grad in grads.items():
+                    velocity[name] = MOMENTUM * velocity[name] - learning_rate * grad
+                    w[name] += velocity[name].astype(np.float32)
+            losses.append(total / len(order))
+        return losses
+
+
+def self_play(player_1, player_2, num_games, width=7, height=7, seed=0):
+    """
+    Log the positions of games between two players, starting from random
+    openings (two random moves, as in tournament.py). The players are
+    called without a time limit, so they should search to a fixed depth.
+
+    Returns
+    ----------
+    dict<str, numpy.ndarray>
+        "planes" (the encoded positions, see `encode()`), "moves" (the
+        `move_index()` of the move played) and "outcomes" (1 if the player to
+        move won the game, -1 otherwise).
+    """
+    random.seed(seed)
+    positions, moves, outcomes = [], [], []
+    for i in range(num_games):
+        players = (player_1, player_2) if i % 2 == 0 else (player_2, player_1)
+        game = Board(players[0], players[1], width, height)
+        for _ in range(2):
+            game.apply_move(random.choice(game.get_legal_moves()))
+        movers = []
+        while True:
+            legal_moves = game.get_legal_moves()
+            if not legal_moves:
+                break
+            move = game.active_player.get_move(game.copy(), legal_moves, lambda: float("inf"))
+            if move not in legal_moves:
+                break
+            positions.append(game.copy())
+            moves.append(move_index(move, width))
+            movers.append(game.__active__)
+            game.apply_move(move)
+        # the player to move at the end has lost
+        outcomes.extend(-1 if mover == game.__active__ else 1 for mover in movers)
+    return {"planes": encode(positions).astype(np.uint8),
+            "moves": np.array(moves, dtype=np.int64),
+            "outcomes": np.array(outcomes, dtype=np.float32)}
+
+
+def main(argv=None):
+    from game_agent import CustomPlayer
+    from sample_players import improved_score
+
+    parser = argparse.ArgumentParser(description="Train the policy/value network.")
+    parser.add_argument("--size", type=int, default=7,
+                        help="board width and height (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+    play = subparsers.add_parser("selfplay", help="log self-play games")
+    play.add_argument("--games", type=int, default=500)
+    play.add_argument("--weights", metavar="PATH",
+                      help="play with a trained network as the heuristic instead "
+                           "of the improved score")
+    play.add_argument("--out", default="selfplay.npz")
+    fit = subparsers.add_parser("train", help="train the network on self-play logs")
+    fit.add_argument("--data", nargs="+", default=["selfplay.npz"])
+    fit.add_argument("--epochs", type=int, default=EPOCHS)
+    fit.add_argument("--hidden", type=int, default=HIDDEN)
+    fit.add_argument("--out", default="network.npz")
+    args = parser.parse_args(argv)
+
+    if args.command == "selfplay":
+        score_fn = Network.load(args.weights).score if args.weights else improved_score
+        players = [CustomPlayer(search_depth=SELF_PLAY_DEPTH, score_fn=score_fn,
+                                method="alphabeta", iterative=False) for _ in range(2)]
+        log = self_play(players[0], players[1], args.games, args.size, args.size, args.seed)
+        np.savez_compressed(args.out, **log)
+        print("{} positions from {} games written to {}".format(
+            len(log["moves"]), args.games, args.out))
+    else:
+        logs = [np.load(path) for path in args.data]
+        planes, moves, outcomes = (np.concatenate([log[name] for log in logs])
+                                   for name in ["planes", "moves", "outcomes"])
+        network = Network(args.size, args.size, args.hidden, args.seed)
+        for epoch, loss in enumerate(network.train(planes, moves, outcomes, args.epochs,
+                                                   seed=args.seed)):
+            print("epoch {:>3}: loss {:.4f}".format(epoch + 1, loss))
+        network.save(args.out)
+
+
+if __name__ == "__main__":
+    main()
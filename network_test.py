@@ -0,0 +1,112 @@
+"""
+This file contains test cases for the NumPy network evaluator in
+`network.py` and for move ordering by a prior in `CustomPlayer`.
+"""
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    import network
+except ImportError:
+    np = network = None
+
+from isolation import Board
+from benchmark import benchmark_positions
+from game_agent import CustomPlayer
+from sample_players import GreedyPlayer
+from sample_players import improved_score
+
+
+class PriorTest(unittest.TestCase):
+
+    def test_prior(self):
+        """ Test that a prior orders the moves without changing the result """
+        calls = []
+
+        def prior(game, moves):
+            calls.append(len(moves))
+            return [m[1] for m in moves]  # prefer moves to higher columns
+
+        def players(**kwargs):
+            return CustomPlayer(search_depth=3, score_fn=improved_score, method="alphabeta",
+                                iterative=False, **kwargs)
+
+        player, reference = players(prior=prior), players()
+        for p in (player, reference):
+            p.time_left = lambda: 1000.
+        for game, expected in zip(benchmark_positions(count=5, players=(player, "opponent")),
+                                  benchmark_positions(count=5, players=(reference, "opponent"))):
+            self.assertEqual(player.alphabeta(game, 3)[0], reference.alphabeta(expected, 3)[0])
+        self.assertTrue(calls)
+
+
+@unittest.skipIf(network is None, "requires NumPy")
+class NetworkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.positions = benchmark_positions(count=20, players=("player1", "player2"))
+        self.network = network.Network(seed=0)
+
+    def test_encode(self):
+        """ Test the planes seen from the player to move """
+        game = self.positions[0]
+        planes = network.encode([game])[0]
+        self.assertEqual(planes.shape, (3, game.height, game.width))
+        self.assertEqual(planes[0].sum(), len(game.get_blank_spaces()))
+        for plane, player in [(1, game.active_player), (2, game.inactive_player)]:
+            row, col = game.get_player_location(player)
+            self.assertEqual(planes[plane, row, col], 1.)
+            self.assertEqual(planes[plane].sum(), 1.)
+
+    def test_batch(self):
+        """ Test that a batch gives the same results as single positions """
+        values, logits = self.network.evaluate(self.positions)
+        for i, game in enumerate(self.positions):
+            value, logit = self.network.evaluate([game])
+            np.testing.assert_allclose(value[0], values[i], rtol=1e-5)
+            np.testing.assert_allclose(logit[0], logits[i], rtol=1e-4, atol=1e-5)
+
+    def test_score(self):
+        """ Test the score_fn and batch_score_fn interfaces """
+        game = self.positions[0]
+        player, opponent = game.active_player, game.inactive_player
+        score = self.network.score(game, player)
+        self.assertIsInstance(score, float)
+        self.assertAlmostEqual(score, -self.network.score(game, opponent), places=5)
+        scores = self.network.batch_score(self.positions, "player1")
+        for game, score in zip(self.positions, scores):
+            self.assertAlmostEqual(score, self.network.score(game, "player1"), places=5)
+
+        greedy = GreedyPlayer(self.network.score, self.network.batch_score)
+        game = Board(greedy, "opponent")
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        legal_moves = game.get_legal_moves()
+        self.assertEqual(greedy.get_moves([game], [legal_moves], None),
+                         [greedy.get_move(game, legal_moves, None)])
+
+    def test_train(self):
+        """ Test that training on self-play logs reduces the loss """
+        players = [CustomPlayer(search_depth=1, score_fn=improved_score, method="alphabeta",
+                                iterative=False) for _ in range(2)]
+        log = network.self_play(players[0], players[1], 10, 5, 5)
+        self.assertEqual(len(log["planes"]), len(log["moves"]))
+        self.assertEqual(set(log["outcomes"].tolist()), {-1., 1.})
+        net = network.Network(5, 5, hidden=16)
+        losses = net.train(log["planes"], log["moves"], log["outcomes"], epochs=10,
+                           batch_size=32)
+        self.assertLess(losses[-1], losses[0])
+
+        path = os.path.join(tempfile.mkdtemp(), "network.npz")
+        net.save(path)
+        loaded = network.Network.load(path)
+        os.remove(path)
+        planes = log["planes"][:5]
+        for expected, actual in zip(net.forward(planes), loaded.forward(planes)):
+            np.testing.assert_array_equal(expected, actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
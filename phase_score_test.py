@@ -0,0 +1,69 @@
+"""
+This file contains test cases for the phase-aware score function
+`game_agent.PhaseScore`.
+"""
+import unittest
+
+from benchmark import random_positions
+from game_agent import PhaseScore
+
+
+class StubTable():
+    """Endgame table that knows the result of every position with an even
+    number of moves."""
+
+    def probe(self, game):
+        return None if game.move_count % 2 else True
+
+
+def cheap_fn(game, player):
+    return 1.
+
+
+def rollout_fn(game, player):
+    return 2.
+
+
+def random_game(width=7, height=7, seed=0):
+    """Every position of a seeded random game before its end."""
+    return [game for game in random_positions(width, height, 1, seed)
+            if game.get_legal_moves()]
+
+
+class PhaseScoreTest(unittest.TestCase):
+
+    def test_thresholds(self):
+        """ Test the default and per board size thresholds """
+        scorer = PhaseScore(thresholds={(5, 5): (10, 4)})
+        self.assertEqual(scorer.blank_thresholds(7, 7), (19, 9))
+        self.assertEqual(scorer.blank_thresholds(5, 5), (10, 4))
+        for game in random_game(5, 5):
+            blanks = len(game.get_blank_spaces())
+            expected = "cheap" if blanks > 10 else "rollout" if blanks > 4 else "exact"
+            self.assertEqual(scorer.phase(game), expected)
+
+    def test_dispatch(self):
+        """ Test that each phase uses its heuristic """
+        scorer = PhaseScore(cheap_fn, rollout_fn, StubTable(), {(7, 7): (40, 30)})
+        for seed in range(5):
+            for game in random_game(seed=seed):
+                phase = scorer.phase(game)
+                score = scorer(game, game.active_player)
+                if phase == "cheap":
+                    self.assertEqual(score, 1.)
+                elif phase == "rollout" or game.move_count % 2:
+                    self.assertEqual(score, 2.)
+                else:
+                    self.assertEqual(score, float("inf"))
+                    self.assertEqual(scorer(game, game.inactive_player), float("-inf"))
+        self.assertTrue(all(scorer.calls.values()))
+
+        # without a table, unsolved positions use the rollout heuristic
+        scorer = PhaseScore(cheap_fn, rollout_fn, thresholds={(7, 7): (40, 30)})
+        game = [g for g in random_game() if g.move_count % 2 == 0][-1]
+        self.assertEqual(scorer.phase(game), "exact")
+        self.assertEqual(scorer(game, game.active_player), 2.)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+Attribute the time spent by agents to the phases of the search.
+
+`SamplingProfiler` is a context manager that samples the call stack of a
+thread from a background thread at a fixed interval, so the code being
+profiled runs unmodified and the overhead does not depend on how many calls
+it makes. Every sample inside a `get_move()` call is attributed to the
+outermost phase on the stack:
+
+    copy      Board.copy() and Board.forecast_move()
+    movegen   move generation and mobility counts on the Board
+    eval      score functions (see `register()` and `phase()`)
+    timeout   the time_left() functions of the clocks in `isolation.clocks`
+    search    anything else inside get_move(), i.e., the search itself
+
+so, e.g., a move generated by a score function counts as evaluation. The
+samples can also be written in the collapsed-stack format read by
+flamegraph.pl, speedscope and similar tools.
+
+Usage:
+
+    with SamplingProfiler() as profiler:
+        game.play()
+    profiler.print_phases()
+    profiler.write_collapsed("isolation.folded")
+
+or `python tournament.py --profile isolation.folded`.
+"""
+
+import os
+import sys
+import threading
+import types
+
+from collections import Counter
+
+from isolation import Board
+from isolation import clocks
+
+INTERVAL = 0.005  # seconds between samples (the default GIL switch interval)
+PHASE_NAMES = ["search", "movegen", "copy", "eval", "timeout"]
+MOVE_FUNCTIONS = {"get_move", "get_moves"}
+
+_phases = {}  # code object -> phase name
+
+
+def register(fn, name):
+    """Attribute the time spent in `fn` (and everything it calls) to a phase."""
+    _phases[getattr(fn, "__code__", fn)] = name
+
+
+def phase(name):
+    """Decorator form of `register()`; the function is returned unchanged,
+    so it costs nothing when no profiler is running."""
+    def decorator(fn):
+        register(fn, name)
+        return fn
+    return decorator
+
+
+for _fn in [Board.copy, Board.forecast_move]:
+    register(_fn, "copy")
+for _fn in [Board.get_legal_moves, Board.iter_legal_moves, Board.has_legal_move,
+            Board.mobility, Board.second_order_mobility]:
+    register(_fn, "movegen")
+for _fn in [clocks.WallClock.timer, clocks.CpuClock.timer, clocks.NodeClock.timer,
+            clocks.RecordingClock.timer]:
+    for _code in _fn.__code__.co_consts:
+        if isinstance(_code, types.CodeType):
+            register(_code, "timeout")
+
+
+def frame_label(code):
+    """Name a code object for collapsed stacks, e.g. `CustomPlayer.alphabeta (game_agent.py)`."""
+    return "{} ({})".format(getattr(code, "co_qualname", code.co_name),
+                            os.path.basename(code.co_filename))
+
+
+class SamplingProfiler():
+    """Sample the stack of a thread while the context is active.
+
+    Parameters
+    ----------
+    interval : float (optional)
+        Seconds between samples. Samples are only taken when the profiled
+        thread releases the GIL, so the effective interval is at least the
+        interpreter switch interval (see `sys.getswitchinterval()`).
+
+    thread : threading.Thread (optional)
+        The thread to profile; by default the thread entering the context.
+
+    Attributes
+    ----------
+    stacks : collections.Counter
+        The number of samples of each stack, as tuples of code objects from
+        the outermost frame inwards.
+    """
+
+    def __init__(self, interval=INTERVAL, thread=None):
+        self.interval = interval
+        self.thread_id = thread.ident if thread is not None else None
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def __enter__(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._sampler.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def phases(self):
+        """
+        Return a Counter of samples per phase (see the module docstring);
+        samples outside of get_move() are counted as "other".
+        """
+        counts = Counter()
+        for stack, count in self.stacks.items():
+            counts[self.classify(stack)] += count
+        return counts
+
+    @staticmethod
+    def classify(stack):
+        """Return the phase of a stack of code objects (outermost first)."""
+        name = "other"
+        for code in stack:
+            if name == "other":
+                if code.co_name in MOVE_FUNCTIONS:
+                    name = "search"
+            elif code in _phases:
+                return _phases[code]
+        return name
+
+    def print_phases(self):
+        """Print the share of the samples spent in each phase."""
+        counts = self.phases()
+        total = sum(counts.values()) - counts["other"]
+        print("{:>10}{:>10}{:>10}".format("phase", "samples", "share"))
+        for name in PHASE_NAMES:
+            print("{:>10}{:>10}{:>10.1%}".format(name, counts[name],
+                                                 counts[name] / max(total, 1)))
+
+    def write_collapsed(self, path):
+        """
+        Write the samples in the collapsed-stack format (one line per stack:
+        frames separated by semicolons, then the sample count), with the
+        phase of each stack as the root frame.
+        """
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items(), key=lambda x: -x[1]):
+                frames = [self.classify(stack)] + [frame_label(c) for c in stack]
+                f.write("{} {}\n".format(";".join(frames), count))
@@ -0,0 +1,44 @@
+"""
+This file contains test cases for the sampling profiler in `profiler.py`.
+"""
+import os
+import random
+import tempfile
+import unittest
+
+import profiler
+
+from game_agent import CustomPlayer
+from game_agent import mcs_score
+from isolation import Board
+from sample_players import improved_score
+
+
+class SamplingProfilerTest(unittest.TestCase):
+
+    def test_phases(self):
+        """ Test that samples of a game are attributed to search phases """
+        profiler.register(mcs_score, "eval")
+        random.seed(0)
+        player1 = CustomPlayer(score_fn=mcs_score, method="alphabeta")
+        player2 = CustomPlayer(score_fn=improved_score, method="alphabeta")
+        with profiler.SamplingProfiler() as sampler:
+            Board(player1, player2).play(time_limit=50)
+
+        counts = sampler.phases()
+        self.assertEqual(sum(counts.values()), sum(sampler.stacks.values()))
+        self.assertTrue(counts["eval"])
+        self.assertLessEqual(set(counts), set(profiler.PHASE_NAMES) | {"other"})
+
+        path = os.path.join(tempfile.mkdtemp(), "profile.folded")
+        sampler.write_collapsed(path)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        os.remove(path)
+        self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in lines),
+                         sum(sampler.stacks.values()))
+        self.assertTrue(all(line.split(";")[0] in counts for line in lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
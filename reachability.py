@@ -0,0 +1,156 @@
+"""
+Knight-distance maps and territory evaluation.
+
+The heuristics in `sample_players.py` only count the moves available right
+now. `territory_score` instead looks at the whole board: it counts the blank
+squares each player can reach (by a sequence of knight moves over blank
+squares) strictly before its opponent.
+
+Distances are computed with bitboards over the cell numbering of
+`isolation.Board`. A breadth-first search expands a whole layer of squares
+at once by shifting it along each of the eight knight directions (see
+`knight_shifts()`), so it costs a few big-int operations per layer instead of
+a loop over squares. `distance_map()` returns the layers of such a search:
+layer `d` is the bitmap of the squares first reached after `d` moves.
+
+`territory()` runs the searches of both players in lockstep and stops
+expanding a square once either player has reached it: a square reached
+through a square the opponent reached first is reached first by the
+opponent too, so the result is the same as comparing two full distance maps
+at about half the cost. Positions almost never repeat within a search (a
+player's location depends on the order of its moves), so the results are not
+cached; recomputing them is cheaper than looking them up.
+"""
+
+from isolation.isolation import DIRECTIONS
+
+_shifts = {}
+
+
+def knight_shifts(width, height):
+    """
+    Return the bit shifts of the knight moves on a board of the given size.
+
+    Returns
+    ----------
+    (list<(int, int)>, list<(int, int)>)
+        The (source mask, shift) pairs of the moves to higher and to lower
+        cell indices, where the source mask holds the cells from which the
+        move stays on the board.
+    """
+    key = (width, height)
+    if key not in _shifts:
+        up, down = [], []
+        for dr, dc in DIRECTIONS:
+            mask = 0
+            for col in range(width):
+                for row in range(height):
+                    if 0 <= row + dr < height and 0 <= col + dc < width:
+                        mask |= 1 << row + col * height
+            shift = dr + dc * height
+            if shift > 0:
+                up.append((mask, shift))
+            else:
+                down.append((mask, -shift))
+        _shifts[key] = (up, down)
+    return _shifts[key]
+
+
+def expand(layer, shifts):
+    """Return the bitmap of the squares one knight move away from `layer`."""
+    up, down = shifts
+    reached = 0
+    for mask, shift in up:
+        reached |= (layer & mask) << shift
+    for mask, shift in down:
+        reached |= (layer & mask) >> shift
+    return reached
+
+
+def distance_layers(blocked, start, shifts):
+    """
+    Return the distances from the square with bit `start` over the squares
+    not in `blocked`, as a tuple of bitmaps where item `d` holds the squares
+    first reached after `d` moves (item 0 is `start`).
+    """
+    layers = [start]
+    seen = blocked | start
+    frontier = start
+    while True:
+        frontier = expand(frontier, shifts) & ~seen
+        if not frontier:
+            return tuple(layers)
+        seen |= frontier
+        layers.append(frontier)
+
+
+def _location_bit(game, player):
+    loc = game.get_player_location(player)
+    return None if loc is None else 1 << loc[0] + loc[1] * game.height
+
+
+def distance_map(game, player):
+    """
+    Return the distance layers (see `distance_layers()`) from the location
+    of a player over the blank squares of a game, or None if the player has
+    not been placed on the board yet.
+    """
+    start = _location_bit(game, player)
+    if start is None:
+        return None
+    return distance_layers(game.__board_state__, start, knight_shifts(game.width, game.height))
+
+
+def territory(game, player):
+    """
+    Return the number of blank squares `player` reaches strictly before its
+    opponent and the number its opponent reaches first, as a pair; squares
+    both reach after the same number of moves count for neither. Returns
+    None if either player has not been placed on the board yet.
+    """
+    own = _location_bit(game, player)
+    opp = _location_bit(game, game.get_opponent(player))
+    if own is None or opp is None:
+        return None
+    shifts = knight_shifts(game.width, game.height)
+    claimed = game.__board_state__
+    own_first = opp_first = 0
+    while own or opp:
+        own = expand(own, shifts) & ~claimed
+        opp = expand(opp, shifts) & ~claimed
+        tied = own & opp
+        claimed |= own | opp
+        own_first |= own ^ tied
+        opp_first |= opp ^ tied
+    return bin(own_first).count("1"), bin(opp_first).count("1")
+
+
+def territory_score(game, player):
+    """The difference between the number of blank squares `player` reaches
+    before its opponent and the number its opponent reaches first (see
+    `territory()`); the "Improved" score before both players are placed.
+
+    Parameters
+    ----------
+    game : `isolation.Board`
+        An instance of `isolation.Board` encoding the current state of the
+        game (e.g., player locations and blocked cells).
+
+    player : hashable
+        One of the objects registered by the game object as a valid player.
+
+    Returns
+    ----------
+    float
+        The heuristic value of the current game state
+    """
+    if game.is_loser(player):
+        return float("-inf")
+
+    if game.is_winner(player):
+        return float("inf")
+
+    counts = territory(game, player)
+    if counts is None:
+        return float(game.mobility(player) - game.mobility(game.get_opponent(player)))
+    return float(counts[0] - counts[1])
@@ -0,0 +1,69 @@
+"""
+This file contains test cases for the distance maps and the territory
+heuristic in `reachability.py`.
+"""
+import unittest
+
+import reachability
+
+from benchmark import random_positions
+from isolation import Board
+from isolation.isolation import knight_tables
+
+
+def bfs_distances(game, player):
+    """Distance of every reachable blank cell index, one square at a time."""
+    neighbors = knight_tables(game.width, game.height)[2]
+    blocked = game.__board_state__
+    row, col = game.get_player_location(player)
+    distances = {row + col * game.height: 0}
+    queue = list(distances)
+    for idx in queue:
+        for n in neighbors[idx]:
+            if not blocked >> n & 1 and n not in distances:
+                distances[n] = distances[idx] + 1
+                queue.append(n)
+    return distances
+
+
+class ReachabilityTest(unittest.TestCase):
+
+    def test_distance_map(self):
+        """ Test distance maps against a square-by-square search """
+        for width, height in [(7, 7), (5, 8), (9, 6)]:
+            for game in random_positions(width, height, 20):
+                for player in ("player1", "player2"):
+                    layers = reachability.distance_map(game, player)
+                    if layers is None:
+                        self.assertIsNone(game.get_player_location(player))
+                        continue
+                    distances = {idx: d for d, layer in enumerate(layers)
+                                 for idx in range(width * height) if layer >> idx & 1}
+                    self.assertEqual(distances, bfs_distances(game, player))
+
+    def test_territory(self):
+        """ Test territory counts against comparing full distance maps """
+        for game in random_positions(7, 7, 20):
+            if game.move_count < 2:
+                self.assertIsNone(reachability.territory(game, "player1"))
+                continue
+            own = bfs_distances(game, "player1")
+            opp = bfs_distances(game, "player2")
+            inf = float("inf")
+            expected = (sum(own[i] < opp.get(i, inf) for i in own if own[i]),
+                        sum(opp[i] < own.get(i, inf) for i in opp if opp[i]))
+            self.assertEqual(reachability.territory(game, "player1"), expected)
+            self.assertEqual(reachability.territory(game, "player2"), expected[::-1])
+
+    def test_territory_score(self):
+        """ Test that the score of one player is minus that of the other """
+        game = Board("player1", "player2", 5, 5)
+        self.assertEqual(reachability.territory_score(game, "player1"), 0.)
+        for game in random_positions(7, 7, 5):
+            score = reachability.territory_score(game, "player1")
+            self.assertIsInstance(score, float)
+            self.assertEqual(score, -reachability.territory_score(game, "player2"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,312 @@
+"""
+Play against agents running in other processes.
+
+Agents are served by `AgentServer` over TCP or Unix domain sockets using a
+line-delimited JSON protocol, and `RemotePlayer` is a drop-in player for
+`Board.play` and `tournament.py` that forwards every `get_move` call to a
+server over a persistent connection.
+
+Instead of sending the whole board on every turn, the client only sends the
+moves applied since the server last saw the game (normally the opponent's
+reply and the agent's own previous move), and the server keeps a replica of
+the board up to date. The client also measures the round-trip time of the
+connection and deducts it from the time limit it forwards to the server, so
+transport overhead does not cause timeouts.
+
+Requests (one JSON object per line; every request gets one response):
+
+    {"type": "ping"}
+        -> {"type": "pong"}
+
+    {"type": "new_game", "width": 7, "height": 7, "player": 0,
+     "moves": [[r, c], ...]}
+        -> {"type": "ok"}
+        Start a new replica by replaying `moves` from an empty board; the
+        agent plays as player 1 if `player` is 0 and as player 2 otherwise.
+
+    {"type": "state", "width": 7, "height": 7, "player": 0,
+     "blocked": <int>, "locations": [[r, c] | null, [r, c] | null],
+     "active": 0, "move_count": <int>}
+        -> {"type": "ok"}
+        Start a new replica from an explicit game state (used when the move
+        sequence of the board is unknown).
+
+    {"type": "get_move", "moves": [[r, c], ...], "time_limit": <ms>}
+        -> {"type": "move", "move": [r, c], "elapsed": <ms>}
+        Apply `moves` to the replica, then search for a move within
+        `time_limit` milliseconds. A legal move is also applied to the
+        replica, so it is never part of a later `moves` delta.
+
+Errors are reported as {"type": "error", "message": "..."}.
+
+Usage:
+
+    python remote.py --port 9000 --score improved_score   # serve an agent
+"""
+
+import argparse
+import json
+import socket
+import socketserver
+import statistics
+import timeit
+
+from isolation import Board
+
+NUM_PINGS = 5  # round trips timed when a connection is opened
+RTT_SMOOTHING = 0.2  # weight of the newest sample in the round-trip estimate
+TRANSPORT_MARGIN = 1.  # extra milliseconds reserved for transport jitter
+
+curr_time_millis = lambda: 1000 * timeit.default_timer()
+
+
+class AgentHandler(socketserver.StreamRequestHandler):
+    """Serve one connection: each connection gets its own player instance
+    and board replica, created by the server's `player_factory`."""
+
+    def setup(self):
+        super(AgentHandler, self).setup()
+        self.player = self.server.player_factory()
+        self.game = None
+
+    def handle(self):
+        for line in self.rfile:
+            received = curr_time_millis()
+            try:
+                response = self.dispatch(json.loads(line.decode()), received)
+            except Exception as e:
+                response = {"type": "error", "message": "{}: {}".format(type(e).__name__, e)}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+    def dispatch(self, request, received):
+        kind = request["type"]
+        if kind == "ping":
+            return {"type": "pong"}
+
+        if kind == "new_game":
+            self.game = self.new_board(request)
+            for move in request["moves"]:
+                self.game.apply_move(tuple(move))
+            return {"type": "ok"}
+
+        if kind == "state":
+            self.game = self.new_board(request)
+            self.game.__board_state__ = request["blocked"]
+            self.game.__last_player_move__ = {
+                p: tuple(loc) if loc is not None else Board.NOT_MOVED
+                for p, loc in zip((self.game.__player_1__, self.game.__player_2__),
+                                  request["locations"])}
+            self.game.__active_player__ = (self.game.__player_1__, self.game.__player_2__)[request["active"]]
+            self.game.move_count = request["move_count"]
+            return {"type": "ok"}
+
+        if kind == "get_move":
+            if self.game is None:
+                raise RuntimeError("get_move before new_game")
+            for move in request["moves"]:
+                self.game.apply_move(tuple(move))
+            time_limit = request["time_limit"]
+            time_left = lambda: time_limit - (curr_time_millis() - received)
+            legal_moves = self.game.get_legal_moves()
+            move = self.player.get_move(self.game.copy(), legal_moves, time_left)
+            if move is not None and tuple(move) in legal_moves:
+                # the client assumes legal moves are applied to the replica
+                self.game.apply_move(tuple(move))
+            return {"type": "move", "move": list(move) if move is not None else None,
+                    "elapsed": curr_time_millis() - received}
+
+        raise ValueError("unknown request type {!r}".format(kind))
+
+    def new_board(self, request):
+        players = (self.player, "opponent")
+        if request["player"]:
+            players = players[::-1]
+        return Board(players[0], players[1], request["width"], request["height"])
+
+
+class ThreadingUnixStreamServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def AgentServer(player_factory, address):
+    """
+    Create a server for an agent.
+
+    Parameters
+    ----------
+    player_factory : callable
+        Called once per connection to create the player (an object with a
+        get_move() function) that serves it.
+
+    address : (str, int) or str
+        A (host, port) pair to listen on TCP, or the path of a Unix domain
+        socket. Use port 0 to pick a free port; the address actually bound is
+        available as `server.server_address`.
+
+    Returns
+    ----------
+    socketserver.BaseServer
+        The server; call `serve_forever()` (e.g., in a thread) to start it
+        and `shutdown()` to stop it.
+    """
+    if isinstance(address, str):
+        server = ThreadingUnixStreamServer(address, AgentHandler)
+    else:
+        server = ThreadingTCPServer(address, AgentHandler)
+    server.player_factory = player_factory
+    return server
+
+
+class RemotePlayer():
+    """Player that forwards move requests to an `AgentServer`.
+
+    Parameters
+    ----------
+    address : (str, int) or str
+        The address of the server: a (host, port) pair or the path of a Unix
+        domain socket.
+
+    Attributes
+    ----------
+    rtt : float
+        The estimated round-trip time (in milliseconds) of the connection,
+        excluding the time spent by the server searching.
+    """
+
+    def __init__(self, address):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(address)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+        self.synced = None  # the moves the server has applied to its replica
+        self.game = None  # board kept across turns, see new_game()
+
+        samples = []
+        for _ in range(NUM_PINGS):
+            start = curr_time_millis()
+            self.request({"type": "ping"})
+            samples.append(curr_time_millis() - start)
+        self.rtt = statistics.median(samples)
+
+    def request(self, message):
+        """Send one request and return the decoded response."""
+        self.sock.sendall((json.dumps(message) + "\n").encode())
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("the agent server closed the connection")
+        response = json.loads(line.decode())
+        if response["type"] == "error":
+            raise RuntimeError(response["message"])
+        return response
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def sync(self, game):
+        """
+        Bring the server's replica up to date with `game` and return the
+        moves that still need to be sent with the next move request.
+        """
+        moves = game.get_move_sequence()
+        if len(moves) != game.move_count:
+            # the move sequence is unknown; send the whole state instead
+            locations = [game.get_player_location(game.__player_1__),
+                         game.get_player_location(game.__player_2__)]
+            self.request({"type": "state", "width": game.width, "height": game.height,
+                          "player": 0 if game.__player_1__ is self else 1,
+                          "blocked": game.__board_state__, "locations": locations,
+                          "active": 0 if game.active_player == game.__player_1__ else 1,
+                          "move_count": game.move_count})
+            self.synced = None
+            return []
+
+        synced = self.synced
+        if synced is None or len(synced) > len(moves) or moves[:len(synced)] != synced:
+            self.request({"type": "new_game", "width": game.width, "height": game.height,
+                          "player": 0 if game.__player_1__ is self else 1, "moves": moves})
+            self.synced = moves
+            return []
+
+        self.synced = moves
+        return moves[len(synced):]
+
+    def new_game(self, game):
+        """Keep a board for the rest of the game (see `Board.play(delta=True)`)."""
+        self.game = game
+
+    def observe_move(self, move):
+        """Apply a move made by either player to the board kept by the player."""
+        self.game.apply_move(move)
+
+    def get_move(self, game, legal_moves, time_left):
+        """Forward the move request to the server.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells), or None to use
+            the board kept by the player (see `new_game()`).
+
+        legal_moves : list<(int, int)>
+            A list containing legal moves. Moves are encoded as tuples of pairs
+            of ints defining the next (row, col) for the agent to occupy.
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        ----------
+        (int, int)
+            The move selected by the remote agent.
+        """
+        delta = self.sync(game if game is not None else self.game)
+        start = curr_time_millis()
+        response = self.request({"type": "get_move", "moves": delta,
+                                 "time_limit": time_left() - self.rtt - TRANSPORT_MARGIN})
+        rtt = curr_time_millis() - start - response["elapsed"]
+        self.rtt += RTT_SMOOTHING * (rtt - self.rtt)
+
+        move = tuple(response["move"]) if response["move"] is not None else None
+        if move in legal_moves and self.synced is not None:
+            self.synced = self.synced + [move]
+        return move
+
+
+def main():
+    import sample_players
+    import game_agent
+
+    parser = argparse.ArgumentParser(description="Serve a CustomPlayer agent.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix domain socket")
+    parser.add_argument("--score", default="custom_score",
+                        help="score function from game_agent or sample_players")
+    parser.add_argument("--method", default="alphabeta")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fixed-depth", action="store_true")
+    args = parser.parse_args()
+
+    score_fn = getattr(game_agent, args.score, None) or getattr(sample_players, args.score)
+    factory = lambda: game_agent.CustomPlayer(search_depth=args.depth, score_fn=score_fn,
+                                              iterative=not args.fixed_depth,
+                                              method=args.method)
+    server = AgentServer(factory, args.unix or (args.host, args.port))
+    print("Serving {} on {}".format(args.score, server.server_address))
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+This file contains test cases for the remote agent protocol in `remote.py`.
+Agents are served from threads in the test process over localhost TCP and
+Unix domain sockets.
+"""
+import os
+import random
+import tempfile
+import threading
+import unittest
+
+import isolation
+import remote
+
+from sample_players import GreedyPlayer
+from sample_players import RandomPlayer
+
+
+class RemotePlayerTest(unittest.TestCase):
+
+    def serve(self, address):
+        server = remote.AgentServer(GreedyPlayer, address)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server.server_address
+
+    def play(self, player, opponent, seed):
+        random.seed(seed)
+        game = isolation.Board(player, opponent)
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        _, history, _ = game.play(time_limit=1000)
+        return history
+
+    def assertPlaysLikeLocal(self, address):
+        player = remote.RemotePlayer(address)
+        self.addCleanup(player.close)
+        self.assertGreater(player.rtt, 0)
+        # the same connection is reused for several games, as in tournament.py
+        for seed in range(3):
+            self.assertEqual(self.play(player, RandomPlayer(), seed),
+                             self.play(GreedyPlayer(), RandomPlayer(), seed))
+            self.assertEqual(self.play(RandomPlayer(), player, seed),
+                             self.play(RandomPlayer(), GreedyPlayer(), seed))
+
+    def test_tcp(self):
+        """ Test a remote agent over localhost TCP """
+        self.assertPlaysLikeLocal(self.serve(("localhost", 0)))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires Unix domain sockets")
+    def test_unix_socket(self):
+        """ Test a remote agent over a Unix domain socket """
+        path = os.path.join(tempfile.mkdtemp(), "agent.sock")
+        self.assertPlaysLikeLocal(self.serve(path))
+
+    def test_delta_play(self):
+        """ Test a remote agent that keeps its own board between turns """
+        player = remote.RemotePlayer(self.serve(("localhost", 0)))
+        self.addCleanup(player.close)
+        for seed in range(3):
+            random.seed(seed)
+            game = isolation.Board(player, RandomPlayer())
+            _, history, _ = game.play(time_limit=1000, delta=True)
+            self.assertEqual(history, self.play_from_start(GreedyPlayer(), RandomPlayer(), seed))
+
+    def play_from_start(self, player, opponent, seed):
+        random.seed(seed)
+        return isolation.Board(player, opponent).play(time_limit=1000)[1]
+
+    def test_state_sync(self):
+        """ Test syncing a board whose move sequence is unknown """
+        player = remote.RemotePlayer(self.serve(("localhost", 0)))
+        self.addCleanup(player.close)
+        game = isolation.Board(player, "opponent")
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        other = isolation.Board(player, "opponent")
+        other.__board_state__ = game.__board_state__
+        other.__last_player_move__ = game.__last_player_move__
+        other.move_count = game.move_count
+        move = player.get_move(other, other.get_legal_moves(), lambda: 1000)
+
+        local = GreedyPlayer()
+        game = isolation.Board(local, "opponent")
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        self.assertEqual(move, local.get_move(game, game.get_legal_moves(), None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+Remember the results of tournament matches across runs.
+
+Most `tournament.py` runs change a single agent under test, yet replay every
+match against the whole roster. `ResultCache` stores the result of every
+seeded match in an SQLite database, keyed by everything that decides it:
+
+    - the specs of both agents (class and constructor arguments, see
+      `distributed.agent_spec()`),
+    - a hash of the source of the modules defining the agents and their
+      score functions, and of the `isolation` board,
+    - the board size, the clock, the time limit and the seed of the match.
+
+so pairings whose agents did not change are loaded instead of played, while
+any edit to `game_agent.py` or `sample_players.py` makes the matches of the
+agents they define miss the cache. Only seeded matches (see
+`tournament.play_round`) are cached; with the wall clock, a cached result is
+one sample of a match that could go differently when replayed. Loaded
+matches come without move timings, which were measured by an earlier run
+(maybe on another machine), so `--jitter` only reports the matches played.
+
+Usage:
+
+    python tournament.py --result-cache results.sqlite --seed 1
+"""
+
+import hashlib
+import importlib
+import json
+import sqlite3
+
+from distributed import agent_spec
+from distributed import clock_spec
+
+CACHE_FILE = "results.sqlite"  # default location of the database
+CODE_MODULES = ["isolation.isolation"]  # hashed into the key of every match
+SCORE_ARGS = ["score_fn", "cheap_fn", "rollout_fn"]  # spec arguments naming functions
+
+_hashes = {}  # module name -> hash of its source
+
+
+def module_hash(name):
+    """Return a hash of the source file of a module (of its name for modules
+    built into the interpreter)."""
+    if name not in _hashes:
+        path = getattr(importlib.import_module(name), "__file__", None)
+        if path is None:
+            _hashes[name] = hashlib.sha256(name.encode()).hexdigest()
+        else:
+            with open(path, "rb") as f:
+                _hashes[name] = hashlib.sha256(f.read()).hexdigest()
+    return _hashes[name]
+
+
+def source_hash(spec):
+    """
+    Return a hash of the source of every module an agent spec depends on:
+    the modules of its class and score functions, and `CODE_MODULES`.
+    """
+    names = set(CODE_MODULES)
+    specs = [spec]
+    while specs:
+        spec = specs.pop()
+        names.add(spec["class"].rpartition(".")[0])
+        for arg in SCORE_ARGS:
+            value = spec["args"].get(arg)
+            if isinstance(value, dict):
+                specs.append(value)  # a score function object, see `score_spec()`
+            elif value is not None:
+                names.add(value.rpartition(".")[0])
+    return hashlib.sha256(" ".join(module_hash(n) for n in sorted(names)).encode()).hexdigest()
+
+
+def match_key(task, time_limit):
+    """
+    Return the cache key of a match given as a (player1, player2, width,
+    height, clock, seed) task, or None if the match cannot be cached.
+    """
+    player1, player2, width, height, clock, seed = task
+    if seed is None:
+        return None
+    try:
+        specs = [agent_spec(player) for player in (player1, player2)]
+    except ValueError:
+        return None
+    key = [specs, [source_hash(spec) for spec in specs], width, height,
+           clock_spec(clock), time_limit, seed]
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache():
+    """Store of match -> (score_1, score_2, timings_1, timings_2), used in
+    front of a `tournament.MatchPool` (or a `distributed.Coordinator`).
+    Matches loaded from the store have empty timings.
+
+    Parameters
+    ----------
+    pool : object
+        The pool playing the matches that are not cached.
+
+    path : str (optional)
+        Location of the SQLite database backing the cache; it is created if
+        needed. If None, the cache only lives in memory.
+
+    Attributes
+    ----------
+    hits, misses : int
+        The number of matches loaded from the cache and played.
+    """
+
+    def __init__(self, pool, path=None):
+        self.pool = pool
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path if path is not None else ":memory:",
+                                  timeout=60, isolation_level=None)
+        self.db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, "
+                        "score_1 INTEGER, score_2 INTEGER, timings TEXT)")
+
+    def get(self, key):
+        row = self.db.execute("SELECT score_1, score_2 FROM results WHERE key = ?",
+                              (key,)).fetchone()
+        if row is None:
+            return None
+        # the stored timings describe the run that played the match, not
+        # this one
+        return row[0], row[1], [], []
+
+    def put(self, key, result):
+        score_1, score_2, timings_1, timings_2 = result
+        self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                        (key, score_1, score_2, json.dumps([timings_1, timings_2])))
+
+    def play(self, tasks):
+        """
+        Play matches given as (player1, player2, width, height, clock, seed)
+        tuples, loading the cached ones, and return (score_1, score_2,
+        timings_1, timings_2) for each (see `tournament.MatchPool`); the
+        timings of loaded matches are empty.
+        """
+        import tournament
+
+        keys = [match_key(task, tournament.TIME_LIMIT) for task in tasks]
+        results = [None if key is None else self.get(key) for key in keys]
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        self.hits += len(tasks) - len(missing)
+        self.misses += len(missing)
+
+        played = self.pool.play([tasks[idx] for idx in missing]) if missing else []
+        for idx, result in zip(missing, played):
+            results[idx] = result
+            if keys[idx] is not None:
+                self.put(keys[idx], result)
+        return results
+
+    def close(self):
+        self.pool.close()
+        self.db.close()
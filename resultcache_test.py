@@ -0,0 +1,121 @@
+"""
+This file contains test cases for the result cache in `resultcache.py`.
+"""
+import os
+import tempfile
+import unittest
+
+from collections import defaultdict
+
+import resultcache
+import tournament
+
+from isolation import NodeClock
+from game_agent import CustomPlayer
+from game_agent import PhaseScore
+from sample_players import GreedyPlayer
+from sample_players import RandomPlayer
+from sample_players import improved_score
+from sample_players import open_move_score
+
+
+class CountingPool(tournament.MatchPool):
+    """Pool playing matches in this process that counts them."""
+
+    def __init__(self):
+        super(CountingPool, self).__init__()
+        self.played = 0
+
+    def play(self, tasks):
+        self.played += len(tasks)
+        return super(CountingPool, self).play(tasks)
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "results.sqlite")
+        self.player = CustomPlayer(score_fn=improved_score, search_depth=2,
+                                   method="alphabeta", iterative=False)
+        self.tasks = [(self.player, GreedyPlayer(), 5, 5, NodeClock(100.), seed)
+                      for seed in range(3)]
+
+    def tearDown(self):
+        resultcache._hashes.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_cached_results(self):
+        """ Test that seeded matches are loaded instead of played again """
+        cache = resultcache.ResultCache(CountingPool(), self.path)
+        results = cache.play(self.tasks)
+        self.assertEqual(cache.pool.played, 3)
+        cache.close()
+
+        # the database persists the results between runs
+        cache = resultcache.ResultCache(CountingPool(), self.path)
+        loaded = cache.play(self.tasks)
+        self.assertEqual(cache.pool.played, 0)
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+
+        # cached results match the results of playing the matches again,
+        # but come without the timings measured by the first run
+        self.assertEqual(tournament.MatchPool().play(self.tasks), results)
+        self.assertEqual([r[:2] for r in loaded], [r[:2] for r in results])
+        self.assertEqual([r[2:] for r in loaded], [([], [])] * 3)
+        cache.close()
+
+    def test_jitter(self):
+        """ Test that move times are only collected for matches played """
+        agents = [tournament.Agent(GreedyPlayer(), "Greedy"),
+                  tournament.Agent(self.player, "Player")]
+        cache = resultcache.ResultCache(CountingPool(), self.path)
+        jitter = defaultdict(list)
+        tournament.play_round(agents, 2, 5, 5, NodeClock(100.), cache, jitter, seed=1)
+        self.assertEqual(cache.pool.played, 4)
+        self.assertTrue(jitter["Player"])
+
+        jitter = defaultdict(list)
+        tournament.play_round(agents, 2, 5, 5, NodeClock(100.), cache, jitter, seed=1)
+        self.assertEqual(cache.pool.played, 4)
+        self.assertFalse(any(jitter.values()))
+        cache.close()
+
+    def test_keys(self):
+        """ Test that a change to anything deciding a match misses the cache """
+        key = resultcache.match_key(self.tasks[0], 150)
+        self.assertEqual(key, resultcache.match_key(self.tasks[0], 150))
+        self.assertNotEqual(key, resultcache.match_key(self.tasks[1], 150))
+        self.assertNotEqual(key, resultcache.match_key(self.tasks[0], 100))
+
+        deeper = CustomPlayer(score_fn=improved_score, search_depth=3,
+                              method="alphabeta", iterative=False)
+        self.assertNotEqual(key, resultcache.match_key((deeper,) + self.tasks[0][1:], 150))
+
+        # editing the module of the agent invalidates its matches
+        resultcache._hashes["game_agent"] = "edited"
+        self.assertNotEqual(key, resultcache.match_key(self.tasks[0], 150))
+
+        # so does editing the modules of the functions a score object uses
+        phased = CustomPlayer(score_fn=PhaseScore(cheap_fn=open_move_score), search_depth=2,
+                              method="alphabeta", iterative=False)
+        key = resultcache.match_key((phased,) + self.tasks[0][1:], 150)
+        self.assertIsNotNone(key)
+        resultcache._hashes["sample_players"] = "edited"
+        self.assertNotEqual(key, resultcache.match_key((phased,) + self.tasks[0][1:], 150))
+
+        # unseeded matches cannot be replayed, so they are not cached
+        self.assertIsNone(resultcache.match_key(self.tasks[0][:-1] + (None,), 150))
+
+    def test_unseeded(self):
+        """ Test that unseeded matches are always played """
+        cache = resultcache.ResultCache(CountingPool(), self.path)
+        tasks = [(RandomPlayer(), GreedyPlayer(), 5, 5, NodeClock(100.), None)] * 2
+        for _ in range(2):
+            cache.play(tasks)
+        self.assertEqual(cache.pool.played, 4)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
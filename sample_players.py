@@ -61,7 +61,7 @@ def open_move_score(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    return float(len(game.get_legal_moves(player)))
+    return float(game.mobility(player))
 
 
 def improved_score(game, player):
@@ -91,8 +91,8 @@ def improved_score(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = game.mobility(player)
+    opp_moves = game.mobility(game.get_opponent(player))
     return float(own_moves - opp_moves)
 
 
@@ -128,14 +128,51 @@ class RandomPlayer():
             return (-1, -1)
         return legal_moves[randint(0, len(legal_moves) - 1)]
 
+    def get_moves(self, games, legal_moves, time_left):
+        """Randomly select a move in each of several games at once (see
+        `isolation.play_batch`).
+
+        Parameters
+        ----------
+        games : list<`isolation.Board`>
+            The game states awaiting a move from this player.
+
+        legal_moves : list<list<(int, int)>>
+            The legal moves in each game.
+
+        time_left : callable
+            A function that returns the number of milliseconds left for the
+            whole batch.
+
+        Returns
+        ----------
+        list<(int, int)>
+            A randomly selected legal move for each game.
+        """
+        return [self.get_move(game, moves, time_left)
+                for game, moves in zip(games, legal_moves)]
+
 
 class GreedyPlayer():
     """Player that chooses next move to maximize heuristic score. This is
     equivalent to a minimax search agent with a search depth of one.
+
+    Parameters
+    ----------
+    score_fn : callable (optional)
+        A function to use for heuristic evaluation of game states.
+
+    batch_score_fn : callable (optional)
+        A function taking a list of game states and a player that returns
+        the heuristic value of every state at once. When moving in several
+        games at once (see `get_moves`) all successor states of all games are
+        scored with a single call. Defaults to calling `score_fn` on each
+        state.
     """
 
-    def __init__(self, score_fn=open_move_score):
+    def __init__(self, score_fn=open_move_score, batch_score_fn=None):
         self.score = score_fn
+        self.batch_score = batch_score_fn
 
     def get_move(self, game, legal_moves, time_left):
         """Select the move from the available legal moves with the highest
@@ -169,6 +206,46 @@ class GreedyPlayer():
         _, move = max([(self.score(game.forecast_move(m), self), m) for m in legal_moves])
         return move
 
+    def get_moves(self, games, legal_moves, time_left):
+        """Select the move with the highest heuristic score in each of several
+        games at once (see `isolation.play_batch`).
+
+        Parameters
+        ----------
+        games : list<`isolation.Board`>
+            The game states awaiting a move from this player.
+
+        legal_moves : list<list<(int, int)>>
+            The legal moves in each game.
+
+        time_left : callable
+            A function that returns the number of milliseconds left for the
+            whole batch.
+
+        Returns
+        ----------
+        list<(int, int)>
+            The best move for each game; (-1, -1) for games without legal
+            moves.
+        """
+        children = [game.forecast_move(m) for game, moves in zip(games, legal_moves)
+                    for m in moves]
+        if self.batch_score is None:
+            scores = [self.score(child, self) for child in children]
+        else:
+            scores = list(self.batch_score(children, self))
+
+        best_moves = []
+        start = 0
+        for moves in legal_moves:
+            if not moves:
+                best_moves.append((-1, -1))
+                continue
+            _, move = max(zip(scores[start:start + len(moves)], moves))
+            best_moves.append(move)
+            start += len(moves)
+        return best_moves
+
 
 class HumanPlayer():
     """Player that chooses a move according to user's input."""
@@ -0,0 +1,229 @@
+"""
+This file contains test cases for the search options of
+`game_agent.CustomPlayer`: history move ordering, search extensions,
+late move reductions and garbage collector control.
+"""
+import gc
+import unittest
+
+from benchmark import benchmark_positions
+from game_agent import CustomPlayer
+from sample_players import improved_score
+
+DEPTH = 4
+
+
+def make_player(**kwargs):
+    player = CustomPlayer(score_fn=improved_score, method="alphabeta", iterative=False,
+                          search_depth=DEPTH, **kwargs)
+    player.time_left = lambda: 1000.
+    return player
+
+
+def positions(player, count=10):
+    return benchmark_positions(count=count, players=(player, "opponent"))
+
+
+class SearchTest(unittest.TestCase):
+
+    def assertSameSearch(self, player, reference, depth=DEPTH, count=10):
+        """Check that `player` finds the value of a plain alpha-beta search
+        by `reference`, and a move achieving it (the same move when it is
+        the only one)."""
+        for game, expected in zip(positions(player, count), positions(reference, count)):
+            score, move = player.alphabeta(game, depth)
+            expected_score, expected_move = reference.alphabeta(expected, depth)
+            self.assertEqual(score, expected_score)
+            values = {m: reference.alphabeta(expected.forecast_move(m), depth - 1,
+                                             maximizing_player=False)[0]
+                      for m in expected.get_legal_moves()}
+            self.assertEqual(values[move], expected_score)
+            if list(values.values()).count(expected_score) == 1:
+                self.assertEqual(move, expected_move)
+
+
+class HistoryTest(SearchTest):
+
+    def test_same_result(self):
+        """ Test that history ordering does not change the search result """
+        player = make_player(history=True)
+        self.assertSameSearch(player, make_player())
+        self.assertTrue(player.history_table[True] or player.history_table[False])
+        self.assertTrue(player.countermoves[True] or player.countermoves[False])
+
+    def test_tables(self):
+        """ Test that the tables age between moves and reset between games """
+        player = make_player(history=True)
+        game = positions(player, 1)[0]
+        player.get_move(game, game.get_legal_moves(), lambda: 1000.)
+        table = dict(player.history_table[True])
+        self.assertTrue(table)
+
+        later = game.forecast_move(game.get_legal_moves()[0])
+        later.apply_move(later.get_legal_moves()[0])
+        player.age_tables(later)
+        for m, score in table.items():
+            self.assertEqual(player.history_table[True][m], score * player.HISTORY_DECAY)
+
+        # a position earlier than the last one searched starts a new game
+        player.age_tables(game)
+        self.assertEqual(player.history_table, {True: {}, False: {}})
+        self.assertEqual(player.countermoves, {True: {}, False: {}})
+
+        player.get_move(game, game.get_legal_moves(), lambda: 1000.)
+        player.new_game(game.copy())
+        self.assertEqual(player.history_table, {True: {}, False: {}})
+
+
+class ExtendingPlayer(CustomPlayer):
+    """Player recording the deepest extension of each search."""
+
+    def alphabeta(self, game, depth, *args, **kwargs):
+        self.deepest = max(getattr(self, "deepest", 0), self.extensions)
+        return super(ExtendingPlayer, self).alphabeta(game, depth, *args, **kwargs)
+
+
+class ExtensionTest(unittest.TestCase):
+
+    def test_budget(self):
+        """ Test that no line is extended by more than the budget """
+        for budget in (1, 3):
+            player = ExtendingPlayer(score_fn=improved_score, method="alphabeta",
+                                     iterative=False, search_depth=2,
+                                     extension_budget=budget)
+            for game in positions(player, 20):
+                player.get_move(game, game.get_legal_moves(), lambda: 1000.)
+                self.assertEqual(player.extensions, 0)
+            self.assertEqual(player.deepest, budget)
+
+    def test_timeout(self):
+        """ Test that the extension counter is reset when a search times out """
+        player = ExtendingPlayer(score_fn=improved_score, method="alphabeta",
+                                 extension_budget=4)
+        for game in positions(player, 20):
+            for limit in (5, 50, 500):
+                calls = iter(range(limit, -1, -1))
+                player.get_move(game, game.get_legal_moves(),
+                                lambda: player.TIMER_THRESHOLD + next(calls, -1))
+                self.assertTrue(player.timed_out)
+                self.assertEqual(player.extensions, 0)
+        self.assertGreater(player.deepest, 0)
+
+
+class LoggingPlayer(CustomPlayer):
+    """Player logging every alpha-beta call as (parent, position, depth,
+    alpha, beta, maximizing_player, score) once it returns, where parent is
+    the (call number, depth) of the calling node (None at the root)."""
+
+    def __init__(self, *args, **kwargs):
+        super(LoggingPlayer, self).__init__(*args, **kwargs)
+        self.log = []
+        self.stack = []
+        self.calls = 0
+
+    def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf"),
+                  maximizing_player=True):
+        parent = self.stack[-1] if self.stack else None
+        self.calls += 1
+        self.stack.append((self.calls, depth))
+        try:
+            result = super(LoggingPlayer, self).alphabeta(game, depth, alpha, beta,
+                                                          maximizing_player)
+        finally:
+            self.stack.pop()
+        position = (game.__board_state__, game.__locations__)
+        self.log.append((parent, position, depth, alpha, beta, maximizing_player, result[0]))
+        return result
+
+
+class ReductionTest(SearchTest):
+
+    def test_no_reduction(self):
+        """ Test that reducing no move gives the plain alpha-beta result """
+        player = make_player(reduce_after=100)
+        reference = make_player()
+        for game, expected in zip(positions(player), positions(reference)):
+            for depth in (3, 5):
+                self.assertEqual(player.alphabeta(game, depth),
+                                 reference.alphabeta(expected, depth))
+
+    def test_research(self):
+        """ Test that a reduced move failing high is searched again at full depth """
+        player = LoggingPlayer(score_fn=improved_score, method="alphabeta", iterative=False,
+                               reduce_after=1, history=True)
+        player.time_left = lambda: 1000.
+        reduced = researched = 0
+        for game in positions(player):
+            player.log = []
+            player.alphabeta(game, 6)
+            for i, (parent, position, depth, alpha, beta, maximizing, score) in \
+                    enumerate(player.log):
+                if parent is None or depth != parent[1] - 1 - player.LMR_REDUCTION:
+                    continue
+                reduced += 1
+                self.assertEqual(alpha, beta)
+                # the parent maximizes if this node minimizes
+                fails_high = score > alpha if not maximizing else score < alpha
+                full = [entry for entry in player.log[i + 1:]
+                        if entry[0] == parent and entry[1] == position and
+                        entry[2] == parent[1] - 1]
+                self.assertEqual(len(full), int(fails_high))
+                researched += fails_high
+        self.assertGreater(reduced, researched)
+        self.assertGreater(researched, 0)
+
+
+class GcControlTest(unittest.TestCase):
+
+    def tearDown(self):
+        gc.unfreeze()
+        gc.enable()
+
+    def test_enabled_after_move(self):
+        """ Test that the collector is enabled again after every move """
+        player = make_player(gc_control=True)
+        for game in positions(player, 5):
+            player.iterative = False
+            player.get_move(game, game.get_legal_moves(), lambda: 1000.)
+            self.assertTrue(gc.isenabled())
+            player.iterative = True
+            calls = iter(range(50, -1, -1))
+            player.get_move(game, game.get_legal_moves(),
+                            lambda: player.TIMER_THRESHOLD + next(calls, -1))
+            self.assertTrue(player.timed_out)
+            self.assertTrue(gc.isenabled())
+
+    def test_collect_after_move(self):
+        """ Test that the garbage of a move is collected before it returns """
+        generations = []
+
+        def record(phase, info):
+            if phase == "start":
+                generations.append(info["generation"])
+
+        player = make_player(gc_control=True)
+        game = positions(player, 1)[0]
+        gc.callbacks.append(record)
+        try:
+            player.get_move(game, game.get_legal_moves(), lambda: 1000.)
+        finally:
+            gc.callbacks.remove(record)
+        self.assertIn(0, generations)
+
+    def test_freeze_count(self):
+        """ Test that the permanent generation does not grow across games """
+        player = make_player(gc_control=True)
+        game = positions(player, 1)[0]
+        counts = []
+        for _ in range(5):
+            # objects of the last game, still alive when the next one starts
+            garbage = [[] for _ in range(10000)]
+            for item in garbage:
+                item.append(item)  # reference cycles only the collector frees
+            player.new_game(game.copy())
+            counts.append(gc.get_freeze_count())
+            del garbage
+        self.assertLess(max(counts) - min(counts), 1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+This file contains test cases for the retrograde solver in `tablebase.py`.
+"""
+import os
+import random
+import tempfile
+import unittest
+
+import endgame
+import tablebase
+
+from isolation import Board
+from sample_players import RandomPlayer
+
+
+class TablebaseTest(unittest.TestCase):
+
+    def test_solve(self):
+        """ Test tablebase values against a direct search """
+        table = tablebase.solve(3, 4)
+        rng = random.Random(0)
+        for _ in range(50):
+            game = Board("player1", "player2", 3, 4)
+            while game.get_legal_moves():
+                game.apply_move(rng.choice(game.get_legal_moves()))
+                if game.move_count >= 2:
+                    self.assertEqual(table.wins(game), endgame.solve(game.copy(), {}))
+
+    def test_save(self):
+        """ Test that a saved tablebase loads unchanged """
+        table = tablebase.solve(3, 3)
+        path = os.path.join(tempfile.mkdtemp(), "3x3.tb")
+        table.save(path)
+        loaded = tablebase.Tablebase.load(path)
+        os.remove(path)
+        self.assertEqual((loaded.width, loaded.height, loaded.bits),
+                         (table.width, table.height, table.bits))
+
+    def test_perfect_player(self):
+        """ Test that the perfect player wins every won game """
+        table = tablebase.solve(3, 4)
+        played = 0
+        for seed in range(20):
+            random.seed(seed)
+            perfect = tablebase.PerfectPlayer(table)
+            game = Board(RandomPlayer(), perfect, 3, 4)
+            game.apply_move(random.choice(game.get_legal_moves()))
+            if not table.wins(game):
+                continue
+            played += 1
+            # Board.play expects player 1 to move first
+            game.apply_move(perfect.get_move(game, game.get_legal_moves(), None))
+            winner, _, _ = game.play()
+            self.assertIs(winner, perfect)
+        self.assertTrue(played)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,13 +19,28 @@ initiative in the second match with agentB at (5, 2) as player 1 and agentA at
 (1, 3) as player 2.
 """
 
+import argparse
+import hashlib
 import itertools
+import math
+import multiprocessing
+import os
 import random
 import warnings
 
+import profiler
+
+from collections import defaultdict
 from collections import namedtuple
+from statistics import NormalDist
 
+from distributed import Coordinator
+from distributed import parse_address
 from isolation import Board
+from isolation import CpuClock
+from isolation import NodeClock
+from isolation import RecordingClock
+from isolation import WallClock
 from sample_players import RandomPlayer
 from sample_players import GreedyPlayer
 from sample_players import null_score
@@ -33,9 +48,28 @@ from sample_players import open_move_score
 from sample_players import improved_score
 from game_agent import CustomPlayer
 from game_agent import custom_score, mcs_score, balanced_score, aggressive_score
+from game_agent import PhaseScore
+from movecache import CachedPlayer
+from movecache import MoveCache
+from reachability import territory_score
+from resultcache import ResultCache
+from tablebase import PerfectPlayer
+from tablebase import Tablebase
 
 NUM_MATCHES = 10  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
+NODES_PER_MILLI = 100.  # node clock rate; see `python benchmark.py calibrate`
+
+# Sequential probability ratio test (SPRT) defaults: H0 says the agent under
+# test is SPRT_ELO0 stronger than its opponent, H1 says it is SPRT_ELO1
+# stronger; the match stops as soon as either hypothesis is accepted with the
+# given error rates, or after SPRT_MAX_GAMES games.
+SPRT_ELO0 = 0.
+SPRT_ELO1 = 50.
+SPRT_ALPHA = 0.05
+SPRT_BETA = 0.05
+SPRT_MAX_GAMES = 1000
+CONFIDENCE = 0.95
 
 TIMEOUT_WARNING = "One or more agents lost a match this round due to " + \
                   "timeout. The get_move() function must return before " + \
@@ -57,18 +91,146 @@ same opponents.
 
 Agent = namedtuple("Agent", ["player", "name"])
 
+SprtResult = namedtuple("SprtResult", ["wins", "losses", "llr", "decision",
+                                       "elo", "elo_low", "elo_high"])
+
+
+def score_from_elo(elo):
+    """Expected score of a player rated `elo` points above its opponent."""
+    return 1. / (1. + 10. ** (-elo / 400.))
+
+
+def elo_from_score(score):
+    """Elo difference corresponding to an expected score in [0, 1]."""
+    if score <= 0.:
+        return float("-inf")
+    if score >= 1.:
+        return float("inf")
+    return 400. * math.log10(score / (1. - score))
+
+
+def elo_interval(wins, losses, confidence=CONFIDENCE):
+    """
+    Estimate the Elo difference implied by a win/loss record along with a
+    confidence interval.
+
+    Isolation has no draws, so every game is a Bernoulli trial. The interval
+    on the score is the Wilson score interval, which (unlike p +/- z * sqrt(p
+    * (1 - p) / n)) stays inside [0, 1] and does not collapse to a point for
+    a perfect record. The estimate and the bounds are then kept 1 / (2n + 2)
+    away from 0 and 1 before they are mapped onto the Elo scale, so a match
+    that one player swept still gives finite numbers.
+
+    Returns
+    ----------
+    (float, float, float)
+        The Elo estimate and the lower and upper bounds of the interval.
+    """
+    games = wins + losses
+    if games == 0:
+        return 0., float("-inf"), float("inf")
+    score = wins / games
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.)
+    center = (score + z * z / (2. * games)) / (1. + z * z / games)
+    margin = (z / (1. + z * z / games) *
+              math.sqrt(score * (1. - score) / games + z * z / (4. * games * games)))
+    lowest = 0.5 / (games + 1.)
+    clamp = lambda p: min(max(p, lowest), 1. - lowest)
+    return (elo_from_score(clamp(score)),
+            elo_from_score(clamp(center - margin)),
+            elo_from_score(clamp(center + margin)))
+
+
+def format_elo(elo, elo_low, elo_high):
+    """Format an Elo estimate and its interval as "+E [+L, +H]"."""
+    # adding 0. turns the -0.0 of rounding a small negative number into 0.0
+    return "{:+.0f} [{:+.0f}, {:+.0f}]".format(
+        *(round(x) + 0. if math.isfinite(x) else x for x in (elo, elo_low, elo_high)))
+
+
+def sprt_llr(wins, losses, elo0=SPRT_ELO0, elo1=SPRT_ELO1):
+    """
+    Log-likelihood ratio of H1 (Elo difference is `elo1`) against H0 (Elo
+    difference is `elo0`) given a win/loss record.
+    """
+    p0 = score_from_elo(elo0)
+    p1 = score_from_elo(elo1)
+    return wins * math.log(p1 / p0) + losses * math.log((1. - p1) / (1. - p0))
+
+
+def sprt_bounds(alpha=SPRT_ALPHA, beta=SPRT_BETA):
+    """Lower and upper log-likelihood ratio bounds of Wald's SPRT."""
+    return math.log(beta / (1. - alpha)), math.log((1. - beta) / alpha)
 
-def play_match(player1, player2):
+
+def play_sprt(agent_1, agent_2, elo0=SPRT_ELO0, elo1=SPRT_ELO1,
+              alpha=SPRT_ALPHA, beta=SPRT_BETA, max_games=SPRT_MAX_GAMES,
+              width=7, height=7, clock=None, jitter=None):
+    """
+    Play fair matches between two agents until a sequential probability ratio
+    test decides whether `agent_1` is `elo0` (H0) or `elo1` (H1) Elo points
+    stronger than `agent_2`, or until `max_games` games have been played.
+
+    The test is checked after every fair match (i.e., every pair of games
+    played from the same opening with initiative swapped). The time left at
+    the end of every move is added to the lists of `jitter` (see
+    `play_round`), if given.
+
+    Returns
+    ----------
+    SprtResult
+        The win/loss record of `agent_1`, the final log-likelihood ratio, the
+        decision ("H0", "H1" or None if inconclusive), and the Elo estimate
+        with its confidence interval.
+    """
+    lower, upper = sprt_bounds(alpha, beta)
+    wins = losses = 0
+    llr = 0.
+    decision = None
+
+    while wins + losses < max_games:
+        timings = None
+        if jitter is not None:
+            timings = (jitter[agent_1.name], jitter[agent_2.name])
+        score_1, score_2 = play_match(agent_1.player, agent_2.player,
+                                      width, height, clock, timings)
+        wins += score_1
+        losses += score_2
+
+        llr = sprt_llr(wins, losses, elo0, elo1)
+        if llr >= upper:
+            decision = "H1"
+            break
+        if llr <= lower:
+            decision = "H0"
+            break
+
+    elo, elo_low, elo_high = elo_interval(wins, losses)
+    return SprtResult(wins, losses, llr, decision, elo, elo_low, elo_high)
+
+
+def play_match(player1, player2, width=7, height=7, clock=None, timings=None,
+               seed=None):
     """
     Play a "fair" set of matches between two agents by playing two games
     between the players, forcing each agent to play from randomly selected
     positions. This should control for differences in outcome resulting from
-    advantage due to starting position on the board.
+    advantage due to starting position on the board. Moves are timed by
+    `clock` (see `isolation.clocks`; the wall clock by default).
+
+    If `timings` is given, it must be a pair of lists; the time left at the
+    end of every move of `player1` and `player2` is appended to them.
+
+    If `seed` is given, the random generator is seeded with it first, so the
+    openings (and the moves of agents using `random`) can be replayed.
     """
+    if seed is not None:
+        random.seed(seed)
     num_wins = {player1: 0, player2: 0}
     num_timeouts = {player1: 0, player2: 0}
     num_invalid_moves = {player1: 0, player2: 0}
-    games = [Board(player1, player2), Board(player2, player1)]
+    games = [Board(player1, player2, width, height),
+             Board(player2, player1, width, height)]
 
     # initialize both games with a random move and response
     for _ in range(2):
@@ -78,7 +240,13 @@ def play_match(player1, player2):
 
     # play both games and tally the results
     for game in games:
-        winner, _, termination = game.play(time_limit=TIME_LIMIT)
+        recorder = RecordingClock(clock)
+        winner, _, termination = game.play(time_limit=TIME_LIMIT, clock=recorder)
+        if timings is not None:
+            # both games start with player 1 of the board to move
+            first, second = timings if game.__player_1__ is player1 else timings[::-1]
+            first.extend(recorder.remaining[0::2])
+            second.extend(recorder.remaining[1::2])
 
         if player1 == winner:
             num_wins[player1] += 1
@@ -103,10 +271,20 @@ def play_match(player1, player2):
     return num_wins[player1], num_wins[player2]
 
 
-def play_round(agents, num_matches):
+def play_round(agents, num_matches, width=7, height=7, clock=None, pool=None,
+               jitter=None, seed=None):
     """
     Play one round (i.e., a single match between each pair of opponents)
+
+    The matches are played by `pool` (a `MatchPool`; in this process by
+    default), and the time left at the end of every move is added to the
+    lists of `jitter` (a defaultdict(list) keyed by agent name), if given;
+    matches loaded by a `resultcache.ResultCache` add no times. If `seed`
+    is given, every match is seeded with `match_seed()`, so a pairing
+    always gets the same openings regardless of the other agents.
     """
+    if pool is None:
+        pool = MatchPool()
     agent_1 = agents[-1]
     wins = 0.
     total = 0.
@@ -116,35 +294,227 @@ def play_round(agents, num_matches):
 
     for idx, agent_2 in enumerate(agents[:-1]):
 
-        counts = {agent_1.player: 0., agent_2.player: 0.}
+        counts = {agent_1.name: 0., agent_2.name: 0.}
         names = [agent_1.name, agent_2.name]
         print("  Match {}: {!s:^11} vs {!s:^11}".format(idx + 1, *names), end=' ')
 
         # Each player takes a turn going first
-        for p1, p2 in itertools.permutations((agent_1.player, agent_2.player)):
-            for _ in range(num_matches):
-                score_1, score_2 = play_match(p1, p2)
-                counts[p1] += score_1
-                counts[p2] += score_2
-                total += score_1 + score_2
+        pairs = list(itertools.permutations((agent_1, agent_2))) * num_matches
+        tasks = []
+        for rep, (a, b) in enumerate(pairs):
+            match = None if seed is None else match_seed(seed, a.name, b.name, rep // 2)
+            tasks.append((a.player, b.player, width, height, clock, match))
+        results = pool.play(tasks)
+        for (a, b), (score_1, score_2, times_1, times_2) in zip(pairs, results):
+            counts[a.name] += score_1
+            counts[b.name] += score_2
+            total += score_1 + score_2
+            if jitter is not None:
+                jitter[a.name].extend(times_1)
+                jitter[b.name].extend(times_2)
+
+        wins += counts[agent_1.name]
+
+        elo, elo_low, elo_high = elo_interval(counts[agent_1.name],
+                                              counts[agent_2.name])
+        print("\tResult: {} to {}\tElo: {}".format(
+            int(counts[agent_1.name]), int(counts[agent_2.name]),
+            format_elo(elo, elo_low, elo_high)))
+
+    return 100. * wins / total
 
-        wins += counts[agent_1.player]
 
-        print("\tResult: {} to {}".format(int(counts[agent_1.player]),
-                                          int(counts[agent_2.player])))
+def match_seed(seed, name_1, name_2, index):
+    """Derive the seed of the `index`-th match of a pairing from a run seed."""
+    key = "{}:{}:{}:{}".format(seed, name_1, name_2, index).encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:4], "little")
 
-    return 100. * wins / total
+
+def pin_to_core(index):
+    """Restrict this process to a single CPU core, chosen round-robin from
+    the cores it may run on (only supported on Linux)."""
+    if hasattr(os, "sched_setaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cores[index % len(cores)]})
+
+
+def _timed_match(task):
+    """Play a match for `MatchPool` and return the scores and timings."""
+    *match, seed = task
+    timings = ([], [])
+    score_1, score_2 = play_match(*match, timings=timings, seed=seed)
+    return score_1, score_2, timings[0], timings[1]
 
 
-def main():
+def _init_worker(counter, pin):
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    random.seed()  # forked workers would otherwise share the same openings
+    if pin:
+        pin_to_core(index)
 
-    HEURISTICS = [("Null", null_score),
-                  ("Open", open_move_score),
-                  ("Improved", improved_score)]
-    AB_ARGS = {"search_depth": 5, "method": 'alphabeta', "iterative": False}
-    MM_ARGS = {"search_depth": 3, "method": 'minimax', "iterative": False}
-    CUSTOM_ARGS = {"method": 'alphabeta', 'iterative': True}
 
+class MatchPool():
+    """Play matches in this process or in a pool of worker processes.
+
+    Parameters
+    ----------
+    workers : int (optional)
+        The number of worker processes; with 1 (the default) matches are
+        played in this process.
+
+    pin : bool (optional)
+        Pin every worker (or this process) to its own CPU core, so games are
+        not migrated between cores or squeezed onto the same one.
+    """
+
+    def __init__(self, workers=1, pin=False):
+        self.workers = workers
+        self._pool = None
+        if workers > 1:
+            counter = multiprocessing.Value("i", 0)
+            self._pool = multiprocessing.Pool(workers, _init_worker, (counter, pin))
+        elif pin:
+            pin_to_core(0)
+
+    def play(self, tasks):
+        """
+        Play matches given as (player1, player2, width, height, clock, seed)
+        tuples and return (score_1, score_2, timings_1, timings_2) for each
+        (see `play_match`).
+        """
+        if self._pool is None:
+            return [_timed_match(task) for task in tasks]
+        return self._pool.map(_timed_match, tasks)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+
+
+def print_jitter(jitter, agents, time_limit=TIME_LIMIT):
+    """
+    Print the distribution of move times of each agent: the median and 99th
+    percentile time per move, timeouts, and how far each agent overshot its
+    `TIMER_THRESHOLD` (the time left at which it stops searching). The
+    threshold must exceed the worst overshoot to avoid timeouts.
+    """
+    percentile = lambda values, q: values[int(q * (len(values) - 1))]
+    thresholds = {a.name: getattr(a.player, "TIMER_THRESHOLD", None) for a in agents}
+    print("{!s:<20}{:>8}{:>9}{:>9}{:>10}{:>11}{:>10}{:>10}".format(
+        "agent", "moves", "p50 ms", "p99 ms", "timeouts", "threshold",
+        "p99 over", "max over"))
+    for name, remaining in sorted(jitter.items()):
+        if not remaining:
+            continue
+        think = sorted(time_limit - left for left in remaining)
+        timeouts = sum(left < 0 for left in remaining)
+        threshold = thresholds.get(name)
+        if threshold is None:
+            over = ["{:>10}".format("-")] * 2
+        else:
+            overshoot = sorted(threshold - left for left in remaining)
+            over = ["{:>10.2f}".format(x) for x in (percentile(overshoot, .99), overshoot[-1])]
+        print("{!s:<20}{:>8}{:>9.2f}{:>9.2f}{:>10}{:>11}{}{}".format(
+            name, len(think), percentile(think, .5), percentile(think, .99), timeouts,
+            "-" if threshold is None else threshold, *over))
+
+
+def print_sprt(agent_1, agent_2, result):
+    """Print the outcome of an SPRT match in the style of `play_round`."""
+    verdict = {"H1": "stronger", "H0": "not stronger", None: "inconclusive"}
+    print("  {!s:^11} vs {!s:^11}\tResult: {} to {}".format(
+        agent_1.name, agent_2.name, result.wins, result.losses), end=' ')
+    print("\tLLR: {:+.2f}\tElo: {}\t({})".format(
+        result.llr, format_elo(result.elo, result.elo_low, result.elo_high),
+        verdict[result.decision]))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("--size", type=int, default=7,
+                        help="board width and height (default: %(default)s)")
+    parser.add_argument("--sprt", action="store_true",
+                        help="compare each agent under test against the "
+                             "ID_Improved baseline with an SPRT instead of "
+                             "a full round-robin")
+    parser.add_argument("--elo0", type=float, default=SPRT_ELO0,
+                        help="Elo difference under H0 (default: %(default)s)")
+    parser.add_argument("--elo1", type=float, default=SPRT_ELO1,
+                        help="Elo difference under H1 (default: %(default)s)")
+    parser.add_argument("--alpha", type=float, default=SPRT_ALPHA,
+                        help="false positive rate (default: %(default)s)")
+    parser.add_argument("--beta", type=float, default=SPRT_BETA,
+                        help="false negative rate (default: %(default)s)")
+    parser.add_argument("--max-games", type=int, default=SPRT_MAX_GAMES,
+                        help="SPRT game cap (default: %(default)s)")
+    parser.add_argument("--extra-agents", action="store_true",
+                        help="also evaluate the experimental agents (territory "
+                             "and phase-aware heuristics)")
+    parser.add_argument("--tablebase", metavar="PATH",
+                        help="add a perfect player using a tablebase saved by "
+                             "tablebase.py (the board size must match --size)")
+    parser.add_argument("--move-cache", metavar="PATH",
+                        help="memoize the moves of the fixed-depth roster "
+                             "agents in an SQLite database at PATH, shared "
+                             "between runs")
+    parser.add_argument("--result-cache", metavar="PATH",
+                        help="load the results of unchanged seeded matches "
+                             "from an SQLite database at PATH instead of "
+                             "playing them again (implies --seed 0 unless "
+                             "--seed is given)")
+    parser.add_argument("--seed", type=int,
+                        help="seed the openings of every match, so runs can "
+                             "be replayed")
+    parser.add_argument("--clock", choices=["wall", "cpu", "nodes"], default="wall",
+                        help="measure the time of each move in wall-clock "
+                             "time, thread CPU time, or searched nodes (see "
+                             "--nodes-per-ms) (default: %(default)s)")
+    parser.add_argument("--nodes-per-ms", type=float, default=NODES_PER_MILLI,
+                        help="nodes counted as one millisecond by the node "
+                             "clock; see 'benchmark.py calibrate' "
+                             "(default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="play matches in this many processes "
+                             "(default: %(default)s)")
+    parser.add_argument("--pin", action="store_true",
+                        help="pin each worker process to its own CPU core")
+    parser.add_argument("--coordinator", type=parse_address, metavar="HOST:PORT",
+                        help="listen on HOST:PORT and hand the matches out to "
+                             "workers started with 'distributed.py --connect' "
+                             "instead of playing them locally")
+    parser.add_argument("--jitter", action="store_true",
+                        help="print a report of the move times of each agent")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="sample the agents while playing, print the time "
+                             "spent per search phase and write collapsed "
+                             "stacks (for flamegraph tools) to PATH; only "
+                             "the agents playing in this process are sampled")
+    args = parser.parse_args(argv)
+    if args.tablebase and args.coordinator:
+        parser.error("the perfect player of --tablebase cannot be sent to the workers "
+                     "of --coordinator")
+    if args.profile and (args.workers > 1 or args.coordinator):
+        parser.error("--profile samples this process only, where no match is played "
+                     "with --workers or --coordinator")
+    return args
+
+
+HEURISTICS = [("Null", null_score),
+              ("Open", open_move_score),
+              ("Improved", improved_score)]
+AB_ARGS = {"search_depth": 5, "method": 'alphabeta', "iterative": False}
+MM_ARGS = {"search_depth": 3, "method": 'minimax', "iterative": False}
+CUSTOM_ARGS = {"method": 'alphabeta', 'iterative': True}
+
+
+def make_roster():
+    """
+    Create the fixed collection of opponents that every agent under test is
+    evaluated against.
+    """
     # Create a collection of CPU agents using fixed-depth minimax or alpha beta
     # search, or random selection.  The agent names encode the search method
     # (MM=minimax, AB=alpha-beta) and the heuristic function (Null=null_score,
@@ -155,13 +525,18 @@ def main():
     ab_agents = [Agent(CustomPlayer(score_fn=h, **AB_ARGS),
                        "AB_" + name) for name, h in HEURISTICS]
     random_agents = [Agent(RandomPlayer(), "Random"), Agent(GreedyPlayer(), "Greedy")]
+    return random_agents + mm_agents + ab_agents
 
+
+def make_test_agents(extra=False):
+    """Create the agents under test; `extra` adds the experimental agents
+    using the territory and phase-aware heuristics."""
     # ID_Improved agent is used for comparison to the performance of the
     # submitted agent for calibration on the performance across different
     # systems; i.e., the performance of the student agent is considered
     # relative to the performance of the ID_Improved agent to account for
     # faster or slower computers.
-    test_agents = [
+    agents = [
         # Agent(GreedyPlayer(score_fn=open_move_score), "Greedy"),
         # Agent(CustomPlayer(score_fn=open_move_score, **CUSTOM_ARGS), "Open Move"),
         # Agent(CustomPlayer(score_fn=improved_score, **CUSTOM_ARGS), "ID_Improved"),
@@ -169,21 +544,118 @@ def main():
         Agent(CustomPlayer(score_fn=balanced_score, **CUSTOM_ARGS), "Student Balanced"),
         Agent(CustomPlayer(score_fn=mcs_score, **CUSTOM_ARGS), "Student MCS"),
     ]
+    if extra:
+        agents += [
+            Agent(CustomPlayer(score_fn=territory_score, **CUSTOM_ARGS), "Student Territory"),
+            Agent(CustomPlayer(score_fn=PhaseScore(), **CUSTOM_ARGS), "Student Phased"),
+        ]
+    return agents
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.profile:
+        agents = make_roster() + make_test_agents(args.extra_agents)
+        for agent in agents:
+            score = getattr(agent.player, "score", None)
+            if callable(score):
+                # score objects (e.g., PhaseScore) are timed by their __call__
+                profiler.register(score if hasattr(score, "__code__") else type(score).__call__,
+                                  "eval")
+        with profiler.SamplingProfiler() as sampler:
+            run(args)
+        print("\n\nProfile:")
+        print("----------")
+        sampler.print_phases()
+        sampler.write_collapsed(args.profile)
+    else:
+        run(args)
+
+
+def make_clock(name, nodes_per_milli=NODES_PER_MILLI):
+    """Create the clock selected by the --clock option."""
+    if name == "cpu":
+        return CpuClock()
+    if name == "nodes":
+        return NodeClock(nodes_per_milli)
+    return WallClock()
+
+
+def run(args):
+    """Run the tournament or the SPRT selected by the command line."""
+    roster = make_roster()
+    test_agents = make_test_agents(args.extra_agents)
+
+    if args.tablebase:
+        tablebase = Tablebase.load(args.tablebase)
+        if (tablebase.width, tablebase.height) != (args.size, args.size):
+            raise SystemExit("The tablebase is for {}x{} boards; use --size.".format(
+                tablebase.width, tablebase.height))
+        roster.append(Agent(PerfectPlayer(tablebase), "Perfect"))
+
+    if args.move_cache:
+        cache = MoveCache(args.move_cache)
+        roster = [Agent(CachedPlayer(a.player, cache), a.name)
+                  if isinstance(a.player, CustomPlayer) and not a.player.iterative else a
+                  for a in roster]
+
+    clock = make_clock(args.clock, args.nodes_per_ms)
+    jitter = defaultdict(list) if args.jitter else None
 
     print(DESCRIPTION)
+
+    if args.sprt:
+        baseline = Agent(CustomPlayer(score_fn=improved_score, **CUSTOM_ARGS),
+                         "ID_Improved")
+        print("\nSPRT: H0 = {:+.0f} Elo, H1 = {:+.0f} Elo, alpha = {}, "
+              "beta = {}".format(args.elo0, args.elo1, args.alpha, args.beta))
+        print("----------")
+        for agentUT in test_agents:
+            result = play_sprt(agentUT, baseline, args.elo0, args.elo1,
+                               args.alpha, args.beta, args.max_games,
+                               args.size, args.size, clock, jitter)
+            print_sprt(agentUT, baseline, result)
+        if jitter is not None:
+            print("\n\nMove times:")
+            print("----------")
+            print_jitter(jitter, test_agents + [baseline])
+        return
+
+    if args.coordinator:
+        pool = Coordinator(args.coordinator)
+    else:
+        pool = MatchPool(args.workers, args.pin)
+    seed = args.seed
+    if args.result_cache:
+        pool = ResultCache(pool, args.result_cache)
+        seed = 0 if seed is None else seed
+
     for agentUT in test_agents:
         print("")
         print("*************************")
         print("{:^25}".format("Evaluating: " + agentUT.name))
         print("*************************")
 
-        agents = random_agents + mm_agents + ab_agents + [agentUT]
-        win_ratio = play_round(agents, NUM_MATCHES)
+        agents = roster + [agentUT]
+        win_ratio = play_round(agents, NUM_MATCHES, args.size, args.size, clock,
+                               pool, jitter, seed)
 
         print("\n\nResults:")
         print("----------")
         print("{!s:<15}{:>10.2f}%".format(agentUT.name, win_ratio))
 
+    if args.result_cache:
+        print("\nResult cache: {} matches loaded, {} played".format(pool.hits, pool.misses))
+    pool.close()
+    if jitter is not None:
+        print("\n\nMove times:")
+        print("----------")
+        print_jitter(jitter, roster + test_agents)
+        if args.result_cache:
+            print("(matches played this run only; the {} loaded from the result "
+                  "cache are not timed)".format(pool.hits))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,114 @@
+"""
+This file contains test cases for the match statistics of `tournament.py`:
+Elo estimates with confidence intervals and the sequential probability ratio
+test (SPRT), and the checks of the command line options.
+"""
+import contextlib
+import io
+import math
+import unittest
+
+import tournament
+
+from sample_players import GreedyPlayer
+from tournament import Agent
+
+
+class ForfeitPlayer():
+    """Player that loses every game by returning an illegal move."""
+
+    def get_move(self, game, legal_moves, time_left):
+        return (-1, -1)
+
+
+class EloTest(unittest.TestCase):
+
+    def test_even(self):
+        """ Test that an even record is centered on +0 """
+        elo, low, high = tournament.elo_interval(5, 5)
+        self.assertEqual(elo, 0.)
+        self.assertAlmostEqual(low, -high)
+        self.assertLess(low, 0.)
+        self.assertEqual(tournament.format_elo(elo, low, high), "+0 [-204, +204]")
+        self.assertEqual(tournament.format_elo(-0.3, -0.2, 0.4), "+0 [+0, +0]")
+
+    def test_sweep(self):
+        """ Test that a perfect record gives finite bounds """
+        for games in (1, 2, 10, 100):
+            elo, low, high = tournament.elo_interval(games, 0)
+            self.assertTrue(all(math.isfinite(x) for x in (elo, low, high)))
+            self.assertLess(low, elo)
+            self.assertLessEqual(elo, high)
+            for x, y in zip(tournament.elo_interval(0, games), (-high, -elo, -low)):
+                self.assertAlmostEqual(x, y)
+        # more games narrow the interval from below
+        self.assertLess(tournament.elo_interval(10, 0)[1], tournament.elo_interval(100, 0)[1])
+        self.assertEqual(tournament.format_elo(*tournament.elo_interval(10, 0)),
+                         "+529 [+166, +529]")
+
+    def test_interval(self):
+        """ Test that the interval contains the estimate and narrows with games """
+        elo, low, high = tournament.elo_interval(60, 40)
+        self.assertAlmostEqual(elo, tournament.elo_from_score(0.6))
+        self.assertLess(low, elo)
+        self.assertLess(elo, high)
+        wider = tournament.elo_interval(6, 4)
+        self.assertLess(wider[1], low)
+        self.assertGreater(wider[2], high)
+
+
+class SprtTest(unittest.TestCase):
+
+    def test_llr(self):
+        """ Test the log-likelihood ratio of a known record """
+        self.assertAlmostEqual(tournament.sprt_llr(10, 5, 0., 50.), 0.5648, places=4)
+        self.assertEqual(tournament.sprt_llr(0, 0), 0.)
+        lower, upper = tournament.sprt_bounds(0.05, 0.05)
+        self.assertAlmostEqual(upper, math.log(19.))
+        self.assertAlmostEqual(lower, -upper)
+
+    def test_decisions(self):
+        """ Test that the SPRT stops at the first match crossing a bound """
+        lower, upper = tournament.sprt_bounds()
+        winner = Agent(GreedyPlayer(), "Greedy")
+        loser = Agent(ForfeitPlayer(), "Forfeit")
+
+        result = tournament.play_sprt(winner, loser, width=5, height=5)
+        self.assertEqual((result.decision, result.losses), ("H1", 0))
+        self.assertGreaterEqual(result.llr, upper)
+        # each fair match is two games
+        self.assertLess(tournament.sprt_llr(result.wins - 2, 0), upper)
+        self.assertTrue(math.isfinite(result.elo_high))
+
+        result = tournament.play_sprt(loser, winner, width=5, height=5)
+        self.assertEqual((result.decision, result.wins), ("H0", 0))
+        self.assertLessEqual(result.llr, lower)
+        self.assertGreater(tournament.sprt_llr(0, result.losses - 2), lower)
+
+        result = tournament.play_sprt(winner, loser, max_games=4, width=5, height=5)
+        self.assertEqual((result.decision, result.wins), (None, 4))
+
+
+class ArgsTest(unittest.TestCase):
+
+    def assertRejected(self, argv):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                tournament.parse_args(argv)
+
+    def test_profile(self):
+        """ Test that --profile is rejected when matches run elsewhere """
+        self.assertEqual(tournament.parse_args(["--profile", "out.txt"]).profile, "out.txt")
+        args = tournament.parse_args(["--profile", "out.txt", "--workers", "1"])
+        self.assertEqual((args.profile, args.workers), ("out.txt", 1))
+        self.assertRejected(["--profile", "out.txt", "--workers", "4"])
+        self.assertRejected(["--profile", "out.txt", "--coordinator", "localhost:9100"])
+
+    def test_coordinator(self):
+        """ Test that agents the workers cannot rebuild are rejected """
+        self.assertEqual(tournament.parse_args(["--tablebase", "t.tb"]).tablebase, "t.tb")
+        self.assertRejected(["--tablebase", "t.tb", "--coordinator", "localhost:9100"])
+
+
+if __name__ == '__main__':
+    unittest.main()